@@ -0,0 +1,45 @@
+"""
+Module for Bayesian CPD algorithm batched detector's abstract base class.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class IBatchedDetector(ABC):
+    """
+    Abstract base class for detectors that detect change points in several independent series processed in lockstep.
+    """
+
+    @abstractmethod
+    def reset(self, series_count: int) -> None:
+        """
+        Clears the detector's state for all series.
+        :param series_count: number of series.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def detect(self, growth_probs: np.ndarray, run_lengths_counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Checks whether changepoints occurred with given growth probabilities at the time.
+        :param growth_probs: matrix of growth probabilities, a row per series and a column per run length.
+        :param run_lengths_counts: number of run lengths hypotheses per series.
+        :param rows: boolean mask of series to check.
+        :return: boolean mask of series where a changepoint occurred.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self, rows: np.ndarray) -> None:
+        """
+        Clears the detector's state for given series.
+        :param rows: indices of series.
+        """
+        raise NotImplementedError
@@ -0,0 +1,85 @@
+"""
+Module for Bayesian CPD algorithm batched likelihood function's abstract base class.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class IBatchedLikelihood(ABC):
+    """
+    Abstract base class for likelihood functions of several independent series processed in lockstep. Parameters are
+    stored as matrices, where a row corresponds to a series and a column corresponds to a run length.
+    """
+
+    @abstractmethod
+    def reset(self, series_count: int, run_lengths_capacity: int) -> None:
+        """
+        Clears parameters of all series and prepares matrices of a given shape.
+        :param series_count: number of series.
+        :param run_lengths_capacity: number of run lengths parameters are stored for.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def reserve(self, run_lengths_capacity: int) -> None:
+        """
+        Ensures parameters are stored for at least a given number of run lengths, keeping existing parameters.
+        :param run_lengths_capacity: a required number of run lengths.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def learn(self, rows: np.ndarray, learning_samples: np.ndarray) -> None:
+        """
+        Learns first parameters of a likelihood function for given series.
+        :param rows: indices of series to learn parameters for.
+        :param learning_samples: matrix of learning samples, a row per series.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def predict_log(self, observations: np.ndarray, run_lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for given observations based on stored parameters.
+        :param observations: an observation per series.
+        :param run_lengths: matrix of run lengths, a row per series and a column per run length hypothesis. A column
+            index differs from a run length after hypotheses are merged.
+        :return: matrix of logarithms of predictive probabilities, a row per series and a column per run length
+            (values for run lengths without parameters are arbitrary).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, observations: np.ndarray, rows: np.ndarray) -> None:
+        """
+        Updates parameters of given series according to the given observations.
+        :param observations: an observation per series.
+        :param rows: boolean mask of series to update.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def drop_run_lengths(self, rows: np.ndarray, start: int, stop: int) -> None:
+        """
+        Drops parameters of run lengths from start (inclusive) to stop (exclusive) for given series, shifting
+        parameters of the longer run lengths down.
+        :param rows: indices of series.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self, rows: np.ndarray) -> None:
+        """
+        Clears parameters of given series.
+        :param rows: indices of series.
+        """
+        raise NotImplementedError
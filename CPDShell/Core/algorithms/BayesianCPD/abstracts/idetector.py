@@ -8,9 +8,12 @@ __license__ = "SPDX-License-Identifier: MIT"
 
 
 from abc import ABC, abstractmethod
+from collections.abc import Hashable
 
 import numpy as np
 
+from CPDShell.Core.algorithms.snapshots import State
+
 
 class IDetector(ABC):
     """
@@ -32,3 +35,26 @@ class IDetector(ABC):
         Clears the detector's state.
         """
         raise NotImplementedError
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the configuration the detector's results depend on, e.g. its constructor arguments.
+        Results of Bayesian algorithm are cached only if all its components define it.
+        :return: the detector's parameters, None if results should not be cached.
+        """
+        return None
+
+    def get_state(self) -> State:
+        """
+        Returns the detector's state as arrays. Detectors should override it to support snapshots of Bayesian
+        algorithm.
+        :return: the detector's state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the detector's state returned by get_state.
+        :param state: the detector's state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
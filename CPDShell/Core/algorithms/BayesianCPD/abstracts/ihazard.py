@@ -8,9 +8,12 @@ __license__ = "SPDX-License-Identifier: MIT"
 
 
 from abc import ABC, abstractmethod
+from collections.abc import Hashable
 
 import numpy as np
 
+from CPDShell.Core.algorithms.snapshots import State
+
 
 class IHazard(ABC):
     """
@@ -25,3 +28,26 @@ class IHazard(ABC):
         :return: hazard function's values for given run lengths.
         """
         raise NotImplementedError
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the configuration the hazard function's results depend on, e.g. its constructor arguments.
+        Results of Bayesian algorithm are cached only if all its components define it.
+        :return: the hazard function's parameters, None if results should not be cached.
+        """
+        return None
+
+    def get_state(self) -> State:
+        """
+        Returns the hazard function's state as arrays. Hazard functions are usually stateless, so it is empty by
+        default.
+        :return: the hazard function's state.
+        """
+        return {}
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the hazard function's state returned by get_state.
+        :param state: the hazard function's state.
+        """
+        pass
@@ -8,10 +8,13 @@ __license__ = "SPDX-License-Identifier: MIT"
 
 
 from abc import ABC, abstractmethod
+from collections.abc import Hashable, Sequence
 
 import numpy as np
 import numpy.typing as npt
 
+from CPDShell.Core.algorithms.snapshots import State
+
 
 class ILikelihood(ABC):
     """
@@ -19,7 +22,7 @@ class ILikelihood(ABC):
     """
 
     @abstractmethod
-    def learn(self, learning_sample: list[float | np.float64]) -> None:
+    def learn(self, learning_sample: Sequence[float | np.float64] | np.ndarray) -> None:
         """
         Learns first parameters of a likelihood function on a given sample.
         :param learning_sample: a sample for parameter learning.
@@ -35,6 +38,35 @@ class ILikelihood(ABC):
         """
         ...
 
+    def sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns sufficient statistics of every observation, sums of them over a sample are enough to learn parameters.
+        Likelihoods should override it (with learn_from_statistics) to support rollback-aware Bayesian algorithm.
+        :param observations: observations from a sample.
+        :return: matrix of sufficient statistics, a row per observation.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support learning from sufficient statistics")
+
+    def learn_from_statistics(self, statistics: np.ndarray, sample_size: int) -> None:
+        """
+        Learns first parameters of a likelihood function from sums of sufficient statistics of a learning sample. It
+        should be equivalent to learn on the sample itself.
+        :param statistics: sums of sufficient statistics over a learning sample.
+        :param sample_size: size of a learning sample.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support learning from sufficient statistics")
+
+    def predict_log(self, observation: float | np.float64) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for a given observation based on stored parameters. By default
+        it takes a logarithm of predictive probabilities, likelihoods may override it with a closed form, which does
+        not underflow.
+        :param observation: an observation from a sample.
+        :return: logarithms of predictive probabilities for a given observation.
+        """
+        with np.errstate(divide="ignore"):
+            return np.log(np.asarray(self.predict(observation), dtype=np.float64))
+
     @abstractmethod
     def update(self, observation: float | np.float64) -> None:
         """
@@ -43,9 +75,41 @@ class ILikelihood(ABC):
         """
         raise NotImplementedError
 
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops parameters of run lengths from start (inclusive) to stop (exclusive), shifting parameters of the longer
+        run lengths down. Likelihoods should override it to support run lengths pruning in Bayesian algorithm.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support dropping run lengths")
+
     @abstractmethod
     def clear(self) -> None:
         """
         Clears likelihood function's state.
         """
         raise NotImplementedError
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the configuration the likelihood's results depend on, e.g. its constructor arguments.
+        Results of Bayesian algorithm are cached only if all its components define it.
+        :return: the likelihood's parameters, None if results should not be cached.
+        """
+        return None
+
+    def get_state(self) -> State:
+        """
+        Returns likelihood function's state as arrays. Likelihoods should override it to support snapshots of Bayesian
+        algorithm.
+        :return: likelihood function's state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores likelihood function's state returned by get_state.
+        :param state: likelihood function's state.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
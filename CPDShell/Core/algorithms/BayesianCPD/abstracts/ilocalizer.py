@@ -8,6 +8,7 @@ __license__ = "SPDX-License-Identifier: MIT"
 
 
 from abc import ABC, abstractmethod
+from collections.abc import Hashable
 
 import numpy as np
 
@@ -25,3 +26,11 @@ class ILocalizer(ABC):
         :return: run length corresponding with a change point.
         """
         raise NotImplementedError
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the configuration the localizer's results depend on, e.g. its constructor arguments.
+        Results of Bayesian algorithm are cached only if all its components define it.
+        :return: the localizer's parameters, None if results should not be cached.
+        """
+        return None
@@ -0,0 +1,31 @@
+"""
+Module for helpers managing preallocated buffers of per run length parameters of Bayesian CPD algorithm.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+
+INITIAL_CAPACITY = 64
+
+
+def reserve(buffer: np.ndarray, size: int, required_capacity: int) -> np.ndarray:
+    """
+    Returns a buffer able to hold at least the required number of elements (along the first axis), preserving the
+    first size elements of a given buffer. A capacity is at least doubled on reallocation, so growing a buffer one
+    element at a time costs amortized constant time.
+    :param buffer: a buffer to check.
+    :param size: number of meaningful elements in the buffer.
+    :param required_capacity: a required number of elements.
+    :return: the same buffer if it is large enough, a new larger buffer otherwise.
+    """
+    capacity = buffer.shape[0]
+    if capacity >= required_capacity:
+        return buffer
+
+    new_capacity = max(required_capacity, 2 * capacity, INITIAL_CAPACITY)
+    new_buffer = np.empty((new_capacity, *buffer.shape[1:]), dtype=buffer.dtype)
+    new_buffer[:size] = buffer[:size]
+    return new_buffer
@@ -0,0 +1,60 @@
+"""
+Module for implementation of Bayesian CPD algorithm batched detector analyzing drop of maximal run length's
+probability for several series.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ibatched_detector import IBatchedDetector
+
+
+class BatchedDropDetector(IBatchedDetector):
+    """
+    A detector that detects a change point in a series if the drop in the probability of its maximum run length
+    exceeds the threshold. It is a batched version of DropDetector, previous probabilities are stored per series.
+    """
+
+    def __init__(self, threshold: float):
+        """
+        Initializes the detector with given drop threshold.
+        :param threshold: threshold for a drop of the maximum run length's probability.
+        """
+        self.__previous_growth_probs = np.array([])
+
+        self._threshold = threshold
+        assert 0.0 <= self._threshold <= 1.0
+
+    def reset(self, series_count: int) -> None:
+        """
+        Clears the detector's state for all series.
+        :param series_count: number of series.
+        """
+        self.__previous_growth_probs = np.full(series_count, np.nan)
+
+    def detect(self, growth_probs: np.ndarray, run_lengths_counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Checks whether changepoints occurred with given growth probabilities at the time.
+        :param growth_probs: matrix of growth probabilities, a row per series and a column per run length.
+        :param run_lengths_counts: number of run lengths hypotheses per series.
+        :param rows: boolean mask of series to check.
+        :return: boolean mask of series where a changepoint occurred.
+        """
+        rows = rows & (run_lengths_counts > 0)
+        last_growth_probs = growth_probs[np.arange(growth_probs.shape[0]), np.maximum(run_lengths_counts - 1, 0)]
+
+        first_checks = rows & np.isnan(self.__previous_growth_probs)
+        self.__previous_growth_probs[first_checks] = last_growth_probs[first_checks]
+
+        drops = self.__previous_growth_probs - last_growth_probs
+        return rows & ~first_checks & (drops >= self._threshold)
+
+    def clear(self, rows: np.ndarray) -> None:
+        """
+        Clears the detector's state for given series.
+        :param rows: indices of series.
+        """
+        self.__previous_growth_probs[rows] = np.nan
@@ -0,0 +1,53 @@
+"""
+Module for implementation of Bayesian CPD algorithm batched detector comparing maximal run length's probability with
+a threshold for several series.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ibatched_detector import IBatchedDetector
+
+
+class BatchedSimpleDetector(IBatchedDetector):
+    """
+    A detector that detects a change point in a series if the probability of its maximum run length drops below the
+    threshold. It is a batched version of SimpleDetector.
+    """
+
+    def __init__(self, threshold: float):
+        """
+        Initializes the detector with given threshold.
+        :param threshold: lower threshold for the maximum run length's probability.
+        """
+        self._threshold = threshold
+        assert 0.0 <= self._threshold <= 1.0
+
+    def reset(self, series_count: int) -> None:
+        """
+        Clears the detector's state (for this detector it does nothing).
+        :param series_count: number of series.
+        """
+        pass
+
+    def detect(self, growth_probs: np.ndarray, run_lengths_counts: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Detects change points in series where the probability of the maximum run length drops below the threshold.
+        :param growth_probs: matrix of growth probabilities, a row per series and a column per run length.
+        :param run_lengths_counts: number of run lengths hypotheses per series.
+        :param rows: boolean mask of series to check.
+        :return: boolean mask of series where a changepoint occurred.
+        """
+        last_growth_probs = growth_probs[np.arange(growth_probs.shape[0]), np.maximum(run_lengths_counts - 1, 0)]
+        return rows & (run_lengths_counts > 0) & (last_growth_probs < self._threshold)
+
+    def clear(self, rows: np.ndarray) -> None:
+        """
+        Clears the detector's state for given series (for this detector it does nothing).
+        :param rows: indices of series.
+        """
+        pass
@@ -6,9 +6,12 @@ __author__ = "Alexey Tatyanenko"
 __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
+from collections.abc import Hashable
+
 import numpy as np
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.idetector import IDetector
+from CPDShell.Core.algorithms.snapshots import State, array_to_optional, optional_to_array
 
 
 class DropDetector(IDetector):
@@ -51,3 +54,24 @@ class DropDetector(IDetector):
         Clears the detector's state.
         """
         self.__previous_growth_prob = None
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the threshold of the detector.
+        :return: the detector's parameters.
+        """
+        return (self._threshold,)
+
+    def get_state(self) -> State:
+        """
+        Returns the detector's state: the previous probability of the maximum run length if it is known.
+        :return: the detector's state.
+        """
+        return {"previous_growth_prob": optional_to_array(self.__previous_growth_prob)}
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the detector's state returned by get_state.
+        :param state: the detector's state.
+        """
+        self.__previous_growth_prob = array_to_optional(state["previous_growth_prob"])
@@ -8,9 +8,12 @@ __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
 
+from collections.abc import Hashable
+
 import numpy as np
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.idetector import IDetector
+from CPDShell.Core.algorithms.snapshots import State
 
 
 class SimpleDetector(IDetector):
@@ -39,3 +42,24 @@ class SimpleDetector(IDetector):
         Clears the detector's state (for this detector it does nothing).
         """
         pass
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the threshold of the detector.
+        :return: the detector's parameters.
+        """
+        return (self._threshold,)
+
+    def get_state(self) -> State:
+        """
+        Returns the detector's state (for this detector it is empty).
+        :return: the detector's state.
+        """
+        return {}
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the detector's state (for this detector it does nothing).
+        :param state: the detector's state.
+        """
+        pass
@@ -8,6 +8,8 @@ __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
 
+from collections.abc import Hashable
+
 import numpy as np
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ihazard import IHazard
@@ -32,3 +34,10 @@ class ConstantHazard(IHazard):
         :return: hazard function's values for given run lengths.
         """
         return np.ones(len(run_lengths)) / self._rate
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the rate of an underlying exponential distribution.
+        :return: the hazard function's parameters.
+        """
+        return (self._rate,)
@@ -0,0 +1,226 @@
+"""
+Module for implementation of Bayesian CPD algorithm batched gaussian (normal) likelihood function with unknown mean and
+variance for several series. It uses normal-inverse gamma distribution as a conjugate prior function and Student's
+t-distribution as a predictive probability.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+from scipy import special
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ibatched_likelihood import IBatchedLikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+
+# Parameters values for run lengths without parameters, they keep predictive probabilities evaluation well-defined.
+_DEFAULT_MU = 0.0
+_DEFAULT_K = 1.0
+_DEFAULT_ALPHA = 1.0
+_DEFAULT_BETA = 1.0
+
+
+class BatchedGaussianUnknownMeanAndVariance(IBatchedLikelihood):
+    """
+    Likelihood for Gaussian (a.k.a. normal) distribution with unknown mean and variance for several series. It is a
+    batched version of GaussianUnknownMeanAndVariance: 4 parameters are stored as matrices with a row per series and a
+    column per run length, and all series are updated with a few vectorized operations.
+    """
+
+    def __init__(self):
+        """
+        Initializes model. There are no known parameters at this moment.
+        """
+        self.__mu_0 = np.array([])
+        self.__k_0 = np.array([])
+        self.__alpha_0 = np.array([])
+        self.__beta_0 = np.array([])
+
+        self.__mu_params = np.empty((0, 0))
+        self.__k_params = np.empty((0, 0))
+        self.__alpha_params = np.empty((0, 0))
+        self.__beta_params = np.empty((0, 0))
+
+        # Cached logarithms of Student's t-distribution normalizing constants per column. All series learn on samples
+        # of the same size, so degrees of freedom depend only on a run length, which is a column index unless
+        # hypotheses were merged. Constants of merged hypotheses are evaluated from alpha parameters.
+        self.__normalizers_alpha_0: float | None = None
+        self.__normalizers_size = 0
+        self.__log_normalizers = np.empty(INITIAL_CAPACITY)
+
+    def reset(self, series_count: int, run_lengths_capacity: int) -> None:
+        """
+        Clears parameters of all series and prepares matrices of a given shape.
+        :param series_count: number of series.
+        :param run_lengths_capacity: number of run lengths parameters are stored for.
+        """
+        shape = (series_count, run_lengths_capacity)
+        self.__mu_params = np.full(shape, _DEFAULT_MU)
+        self.__k_params = np.full(shape, _DEFAULT_K)
+        self.__alpha_params = np.full(shape, _DEFAULT_ALPHA)
+        self.__beta_params = np.full(shape, _DEFAULT_BETA)
+
+        self.__mu_0 = np.full(series_count, _DEFAULT_MU)
+        self.__k_0 = np.full(series_count, _DEFAULT_K)
+        self.__alpha_0 = np.full(series_count, _DEFAULT_ALPHA)
+        self.__beta_0 = np.full(series_count, _DEFAULT_BETA)
+
+    def reserve(self, run_lengths_capacity: int) -> None:
+        """
+        Ensures parameters are stored for at least a given number of run lengths, keeping existing parameters.
+        :param run_lengths_capacity: a required number of run lengths.
+        """
+        series_count, capacity = self.__mu_params.shape
+        if capacity >= run_lengths_capacity:
+            return
+
+        new_capacity = max(run_lengths_capacity, 2 * capacity)
+        params = []
+        for old_params, default in (
+            (self.__mu_params, _DEFAULT_MU),
+            (self.__k_params, _DEFAULT_K),
+            (self.__alpha_params, _DEFAULT_ALPHA),
+            (self.__beta_params, _DEFAULT_BETA),
+        ):
+            new_params = np.full((series_count, new_capacity), default)
+            new_params[:, :capacity] = old_params
+            params.append(new_params)
+
+        self.__mu_params, self.__k_params, self.__alpha_params, self.__beta_params = params
+
+    def learn(self, rows: np.ndarray, learning_samples: np.ndarray) -> None:
+        """
+        Learns first prior parameters for given series, like GaussianUnknownMeanAndVariance does.
+        :param rows: indices of series to learn parameters for.
+        :param learning_samples: matrix of learning samples, a row per series.
+        """
+        sample_size = learning_samples.shape[1]
+        self.__mu_0[rows] = learning_samples.mean(axis=1)
+        self.__beta_0[rows] = ((learning_samples - self.__mu_0[rows, np.newaxis]) ** 2).sum(axis=1) / 2.0
+        self.__k_0[rows] = sample_size
+        self.__alpha_0[rows] = sample_size / 2.0
+
+        self.__mu_params[rows, 0] = self.__mu_0[rows]
+        self.__k_params[rows, 0] = self.__k_0[rows]
+        self.__alpha_params[rows, 0] = self.__alpha_0[rows]
+        self.__beta_params[rows, 0] = self.__beta_0[rows]
+
+        if self.__normalizers_alpha_0 != sample_size / 2.0:
+            self.__normalizers_alpha_0 = sample_size / 2.0
+            self.__normalizers_size = 0
+
+    def predict_log(self, observations: np.ndarray, run_lengths: np.ndarray) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for given observations based on posterior parameters, evaluated
+        with a closed form of Student's t-distribution log density with 2 * alpha degrees of freedom.
+        :param observations: an observation per series.
+        :param run_lengths: matrix of run lengths, a row per series and a column per run length hypothesis.
+        :return: matrix of logarithms of predictive probabilities, a row per series and a column per run length.
+        """
+        degrees_of_freedom = 2.0 * self.__alpha_params
+        scales = (self.__beta_params * (self.__k_params + 1.0)) / (self.__alpha_params * self.__k_params)
+        squared_deviations = ((observations[:, np.newaxis] - self.__mu_params) / scales) ** 2
+
+        capacity = self.__mu_params.shape[1]
+        log_normalizers = self.__get_log_normalizers(capacity)
+        merged = run_lengths != np.arange(capacity)
+        if merged.any():
+            log_normalizers = np.broadcast_to(log_normalizers, merged.shape).copy()
+            log_normalizers[merged] = self.__log_normalizers_of(degrees_of_freedom[merged])
+
+        return (
+            log_normalizers
+            - np.log(scales)
+            - 0.5 * (degrees_of_freedom + 1.0) * np.log1p(squared_deviations / degrees_of_freedom)
+        )
+
+    def update(self, observations: np.ndarray, rows: np.ndarray) -> None:
+        """
+        Updates parameters of given series, calculating posterior parameters. Parameters of the longest stored run
+        length are dropped, so the shape of matrices does not change.
+        :param observations: an observation per series.
+        :param rows: boolean mask of series to update.
+        """
+        selected: np.ndarray | slice = slice(None) if rows.all() else np.flatnonzero(rows)
+        new_observations = observations[selected, np.newaxis]
+
+        mu_params = self.__mu_params[selected, :-1]
+        k_params = self.__k_params[selected, :-1]
+
+        self.__beta_params[selected, 1:] = self.__beta_params[selected, :-1] + k_params * (
+            new_observations - mu_params
+        ) ** 2 / (2.0 * k_params + 1.0)
+        self.__mu_params[selected, 1:] = (mu_params * k_params + new_observations) / (k_params + 1.0)
+        self.__k_params[selected, 1:] = k_params + 1.0
+        self.__alpha_params[selected, 1:] = self.__alpha_params[selected, :-1] + 0.5
+
+        self.__mu_params[selected, 0] = self.__mu_0[selected]
+        self.__k_params[selected, 0] = self.__k_0[selected]
+        self.__alpha_params[selected, 0] = self.__alpha_0[selected]
+        self.__beta_params[selected, 0] = self.__beta_0[selected]
+
+    def drop_run_lengths(self, rows: np.ndarray, start: int, stop: int) -> None:
+        """
+        Drops parameters of run lengths from start (inclusive) to stop (exclusive) for given series, shifting
+        parameters of the longer run lengths down.
+        :param rows: indices of series.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        capacity = self.__mu_params.shape[1]
+        new_size = capacity - (stop - start)
+        for params, default in (
+            (self.__mu_params, _DEFAULT_MU),
+            (self.__k_params, _DEFAULT_K),
+            (self.__alpha_params, _DEFAULT_ALPHA),
+            (self.__beta_params, _DEFAULT_BETA),
+        ):
+            params[rows, start:new_size] = params[rows, stop:capacity]
+            params[rows, new_size:capacity] = default
+
+    def clear(self, rows: np.ndarray) -> None:
+        """
+        Clears parameters of given series.
+        :param rows: indices of series.
+        """
+        self.__mu_params[rows] = _DEFAULT_MU
+        self.__k_params[rows] = _DEFAULT_K
+        self.__alpha_params[rows] = _DEFAULT_ALPHA
+        self.__beta_params[rows] = _DEFAULT_BETA
+
+        self.__mu_0[rows] = _DEFAULT_MU
+        self.__k_0[rows] = _DEFAULT_K
+        self.__alpha_0[rows] = _DEFAULT_ALPHA
+        self.__beta_0[rows] = _DEFAULT_BETA
+
+    def __get_log_normalizers(self, size: int) -> np.ndarray:
+        """
+        Returns logarithms of Student's t-distribution normalizing constants for the first run lengths, evaluating only
+        the ones missing in the cache.
+        :param size: number of run lengths.
+        :return: logarithms of normalizing constants.
+        """
+        cached_size = self.__normalizers_size
+        if cached_size < size:
+            alpha_0 = self.__normalizers_alpha_0 if self.__normalizers_alpha_0 is not None else _DEFAULT_ALPHA
+            self.__log_normalizers = reserve(self.__log_normalizers, cached_size, size)
+            self.__log_normalizers[cached_size:size] = self.__log_normalizers_of(
+                2.0 * alpha_0 + np.arange(cached_size, size)
+            )
+            self.__normalizers_size = size
+
+        return self.__log_normalizers[:size]
+
+    @staticmethod
+    def __log_normalizers_of(degrees_of_freedom: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of Student's t-distribution normalizing constants.
+        :param degrees_of_freedom: degrees of freedom.
+        :return: logarithms of normalizing constants.
+        """
+        return (
+            special.gammaln((degrees_of_freedom + 1.0) / 2.0)
+            - special.gammaln(degrees_of_freedom / 2.0)
+            - 0.5 * np.log(degrees_of_freedom * np.pi)
+        )
@@ -0,0 +1,50 @@
+"""
+Module for implementation of Bayesian CPD algorithm Bernoulli likelihood function with unknown probability of success.
+It uses beta distribution as a conjugate prior function and Bernoulli distribution with the posterior mean as a
+predictive probability.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.conjugate_likelihood import ConjugateLikelihood
+
+
+class BernoulliUnknownProbability(ConjugateLikelihood):
+    """
+    Likelihood for Bernoulli distribution (e.g. error indicators) with unknown probability of success estimated from
+    beta distribution with parameters alpha and beta as a conjugate prior. The prior is beta(1, 1) updated with the
+    learning sample.
+    """
+
+    def _initial_hyperparameters(self) -> np.ndarray:
+        """
+        Returns parameters of the initial (uniform) beta prior.
+        :return: vector (alpha, beta).
+        """
+        return np.array([1.0, 1.0])
+
+    def _sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns increments of alpha (a success) and beta (a failure) for given observations.
+        :param observations: vector of observations (zeros and ones).
+        :return: matrix of increments, a row per observation.
+        """
+        return np.column_stack([observations, 1.0 - observations])
+
+    def _predict_log(self, observation: float | np.float64, params: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of predictive probabilities of an observation.
+        :param observation: an observation from a sample (zero or one).
+        :param params: matrix of hyperparameters (alpha, beta), a row per run length.
+        :return: logarithms of predictive probabilities, one per row of hyperparameters.
+        """
+        alpha_params = params[:, 0]
+        beta_params = params[:, 1]
+        if observation not in (0, 1):
+            return np.full(alpha_params.shape[0], -np.inf)
+
+        return np.log(alpha_params if observation == 1 else beta_params) - np.log(alpha_params + beta_params)
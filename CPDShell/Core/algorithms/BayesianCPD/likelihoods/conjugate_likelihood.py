@@ -0,0 +1,176 @@
+"""
+Module for Bayesian CPD algorithm base class of likelihood functions with conjugate priors from exponential family.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+from abc import abstractmethod
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.snapshots import State
+
+
+class ConjugateLikelihood(ILikelihood):
+    """
+    Base class for likelihoods of exponential family distributions with conjugate priors, whose hyperparameters are
+    updated by adding sufficient statistics of an observation. Hyperparameters for all run lengths are stored as rows
+    of a preallocated matrix, so an update is a single vectorized addition, and predictive probabilities are evaluated
+    in closed form in log space.
+
+    A subclass defines initial (flat) hyperparameters, sufficient statistics and a log predictive density. Prior
+    hyperparameters are the initial ones updated with the whole learning sample.
+    """
+
+    def __init__(self):
+        """
+        Initializes model. There are no known parameters at this moment.
+        """
+        self.__prior: np.ndarray | None = None
+
+        # Hyperparameters are stored in a preallocated buffer, only the first self.__size rows are meaningful, a row's
+        # index corresponds to a run length.
+        self.__size = 0
+        self.__params = np.empty((INITIAL_CAPACITY, self._initial_hyperparameters().shape[0]))
+
+    @abstractmethod
+    def _initial_hyperparameters(self) -> np.ndarray:
+        """
+        Returns hyperparameters of a prior before learning.
+        :return: vector of hyperparameters.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns increments of hyperparameters for given observations.
+        :param observations: vector of observations.
+        :return: matrix of increments, a row per observation.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _predict_log(self, observation: float | np.float64, params: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of posterior predictive probabilities of an observation.
+        :param observation: an observation from a sample.
+        :param params: matrix of hyperparameters, a row per run length.
+        :return: logarithms of predictive probabilities, one per row of hyperparameters.
+        """
+        raise NotImplementedError
+
+    def learn(self, learning_sample: Sequence[float | np.float64] | np.ndarray) -> None:
+        """
+        Learns prior hyperparameters, updating initial hyperparameters with the learning sample.
+        :param learning_sample: a sample for parameter learning.
+        """
+        observations = np.asarray(learning_sample, dtype=np.float64)
+        self.__prior = self._initial_hyperparameters() + self._sufficient_statistics(observations).sum(axis=0)
+
+        self.__size = 1
+        self.__params[0] = self.__prior
+
+    def sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns increments of hyperparameters for every observation.
+        :param observations: observations from a sample.
+        :return: matrix of increments, a row per observation.
+        """
+        return self._sufficient_statistics(np.asarray(observations, dtype=np.float64))
+
+    def learn_from_statistics(self, statistics: np.ndarray, sample_size: int) -> None:
+        """
+        Learns prior hyperparameters from summed increments of a learning sample.
+        :param statistics: sums of increments of hyperparameters over a learning sample.
+        :param sample_size: size of a learning sample.
+        """
+        self.__prior = self._initial_hyperparameters() + statistics
+
+        self.__size = 1
+        self.__params[0] = self.__prior
+
+    def update(self, observation: float | np.float64) -> None:
+        """
+        Updates hyperparameters for every run length by adding sufficient statistics of the observation, and sets prior
+        hyperparameters for zero run length.
+        :param observation: an observation from a sample.
+        """
+        size = self.__size
+        self.__params = reserve(self.__params, size, size + 1)
+
+        statistics = self._sufficient_statistics(np.array([observation], dtype=np.float64))[0]
+        np.add(self.__params[:size], statistics, out=self.__params[1 : size + 1])
+        self.__params[0] = self.__prior
+        self.__size = size + 1
+
+    def predict(self, observation: float | np.float64) -> npt.ArrayLike:
+        """
+        Returns predictive probabilities for a given observation based on posterior hyperparameters.
+        :param observation: an observation from a sample.
+        :return: predictive probabilities for a given observation.
+        """
+        return np.exp(self.predict_log(observation))
+
+    def predict_log(self, observation: float | np.float64) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for a given observation based on posterior hyperparameters.
+        :param observation: an observation from a sample.
+        :return: logarithms of predictive probabilities for a given observation.
+        """
+        return self._predict_log(observation, self.__params[: self.__size])
+
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops hyperparameters of run lengths from start (inclusive) to stop (exclusive), shifting hyperparameters of
+        the longer run lengths down in place.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        assert 0 < start <= stop <= self.__size
+        new_size = self.__size - (stop - start)
+        self.__params[start:new_size] = self.__params[stop : self.__size]
+        self.__size = new_size
+
+    def clear(self) -> None:
+        """
+        Clears hyperparameters. Allocated buffer is kept to be reused.
+        """
+        self.__prior = None
+        self.__size = 0
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        The likelihood has no parameters, its results depend only on a learning sample and observations.
+        :return: the likelihood's parameters.
+        """
+        return ()
+
+    def get_state(self) -> State:
+        """
+        Returns prior hyperparameters and posterior hyperparameters for all run lengths.
+        :return: likelihood function's state.
+        """
+        state: State = {"params": self.__params[: self.__size].copy()}
+        if self.__prior is not None:
+            state["prior"] = self.__prior.copy()
+
+        return state
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores prior and posterior hyperparameters returned by get_state.
+        :param state: likelihood function's state.
+        """
+        self.__prior = state["prior"].copy() if "prior" in state else None
+
+        size = state["params"].shape[0]
+        self.__params = reserve(self.__params, 0, size)
+        self.__params[:size] = state["params"]
+        self.__size = size
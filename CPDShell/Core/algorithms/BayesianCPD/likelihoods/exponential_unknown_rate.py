@@ -0,0 +1,53 @@
+"""
+Module for implementation of Bayesian CPD algorithm exponential likelihood function with unknown rate. It uses gamma
+distribution as a conjugate prior function and Lomax distribution as a predictive probability.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.conjugate_likelihood import ConjugateLikelihood
+
+
+class ExponentialUnknownRate(ConjugateLikelihood):
+    """
+    Likelihood for exponential distribution (e.g. inter-arrival times) with unknown rate estimated from gamma
+    distribution with shape alpha and rate beta as a conjugate prior. The prior is gamma(1, 0) updated with the
+    learning sample.
+    """
+
+    def _initial_hyperparameters(self) -> np.ndarray:
+        """
+        Returns shape and rate of the initial gamma prior.
+        :return: vector (alpha, beta).
+        """
+        return np.array([1.0, 0.0])
+
+    def _sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns increments of shape (one) and rate (an observation) for given observations.
+        :param observations: vector of observations.
+        :return: matrix of increments, a row per observation.
+        """
+        return np.column_stack([np.ones_like(observations), observations])
+
+    def _predict_log(self, observation: float | np.float64, params: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of Lomax predictive probabilities of an observation.
+        :param observation: an observation from a sample.
+        :param params: matrix of hyperparameters (alpha, beta), a row per run length.
+        :return: logarithms of predictive probabilities, one per row of hyperparameters.
+        """
+        alpha_params = params[:, 0]
+        beta_params = params[:, 1]
+        if observation < 0:
+            return np.full(alpha_params.shape[0], -np.inf)
+
+        return (
+            np.log(alpha_params)
+            + alpha_params * np.log(beta_params)
+            - (alpha_params + 1.0) * np.log(beta_params + observation)
+        )
@@ -8,11 +8,15 @@ __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
 
+from collections.abc import Hashable, Sequence
+
 import numpy as np
 import numpy.typing as npt
 from scipy import stats
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.snapshots import State
 
 
 class GaussianLikelihood(ILikelihood):
@@ -24,8 +28,11 @@ class GaussianLikelihood(ILikelihood):
         """
         Initializes the GaussianLikelihood, parametrized by mean and standard deviation (without any concrete values).
         """
-        self.__means = np.array([])
-        self.__standard_deviations = np.array([])
+        # Parameters are stored in preallocated buffers, which are reused after clearing. Only the first
+        # self.__size elements are meaningful.
+        self.__size = 0
+        self.__means = np.empty(INITIAL_CAPACITY)
+        self.__standard_deviations = np.empty(INITIAL_CAPACITY)
 
         self.__sample_sum = 0.0
         self.__squared_sample_sum = 0.0
@@ -39,20 +46,23 @@ class GaussianLikelihood(ILikelihood):
         new_mean = self.__sample_sum / self.__gap_size
         variance = (self.__squared_sample_sum - (self.__sample_sum**2.0) / self.__gap_size) / (self.__gap_size - 1)
         assert variance > 0.0
-        assert len(self.__means) == len(self.__standard_deviations)
 
         new_standard_deviation = np.sqrt(variance)
 
-        self.__means = np.append(self.__means, new_mean)
-        self.__standard_deviations = np.append(self.__standard_deviations, new_standard_deviation)
+        self.__means = reserve(self.__means, self.__size, self.__size + 1)
+        self.__standard_deviations = reserve(self.__standard_deviations, self.__size, self.__size + 1)
+
+        self.__means[self.__size] = new_mean
+        self.__standard_deviations[self.__size] = new_standard_deviation
+        self.__size += 1
 
-    def learn(self, learning_sample: list[float | np.float64]) -> None:
+    def learn(self, learning_sample: Sequence[float | np.float64] | np.ndarray) -> None:
         """
         Learns first mean and stander deviations from a given sample.
         :param learning_sample: a sample for parameter learning.
         :return:
         """
-        assert len(self.__means) == len(self.__standard_deviations) == 0
+        assert self.__size == 0
         assert self.__gap_size == 0
 
         self.__sample_sum += sum(learning_sample)
@@ -64,6 +74,28 @@ class GaussianLikelihood(ILikelihood):
 
         self.__update_parameters_lists()
 
+    def sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns sufficient statistics of every observation: the observation and its square.
+        :param observations: observations from a sample.
+        :return: matrix of sufficient statistics, a row per observation.
+        """
+        return np.column_stack([observations, observations**2.0])
+
+    def learn_from_statistics(self, statistics: np.ndarray, sample_size: int) -> None:
+        """
+        Learns first mean and standard deviation from sums of observations and their squares.
+        :param statistics: sums of observations and their squares over a learning sample.
+        :param sample_size: size of a learning sample.
+        """
+        assert self.__size == 0
+        assert self.__gap_size == 0
+
+        self.__sample_sum, self.__squared_sample_sum = (float(value) for value in statistics)
+        self.__gap_size = sample_size
+
+        self.__update_parameters_lists()
+
     def update(self, observation: float | np.float64) -> None:
         """
         Updates the means and standard deviations lists according to the given observation.
@@ -82,16 +114,62 @@ class GaussianLikelihood(ILikelihood):
         :param observation: an observation from a sample.
         :return: predictive probabilities for a given observation.
         """
-        return stats.norm(self.__means, self.__standard_deviations).pdf(observation)
+        return stats.norm(self.__means[: self.__size], self.__standard_deviations[: self.__size]).pdf(observation)
+
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops means and standard deviations from start (inclusive) to stop (exclusive), shifting the following ones
+        down in place.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        assert 0 < start <= stop <= self.__size
+        new_size = self.__size - (stop - start)
+        self.__means[start:new_size] = self.__means[stop : self.__size]
+        self.__standard_deviations[start:new_size] = self.__standard_deviations[stop : self.__size]
+        self.__size = new_size
 
     def clear(self):
         """
-        Clears parameters of gaussian likelihood.
+        Clears parameters of gaussian likelihood. Allocated buffers are kept to be reused.
         :return:
         """
-        self.__means = []
-        self.__standard_deviations = []
+        self.__size = 0
 
         self.__sample_sum = 0.0
         self.__squared_sample_sum = 0.0
         self.__gap_size = 0
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        The likelihood has no parameters, its results depend only on a learning sample and observations.
+        :return: the likelihood's parameters.
+        """
+        return ()
+
+    def get_state(self) -> State:
+        """
+        Returns accumulated sums and means and standard deviations for all run lengths.
+        :return: likelihood function's state.
+        """
+        return {
+            "means": self.__means[: self.__size].copy(),
+            "standard_deviations": self.__standard_deviations[: self.__size].copy(),
+            "sums": np.array([self.__sample_sum, self.__squared_sample_sum]),
+            "gap_size": np.array(self.__gap_size),
+        }
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores accumulated sums, means and standard deviations returned by get_state.
+        :param state: likelihood function's state.
+        """
+        size = state["means"].shape[0]
+        self.__means = reserve(self.__means, 0, size)
+        self.__standard_deviations = reserve(self.__standard_deviations, 0, size)
+        self.__means[:size] = state["means"]
+        self.__standard_deviations[:size] = state["standard_deviations"]
+        self.__size = size
+
+        self.__sample_sum, self.__squared_sample_sum = (float(value) for value in state["sums"])
+        self.__gap_size = int(state["gap_size"])
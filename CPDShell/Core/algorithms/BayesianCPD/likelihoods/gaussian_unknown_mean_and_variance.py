@@ -8,11 +8,15 @@ __author__ = "Alexey Tatyanenko"
 __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
+from collections.abc import Hashable, Sequence
+
 import numpy as np
 import numpy.typing as npt
-from scipy import stats
+from scipy import special
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.snapshots import State, array_to_optional, optional_to_array
 
 
 class GaussianUnknownMeanAndVariance(ILikelihood):
@@ -32,53 +36,124 @@ class GaussianUnknownMeanAndVariance(ILikelihood):
         self.__alpha_0 = None
         self.__beta_0 = None
 
-        self.__mu_params = np.array([])
-        self.__k_params = np.array([])
-        self.__alpha_params = np.array([])
-        self.__beta_params = np.array([])
+        # Parameters are stored in preallocated buffers, which are reused after clearing. Only the first
+        # self.__size elements are meaningful, an element's index corresponds to a run length.
+        self.__size = 0
+        self.__mu_params = np.empty(INITIAL_CAPACITY)
+        self.__k_params = np.empty(INITIAL_CAPACITY)
+        self.__alpha_params = np.empty(INITIAL_CAPACITY)
+        self.__beta_params = np.empty(INITIAL_CAPACITY)
+
+        # Scratch buffers for evaluating new parameters without temporary arrays.
+        self.__first_scratch = np.empty(INITIAL_CAPACITY)
+        self.__second_scratch = np.empty(INITIAL_CAPACITY)
+
+        # Cached logarithms of Student's t-distribution normalizing constants. Degrees of freedom for run length r are
+        # 2 * alpha_0 + r, so the constants depend only on alpha_0 and stay valid until it changes. They are cached by
+        # position, which is the run length only before the first position shifted by dropping run lengths, the
+        # constants after it are evaluated from alpha parameters.
+        self.__normalizers_alpha_0: float | None = None
+        self.__normalizers_size = 0
+        self.__log_normalizers = np.empty(INITIAL_CAPACITY)
+        self.__shifted_start = 0
 
-    def learn(self, learning_sample: list[float | np.float64]) -> None:
+    def learn(self, learning_sample: Sequence[float | np.float64] | np.ndarray) -> None:
         """
         Learns first prior parameters. Can be interpreted as mean was estimated from k_0 observations with sample mean
         mu_0, and precision was estimated from 2 * alpha observations with sample mean mu_0 and sum of squared
         deviations 2 * beta.
         :param learning_sample: a sample for parameter learning.
         """
-        data = np.array(learning_sample)
+        data = np.asarray(learning_sample)
         sample_size = data.shape[0]
         self.__mu_0 = data.mean()
         self.__beta_0 = ((data - self.__mu_0) ** 2).sum() / 2.0
         self.__k_0 = sample_size
         self.__alpha_0 = sample_size / 2.0
 
-        self.__mu_params = np.array([self.__mu_0])
-        self.__k_params = np.array([self.__k_0])
-        self.__alpha_params = np.array([self.__alpha_0])
-        self.__beta_params = np.array([self.__beta_0])
+        self.__size = 1
+        self.__shifted_start = 1
+        self.__mu_params[0] = self.__mu_0
+        self.__k_params[0] = self.__k_0
+        self.__alpha_params[0] = self.__alpha_0
+        self.__beta_params[0] = self.__beta_0
+
+    def sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns sufficient statistics of every observation: the observation and its square.
+        :param observations: observations from a sample.
+        :return: matrix of sufficient statistics, a row per observation.
+        """
+        return np.column_stack([observations, observations**2])
+
+    def learn_from_statistics(self, statistics: np.ndarray, sample_size: int) -> None:
+        """
+        Learns first prior parameters like learn does, evaluating the sum of squared deviations from sums of
+        observations and their squares.
+        :param statistics: sums of observations and their squares over a learning sample.
+        :param sample_size: size of a learning sample.
+        """
+        observations_sum, squares_sum = statistics
+        self.__mu_0 = observations_sum / sample_size
+        # The difference may be slightly negative because of rounding errors.
+        self.__beta_0 = max(squares_sum - observations_sum * self.__mu_0, 0.0) / 2.0
+        self.__k_0 = sample_size
+        self.__alpha_0 = sample_size / 2.0
+
+        self.__size = 1
+        self.__shifted_start = 1
+        self.__mu_params[0] = self.__mu_0
+        self.__k_params[0] = self.__k_0
+        self.__alpha_params[0] = self.__alpha_0
+        self.__beta_params[0] = self.__beta_0
 
     def update(self, observation: float | np.float64) -> None:
         """
         Updates 4 parameters arrays of normal-inverse gamma conjugate prior, calculating posterior parameters.
+        Parameters are updated in place: posterior parameters for run length r + 1 are evaluated from parameters for
+        run length r, and prior parameters are set for zero run length.
         :param observation: an observation from a sample.
         """
-        mu_divider = self.__k_params + 1.0
-        assert np.count_nonzero(mu_divider) == mu_divider.shape[0]
+        size = self.__size
+        self.__reserve(size + 1)
 
-        beta_divider = 2.0 * self.__k_params + 1.0
-        assert np.count_nonzero(beta_divider) == beta_divider.shape[0]
+        k_params = self.__k_params[:size]
+        mu_params = self.__mu_params[:size]
+        first_scratch = self.__first_scratch[:size]
+        second_scratch = self.__second_scratch[:size]
 
-        new_mu_params = np.append([self.__mu_0], (self.__mu_params * self.__k_params + observation) / mu_divider)
-        new_k_params = np.append([self.__k_0], self.__k_params + 1.0)
-        new_alpha_params = np.append([self.__alpha_0], self.__alpha_params + 0.5)
-        new_beta_params = np.append(
-            [self.__beta_0],
-            self.__beta_params + self.__k_params * (observation - self.__mu_params) ** 2 / beta_divider,
-        )
+        # beta + k * (observation - mu) ** 2 / (2 * k + 1)
+        np.subtract(observation, mu_params, out=first_scratch)
+        np.square(first_scratch, out=first_scratch)
+        np.multiply(first_scratch, k_params, out=first_scratch)
+        np.multiply(k_params, 2.0, out=second_scratch)
+        np.add(second_scratch, 1.0, out=second_scratch)
+        assert np.count_nonzero(second_scratch) == size
+        np.divide(first_scratch, second_scratch, out=first_scratch)
+        np.add(first_scratch, self.__beta_params[:size], out=first_scratch)
+        self.__beta_params[1 : size + 1] = first_scratch
+
+        # (mu * k + observation) / (k + 1)
+        np.multiply(mu_params, k_params, out=first_scratch)
+        np.add(first_scratch, observation, out=first_scratch)
+        np.add(k_params, 1.0, out=second_scratch)
+        assert np.count_nonzero(second_scratch) == size
+        np.divide(first_scratch, second_scratch, out=first_scratch)
+        self.__mu_params[1 : size + 1] = first_scratch
+
+        # k + 1
+        self.__k_params[1 : size + 1] = second_scratch
 
-        self.__mu_params = new_mu_params
-        self.__k_params = new_k_params
-        self.__alpha_params = new_alpha_params
-        self.__beta_params = new_beta_params
+        # alpha + 0.5
+        np.add(self.__alpha_params[:size], 0.5, out=first_scratch)
+        self.__alpha_params[1 : size + 1] = first_scratch
+
+        self.__mu_params[0] = self.__mu_0
+        self.__k_params[0] = self.__k_0
+        self.__alpha_params[0] = self.__alpha_0
+        self.__beta_params[0] = self.__beta_0
+        self.__size = size + 1
+        self.__shifted_start = min(self.__shifted_start, size) + 1
 
     def predict(self, observation: float | np.float64) -> npt.ArrayLike:
         """
@@ -87,32 +162,162 @@ class GaussianUnknownMeanAndVariance(ILikelihood):
         :param observation: an observation from a sample.
         :return: predictive probabilities for a given observation.
         """
+        return np.exp(self.predict_log(observation))
+
+    def predict_log(self, observation: float | np.float64) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for a given observation based on posterior parameters, evaluated
+        with a closed form of Student's t-distribution log density.
+        :param observation: an observation from a sample.
+        :return: logarithms of predictive probabilities for a given observation.
+        """
+        size = self.__size
+        mu_params = self.__mu_params[:size]
+        k_params = self.__k_params[:size]
+        alpha_params = self.__alpha_params[:size]
+        beta_params = self.__beta_params[:size]
 
-        scales_divider = self.__alpha_params * self.__k_params
+        scales_divider = alpha_params * k_params
         assert np.count_nonzero(scales_divider) == scales_divider.shape[0]
 
-        degrees_of_freedom = 2.0 * self.__alpha_params
-        scales = (self.__beta_params * (self.__k_params + 1.0)) / scales_divider
+        degrees_of_freedom = 2.0 * alpha_params
+        scales = (beta_params * (k_params + 1.0)) / scales_divider
+        squared_deviations = ((observation - mu_params) / scales) ** 2
 
-        predictive_probabilities = stats.t.pdf(
-            x=observation,
-            df=degrees_of_freedom,
-            loc=self.__mu_params,
-            scale=scales,
+        return (
+            self.__get_log_normalizers(degrees_of_freedom)
+            - np.log(scales)
+            - 0.5 * (degrees_of_freedom + 1.0) * np.log1p(squared_deviations / degrees_of_freedom)
         )
 
-        return predictive_probabilities
+    def __get_log_normalizers(self, degrees_of_freedom: np.ndarray) -> np.ndarray:
+        """
+        Returns logarithms of Student's t-distribution normalizing constants for all run lengths, evaluating only the
+        ones missing in the cache and the ones after the first shifted position.
+        :param degrees_of_freedom: degrees of freedom for all run lengths.
+        :return: logarithms of normalizing constants.
+        """
+        if self.__normalizers_alpha_0 != self.__alpha_0:
+            self.__normalizers_alpha_0 = self.__alpha_0
+            self.__normalizers_size = 0
+
+        size = degrees_of_freedom.shape[0]
+        unshifted_size = min(self.__shifted_start, size)
+        cached_size = self.__normalizers_size
+        if cached_size < unshifted_size:
+            self.__log_normalizers = reserve(self.__log_normalizers, cached_size, unshifted_size)
+            self.__log_normalizers[cached_size:unshifted_size] = self.__log_normalizers_of(
+                degrees_of_freedom[cached_size:unshifted_size]
+            )
+            self.__normalizers_size = unshifted_size
+
+        if unshifted_size == size:
+            return self.__log_normalizers[:size]
+        return np.concatenate(
+            [self.__log_normalizers[:unshifted_size], self.__log_normalizers_of(degrees_of_freedom[unshifted_size:])]
+        )
+
+    @staticmethod
+    def __log_normalizers_of(degrees_of_freedom: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of Student's t-distribution normalizing constants.
+        :param degrees_of_freedom: degrees of freedom.
+        :return: logarithms of normalizing constants.
+        """
+        return (
+            special.gammaln((degrees_of_freedom + 1.0) / 2.0)
+            - special.gammaln(degrees_of_freedom / 2.0)
+            - 0.5 * np.log(degrees_of_freedom * np.pi)
+        )
+
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops posterior parameters of run lengths from start (inclusive) to stop (exclusive), shifting parameters of
+        the longer run lengths down in place.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        assert 0 < start <= stop <= self.__size
+        new_size = self.__size - (stop - start)
+        for params in (self.__mu_params, self.__k_params, self.__alpha_params, self.__beta_params):
+            params[start:new_size] = params[stop : self.__size]
+
+        if start < stop:
+            self.__shifted_start = min(self.__shifted_start, start)
+        self.__size = new_size
 
     def clear(self) -> None:
         """
-        Clears parameters of gaussian likelihood.
+        Clears parameters of gaussian likelihood. Allocated buffers are kept to be reused.
         """
         self.__mu_0 = None
         self.__k_0 = None
         self.__alpha_0 = None
         self.__beta_0 = None
 
-        self.__mu_params = np.array([])
-        self.__k_params = np.array([])
-        self.__alpha_params = np.array([])
-        self.__beta_params = np.array([])
+        self.__size = 0
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        The likelihood has no parameters, its results depend only on a learning sample and observations.
+        :return: the likelihood's parameters.
+        """
+        return ()
+
+    def get_state(self) -> State:
+        """
+        Returns prior parameters and posterior parameters for all run lengths.
+        :return: likelihood function's state.
+        """
+        size = self.__size
+        return {
+            "mu_0": optional_to_array(self.__mu_0),
+            "k_0": optional_to_array(self.__k_0),
+            "alpha_0": optional_to_array(self.__alpha_0),
+            "beta_0": optional_to_array(self.__beta_0),
+            "mu_params": self.__mu_params[:size].copy(),
+            "k_params": self.__k_params[:size].copy(),
+            "alpha_params": self.__alpha_params[:size].copy(),
+            "beta_params": self.__beta_params[:size].copy(),
+        }
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores prior and posterior parameters returned by get_state.
+        :param state: likelihood function's state.
+        """
+        self.__mu_0 = array_to_optional(state["mu_0"])
+        self.__k_0 = array_to_optional(state["k_0"])
+        self.__alpha_0 = array_to_optional(state["alpha_0"])
+        self.__beta_0 = array_to_optional(state["beta_0"])
+
+        size = state["mu_params"].shape[0]
+        self.__size = 0
+        self.__reserve(size)
+        self.__mu_params[:size] = state["mu_params"]
+        self.__k_params[:size] = state["k_params"]
+        self.__alpha_params[:size] = state["alpha_params"]
+        self.__beta_params[:size] = state["beta_params"]
+        self.__size = size
+
+        # Positions after a merged run length are shifted, so their alpha parameters differ from the ones of run
+        # lengths equal to positions.
+        if self.__alpha_0 is None:
+            self.__shifted_start = size
+        else:
+            expected_alpha_params = self.__alpha_0 + 0.5 * np.arange(size)
+            shifted = np.flatnonzero(self.__alpha_params[:size] != expected_alpha_params)
+            self.__shifted_start = int(shifted[0]) if shifted.shape[0] > 0 else size
+
+    def __reserve(self, required_capacity: int) -> None:
+        """
+        Ensures that parameters buffers can hold the required number of run lengths.
+        :param required_capacity: a required number of run lengths.
+        """
+        size = self.__size
+        self.__mu_params = reserve(self.__mu_params, size, required_capacity)
+        self.__k_params = reserve(self.__k_params, size, required_capacity)
+        self.__alpha_params = reserve(self.__alpha_params, size, required_capacity)
+        self.__beta_params = reserve(self.__beta_params, size, required_capacity)
+        self.__first_scratch = reserve(self.__first_scratch, 0, required_capacity)
+        self.__second_scratch = reserve(self.__second_scratch, 0, required_capacity)
@@ -0,0 +1,278 @@
+"""
+Module for implementation of Bayesian CPD algorithm multivariate gaussian (normal) likelihood function with unknown mean
+and covariance matrix. It uses normal-inverse Wishart distribution as a conjugate prior function and multivariate
+Student's t-distribution as a predictive probability.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+from collections.abc import Hashable
+
+import numpy as np
+import numpy.typing as npt
+from scipy import special
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.snapshots import State
+
+
+def cholesky_rank_one_update(factors: np.ndarray, vectors: np.ndarray) -> None:
+    """
+    Updates lower triangular Cholesky factors L of matrices A in place, so they become factors of A + v * v^T. Factors
+    are updated for all matrices at once, it costs O(d^2) per matrix instead of O(d^3) for a new factorization.
+    :param factors: stack of lower triangular Cholesky factors with shape (n, d, d).
+    :param vectors: stack of update vectors with shape (n, d).
+    """
+    dimension = factors.shape[-1]
+    vectors = vectors.copy()
+    for k in range(dimension):
+        diagonal = factors[:, k, k]
+        new_diagonal = np.sqrt(diagonal**2 + vectors[:, k] ** 2)
+        cosines = (new_diagonal / diagonal)[:, np.newaxis]
+        sines = (vectors[:, k] / diagonal)[:, np.newaxis]
+        factors[:, k, k] = new_diagonal
+
+        if k + 1 < dimension:
+            factors[:, k + 1 :, k] = (factors[:, k + 1 :, k] + sines * vectors[:, k + 1 :]) / cosines
+            vectors[:, k + 1 :] = cosines * vectors[:, k + 1 :] - sines * factors[:, k + 1 :, k]
+
+
+def solve_lower_triangular(factors: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """
+    Solves systems L * z = v with lower triangular matrices L by forward substitution for all systems at once.
+    :param factors: stack of lower triangular matrices with shape (n, d, d).
+    :param vectors: stack of right-hand sides with shape (n, d).
+    :return: stack of solutions with shape (n, d).
+    """
+    solutions = np.empty_like(vectors)
+    for i in range(factors.shape[-1]):
+        substituted = np.einsum("nj,nj->n", factors[:, i, :i], solutions[:, :i])
+        solutions[:, i] = (vectors[:, i] - substituted) / factors[:, i, i]
+
+    return solutions
+
+
+class MultivariateGaussianUnknownMeanAndCovariance(ILikelihood):
+    """
+    Likelihood for multivariate Gaussian (a.k.a. normal) distribution with unknown mean and covariance matrix estimated
+    from normal-inverse Wishart distribution as a conjugate prior. It uses 4 parameters (mean, its precision scale,
+    degrees of freedom and scale matrix), which priors are estimated from a learning sample and iteratively updated
+    after an observation. Predictive probability is multivariate Student's t-distribution with posterior parameters.
+
+    Scale matrices are stored as their Cholesky factors, which are updated with rank-one updates, so an update and a
+    prediction cost O(d^2) per run length for d-dimensional observations.
+    """
+
+    def __init__(self):
+        """
+        Initializes model. There are no known parameters at this moment.
+        """
+        self.__mu_0: np.ndarray | None = None
+        self.__kappa_0: float | None = None
+        self.__nu_0: float | None = None
+        self.__scale_factor_0: np.ndarray | None = None
+
+        # Parameters are stored in preallocated buffers, only the first self.__size elements are meaningful.
+        self.__dimension = 0
+        self.__size = 0
+        self.__mu_params = np.empty((0, 0))
+        self.__kappa_params = np.empty(0)
+        self.__nu_params = np.empty(0)
+        self.__scale_factors = np.empty((0, 0, 0))
+
+    def learn(self, learning_sample: npt.ArrayLike) -> None:
+        """
+        Learns first prior parameters: the mean is estimated from kappa_0 observations with sample mean mu_0, and the
+        covariance matrix is estimated from nu_0 observations with scatter matrix equal to the scale matrix.
+        :param learning_sample: a sample of d-dimensional observations for parameter learning.
+        """
+        data = np.array(learning_sample, dtype=np.float64)
+        sample_size, dimension = data.shape
+        assert sample_size > dimension, "Learning sample should be larger than observations' dimension."
+
+        deviations = data - data.mean(axis=0)
+        self.__mu_0 = data.mean(axis=0)
+        self.__kappa_0 = float(sample_size)
+        self.__nu_0 = float(sample_size)
+        self.__scale_factor_0 = np.linalg.cholesky(deviations.T @ deviations)
+
+        if dimension != self.__dimension:
+            self.__dimension = dimension
+            self.__mu_params = np.empty((INITIAL_CAPACITY, dimension))
+            self.__kappa_params = np.empty(INITIAL_CAPACITY)
+            self.__nu_params = np.empty(INITIAL_CAPACITY)
+            self.__scale_factors = np.empty((INITIAL_CAPACITY, dimension, dimension))
+
+        self.__size = 1
+        self.__set_priors()
+
+    def update(self, observation: npt.ArrayLike) -> None:
+        """
+        Updates parameters of normal-inverse Wishart conjugate prior, calculating posterior parameters. Posterior
+        parameters for run length r + 1 are evaluated from parameters for run length r, and prior parameters are set
+        for zero run length.
+        :param observation: a d-dimensional observation from a sample.
+        """
+        size = self.__size
+        self.__reserve(size + 1)
+
+        mu_params = self.__mu_params[:size]
+        kappa_params = self.__kappa_params[:size]
+        deviations = np.asarray(observation, dtype=np.float64) - mu_params
+
+        # Psi + kappa / (kappa + 1) * (observation - mu) * (observation - mu)^T
+        scale_factors = self.__scale_factors[:size].copy()
+        cholesky_rank_one_update(
+            scale_factors, deviations * np.sqrt(kappa_params / (kappa_params + 1.0))[:, np.newaxis]
+        )
+        self.__scale_factors[1 : size + 1] = scale_factors
+
+        # (mu * kappa + observation) / (kappa + 1)
+        self.__mu_params[1 : size + 1] = mu_params + deviations / (kappa_params + 1.0)[:, np.newaxis]
+        self.__kappa_params[1 : size + 1] = kappa_params + 1.0
+        self.__nu_params[1 : size + 1] = self.__nu_params[:size] + 1.0
+
+        self.__set_priors()
+        self.__size = size + 1
+
+    def predict(self, observation: npt.ArrayLike) -> npt.ArrayLike:
+        """
+        Returns predictive probabilities for a given observation based on posterior parameters.
+        :param observation: a d-dimensional observation from a sample.
+        :return: predictive probabilities for a given observation.
+        """
+        return np.exp(self.predict_log(observation))
+
+    def predict_log(self, observation: npt.ArrayLike) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for a given observation based on posterior parameters. Predictive
+        distribution is multivariate Student's t-distribution with nu - d + 1 degrees of freedom and shape matrix
+        Psi * (kappa + 1) / (kappa * (nu - d + 1)), its density is evaluated with Cholesky factors of Psi.
+        :param observation: a d-dimensional observation from a sample.
+        :return: logarithms of predictive probabilities for a given observation.
+        """
+        size = self.__size
+        dimension = self.__dimension
+        kappa_params = self.__kappa_params[:size]
+        scale_factors = self.__scale_factors[:size]
+
+        degrees_of_freedom = self.__nu_params[:size] - dimension + 1.0
+        shape_multipliers = (kappa_params + 1.0) / (kappa_params * degrees_of_freedom)
+
+        deviations = np.asarray(observation, dtype=np.float64) - self.__mu_params[:size]
+        whitened_deviations = solve_lower_triangular(scale_factors, deviations)
+        squared_distances = np.einsum("nd,nd->n", whitened_deviations, whitened_deviations) / shape_multipliers
+
+        log_determinants = dimension * np.log(shape_multipliers) + 2.0 * np.sum(
+            np.log(np.diagonal(scale_factors, axis1=1, axis2=2)), axis=1
+        )
+
+        return (
+            special.gammaln((degrees_of_freedom + dimension) / 2.0)
+            - special.gammaln(degrees_of_freedom / 2.0)
+            - 0.5 * dimension * np.log(degrees_of_freedom * np.pi)
+            - 0.5 * log_determinants
+            - 0.5 * (degrees_of_freedom + dimension) * np.log1p(squared_distances / degrees_of_freedom)
+        )
+
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops posterior parameters of run lengths from start (inclusive) to stop (exclusive), shifting parameters of
+        the longer run lengths down in place.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        assert 0 < start <= stop <= self.__size
+        new_size = self.__size - (stop - start)
+        for params in (self.__mu_params, self.__kappa_params, self.__nu_params, self.__scale_factors):
+            params[start:new_size] = params[stop : self.__size]
+
+        self.__size = new_size
+
+    def clear(self) -> None:
+        """
+        Clears parameters of multivariate gaussian likelihood. Allocated buffers are kept to be reused.
+        """
+        self.__mu_0 = None
+        self.__kappa_0 = None
+        self.__nu_0 = None
+        self.__scale_factor_0 = None
+
+        self.__size = 0
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        The likelihood has no parameters, its results depend only on a learning sample and observations.
+        :return: the likelihood's parameters.
+        """
+        return ()
+
+    def get_state(self) -> State:
+        """
+        Returns prior parameters and posterior parameters for all run lengths.
+        :return: likelihood function's state.
+        """
+        size = self.__size
+        state: State = {
+            "mu_params": self.__mu_params[:size].copy(),
+            "kappa_params": self.__kappa_params[:size].copy(),
+            "nu_params": self.__nu_params[:size].copy(),
+            "scale_factors": self.__scale_factors[:size].copy(),
+        }
+        if self.__mu_0 is not None and self.__scale_factor_0 is not None:
+            state["mu_0"] = self.__mu_0
+            state["kappa_0"] = np.array(self.__kappa_0)
+            state["nu_0"] = np.array(self.__nu_0)
+            state["scale_factor_0"] = self.__scale_factor_0
+
+        return state
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores prior and posterior parameters returned by get_state.
+        :param state: likelihood function's state.
+        """
+        self.clear()
+        if "mu_0" not in state:
+            return
+
+        self.__mu_0 = state["mu_0"]
+        self.__kappa_0 = float(state["kappa_0"])
+        self.__nu_0 = float(state["nu_0"])
+        self.__scale_factor_0 = state["scale_factor_0"]
+
+        size = state["mu_params"].shape[0]
+        self.__dimension = self.__mu_0.shape[0]
+        self.__mu_params = reserve(np.empty((0, self.__dimension)), 0, size)
+        self.__kappa_params = reserve(np.empty(0), 0, size)
+        self.__nu_params = reserve(np.empty(0), 0, size)
+        self.__scale_factors = reserve(np.empty((0, self.__dimension, self.__dimension)), 0, size)
+
+        self.__mu_params[:size] = state["mu_params"]
+        self.__kappa_params[:size] = state["kappa_params"]
+        self.__nu_params[:size] = state["nu_params"]
+        self.__scale_factors[:size] = state["scale_factors"]
+        self.__size = size
+
+    def __set_priors(self) -> None:
+        """
+        Sets prior parameters for zero run length.
+        """
+        self.__mu_params[0] = self.__mu_0
+        self.__kappa_params[0] = self.__kappa_0
+        self.__nu_params[0] = self.__nu_0
+        self.__scale_factors[0] = self.__scale_factor_0
+
+    def __reserve(self, required_capacity: int) -> None:
+        """
+        Ensures that parameters buffers can hold the required number of run lengths.
+        :param required_capacity: a required number of run lengths.
+        """
+        size = self.__size
+        self.__mu_params = reserve(self.__mu_params, size, required_capacity)
+        self.__kappa_params = reserve(self.__kappa_params, size, required_capacity)
+        self.__nu_params = reserve(self.__nu_params, size, required_capacity)
+        self.__scale_factors = reserve(self.__scale_factors, size, required_capacity)
@@ -0,0 +1,259 @@
+"""
+Module for Bayesian CPD algorithm base class of likelihood functions of non-conjugate models, whose posterior
+distributions of parameters are approximated with weighted particles (sequential Monte Carlo).
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+from abc import abstractmethod
+from collections.abc import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.BayesianCPD.log_space import logsumexp
+from CPDShell.Core.algorithms.snapshots import State
+
+
+class ParticleLikelihood(ILikelihood):
+    """
+    Base class for likelihoods of models without conjugate priors. A posterior distribution of model's parameters for
+    every run length is approximated with a fixed number of weighted particles, so a step costs
+    O(particles * run lengths) regardless of the model. Particles of all run lengths are stored in a preallocated
+    buffer, and an update is a vectorized reweighting by the observation's density.
+
+    Particles of a run length are resampled (systematic resampling, vectorized over run lengths) when their effective
+    sample size drops below a threshold. Resampled particles are moved with Liu-West shrinkage kernel to keep them
+    diverse, since parameters are static.
+
+    A subclass defines sampling of prior particles from a learning sample and an observation's log density given
+    parameters.
+    """
+
+    def __init__(
+        self,
+        particles_count: int = 256,
+        resampling_threshold: float = 0.5,
+        shrinkage: float = 0.98,
+        seed: int | None = None,
+    ):
+        """
+        Initializes model. There are no known parameters at this moment.
+        :param particles_count: number of particles per run length.
+        :param resampling_threshold: particles of a run length are resampled when their effective sample size is below
+            this fraction of particles_count.
+        :param shrinkage: Liu-West shrinkage of resampled particles to their mean, 1 means no move.
+        :param seed: seed of the random generator sampling particles.
+        """
+        assert particles_count > 0
+        assert 0.0 <= resampling_threshold <= 1.0
+        assert 0.0 < shrinkage <= 1.0
+
+        self.__particles_count = particles_count
+        self.__resampling_threshold = resampling_threshold
+        self.__shrinkage = shrinkage
+        self.__generator = np.random.default_rng(seed)
+
+        self.__prior: np.ndarray | None = None
+
+        # Particles and their log weights are stored in preallocated buffers, only the first self.__size rows are
+        # meaningful, a row's index corresponds to a run length.
+        self.__size = 0
+        self.__particles = np.empty((0, particles_count, 0))
+        self.__log_weights = np.empty((INITIAL_CAPACITY, particles_count))
+
+        # Log densities of the last predicted observation, they are reused by the following update.
+        self.__last_observation: float | np.float64 | None = None
+        self.__last_log_densities = np.empty((0, particles_count))
+
+    @abstractmethod
+    def _sample_prior(
+        self, learning_sample: np.ndarray, particles_count: int, generator: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Samples particles of a prior distribution of parameters.
+        :param learning_sample: a sample for parameter learning.
+        :param particles_count: number of particles.
+        :param generator: random generator.
+        :return: matrix of particles, a row per particle.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _log_density(self, observation: float | np.float64, particles: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of an observation's density given parameters.
+        :param observation: an observation from a sample.
+        :param particles: array of parameters, the last axis enumerates parameters of a particle.
+        :return: array of log densities with the shape of particles without the last axis.
+        """
+        raise NotImplementedError
+
+    def learn(self, learning_sample: Sequence[float | np.float64] | np.ndarray) -> None:
+        """
+        Samples prior particles from the learning sample.
+        :param learning_sample: a sample for parameter learning.
+        """
+        prior = self._sample_prior(
+            np.asarray(learning_sample, dtype=np.float64), self.__particles_count, self.__generator
+        )
+        self.__prior = prior
+        if self.__particles.shape[2] != prior.shape[1]:
+            self.__particles = np.empty((INITIAL_CAPACITY, self.__particles_count, prior.shape[1]))
+
+        self.__size = 1
+        self.__particles[0] = prior
+        self.__log_weights[0] = 0.0
+        self.__last_observation = None
+
+    def predict(self, observation: float | np.float64) -> npt.ArrayLike:
+        """
+        Returns predictive probabilities for a given observation based on weighted particles.
+        :param observation: an observation from a sample.
+        :return: predictive probabilities for a given observation.
+        """
+        return np.exp(self.predict_log(observation))
+
+    def predict_log(self, observation: float | np.float64) -> np.ndarray:
+        """
+        Returns logarithms of predictive probabilities for a given observation, i.e. logarithms of weighted means of
+        the observation's density over particles of every run length.
+        :param observation: an observation from a sample.
+        :return: logarithms of predictive probabilities for a given observation.
+        """
+        size = self.__size
+        log_densities = self._log_density(observation, self.__particles[:size])
+        self.__last_observation = observation
+        self.__last_log_densities = log_densities
+
+        log_weights = self.__log_weights[:size]
+        return logsumexp(log_weights + log_densities, axis=1) - logsumexp(log_weights, axis=1)
+
+    def update(self, observation: float | np.float64) -> None:
+        """
+        Reweights particles of every run length by the observation's density, resamples degenerate ones and sets prior
+        particles for zero run length.
+        :param observation: an observation from a sample.
+        """
+        size = self.__size
+        if self.__last_observation is not None and self.__last_observation == observation:
+            log_densities = self.__last_log_densities
+        else:
+            log_densities = self._log_density(observation, self.__particles[:size])
+        self.__last_observation = None
+
+        self.__particles = reserve(self.__particles, size, size + 1)
+        self.__log_weights = reserve(self.__log_weights, size, size + 1)
+
+        np.add(self.__log_weights[:size], log_densities, out=self.__log_weights[1 : size + 1])
+        self.__particles[1 : size + 1] = self.__particles[:size]
+        max_log_weights = np.max(self.__log_weights[1 : size + 1], axis=1, keepdims=True)
+        max_log_weights[~np.isfinite(max_log_weights)] = 0.0
+        self.__log_weights[1 : size + 1] -= max_log_weights
+        self.__resample(size + 1)
+
+        self.__particles[0] = self.__prior
+        self.__log_weights[0] = 0.0
+        self.__size = size + 1
+
+    def __resample(self, size: int) -> None:
+        """
+        Resamples particles of run lengths whose effective sample size is below the threshold.
+        :param size: number of run lengths.
+        """
+        # Run lengths whose particles all have zero weights are impossible, they are never resampled.
+        weights = np.exp(self.__log_weights[1:size])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights /= weights.sum(axis=1, keepdims=True)
+            effective_sizes = 1.0 / np.sum(weights * weights, axis=1)
+        rows = np.flatnonzero(effective_sizes < self.__resampling_threshold * self.__particles_count) + 1
+        if rows.shape[0] == 0:
+            return
+
+        weights = weights[rows - 1]
+        particles = self.__particles[rows]
+        rows_count = rows.shape[0]
+
+        # Systematic resampling of all rows at once: rows are stacked along a line by shifting their cumulative
+        # weights and positions by the row's index.
+        row_offsets = np.arange(rows_count)[:, np.newaxis]
+        cumulative_weights = np.cumsum(weights, axis=1)
+        cumulative_weights[:, -1] = 1.0
+        positions = (self.__generator.random((rows_count, 1)) + np.arange(self.__particles_count)) / (
+            self.__particles_count
+        )
+        indices = np.searchsorted((cumulative_weights + row_offsets).ravel(), (positions + row_offsets).ravel())
+        indices = np.minimum(
+            indices.reshape(rows_count, -1) - row_offsets * self.__particles_count, self.__particles_count - 1
+        )
+
+        # Liu-West kernel: shrinks particles to their weighted mean and jitters them, preserving mean and covariance.
+        means = np.einsum("rn,rnd->rd", weights, particles)[:, np.newaxis, :]
+        variances = np.einsum("rn,rnd->rd", weights, (particles - means) ** 2)[:, np.newaxis, :]
+        resampled = np.take_along_axis(particles, indices[:, :, np.newaxis], axis=1)
+        noise = self.__generator.standard_normal(resampled.shape)
+        self.__particles[rows] = (
+            self.__shrinkage * resampled
+            + (1.0 - self.__shrinkage) * means
+            + np.sqrt((1.0 - self.__shrinkage**2) * variances) * noise
+        )
+        self.__log_weights[rows] = 0.0
+
+    def drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops particles of run lengths from start (inclusive) to stop (exclusive), shifting particles of the longer run
+        lengths down in place.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        assert 0 < start <= stop <= self.__size
+        new_size = self.__size - (stop - start)
+        self.__particles[start:new_size] = self.__particles[stop : self.__size]
+        self.__log_weights[start:new_size] = self.__log_weights[stop : self.__size]
+        self.__size = new_size
+        self.__last_observation = None
+
+    def clear(self) -> None:
+        """
+        Clears particles. Allocated buffers are kept to be reused.
+        """
+        self.__prior = None
+        self.__size = 0
+        self.__last_observation = None
+
+    def get_state(self) -> State:
+        """
+        Returns prior particles, particles and log weights for all run lengths. The random generator's state is not
+        included.
+        :return: likelihood function's state.
+        """
+        state: State = {
+            "particles": self.__particles[: self.__size].copy(),
+            "log_weights": self.__log_weights[: self.__size].copy(),
+        }
+        if self.__prior is not None:
+            state["prior"] = self.__prior.copy()
+
+        return state
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores particles returned by get_state.
+        :param state: likelihood function's state.
+        """
+        self.__prior = state["prior"].copy() if "prior" in state else None
+
+        particles = state["particles"]
+        size = particles.shape[0]
+        if self.__particles.shape[1:] != particles.shape[1:]:
+            self.__particles = np.empty((0, *particles.shape[1:]))
+        self.__particles = reserve(self.__particles, 0, size)
+        self.__log_weights = reserve(self.__log_weights, 0, size)
+        self.__particles[:size] = particles
+        self.__log_weights[:size] = state["log_weights"]
+        self.__size = size
+        self.__last_observation = None
@@ -0,0 +1,55 @@
+"""
+Module for implementation of Bayesian CPD algorithm Poisson likelihood function with unknown rate. It uses gamma
+distribution as a conjugate prior function and negative binomial distribution as a predictive probability.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+from scipy import special
+
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.conjugate_likelihood import ConjugateLikelihood
+
+
+class PoissonUnknownRate(ConjugateLikelihood):
+    """
+    Likelihood for Poisson distribution (counts) with unknown rate estimated from gamma distribution with shape alpha
+    and rate beta as a conjugate prior. The prior is gamma(1, 0) updated with the learning sample.
+    """
+
+    def _initial_hyperparameters(self) -> np.ndarray:
+        """
+        Returns shape and rate of the initial gamma prior.
+        :return: vector (alpha, beta).
+        """
+        return np.array([1.0, 0.0])
+
+    def _sufficient_statistics(self, observations: np.ndarray) -> np.ndarray:
+        """
+        Returns increments of shape (a count) and rate (one) for given observations.
+        :param observations: vector of observations.
+        :return: matrix of increments, a row per observation.
+        """
+        return np.column_stack([observations, np.ones_like(observations)])
+
+    def _predict_log(self, observation: float | np.float64, params: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of negative binomial predictive probabilities of a count.
+        :param observation: a count from a sample.
+        :param params: matrix of hyperparameters (alpha, beta), a row per run length.
+        :return: logarithms of predictive probabilities, one per row of hyperparameters.
+        """
+        alpha_params = params[:, 0]
+        beta_params = params[:, 1]
+        if observation < 0 or observation != np.floor(observation):
+            return np.full(alpha_params.shape[0], -np.inf)
+
+        return (
+            special.gammaln(alpha_params + observation)
+            - special.gammaln(alpha_params)
+            - special.gammaln(observation + 1.0)
+            + alpha_params * np.log(beta_params / (beta_params + 1.0))
+            - observation * np.log1p(beta_params)
+        )
@@ -0,0 +1,84 @@
+"""
+Module for implementation of Bayesian CPD algorithm Student's t likelihood function with unknown location and scale.
+It has no conjugate prior, so the posterior distribution of parameters is approximated with particles.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+from scipy import special
+
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.particle_likelihood import ParticleLikelihood
+
+
+class StudentTUnknownLocationAndScale(ParticleLikelihood):
+    """
+    Likelihood for heavy-tailed data following Student's t distribution with known degrees of freedom and unknown
+    location and scale. A particle holds the location and the logarithm of the scale. Prior particles are centered at
+    the learning sample's median and median absolute deviation, which are robust to outliers.
+    """
+
+    def __init__(
+        self,
+        degrees_of_freedom: float = 3.0,
+        particles_count: int = 256,
+        resampling_threshold: float = 0.5,
+        shrinkage: float = 0.98,
+        seed: int | None = None,
+    ):
+        """
+        Initializes model. There are no known parameters at this moment.
+        :param degrees_of_freedom: degrees of freedom of Student's t distribution.
+        :param particles_count: number of particles per run length.
+        :param resampling_threshold: particles of a run length are resampled when their effective sample size is below
+            this fraction of particles_count.
+        :param shrinkage: Liu-West shrinkage of resampled particles to their mean, 1 means no move.
+        :param seed: seed of the random generator sampling particles.
+        """
+        assert degrees_of_freedom > 0.0
+        super().__init__(particles_count, resampling_threshold, shrinkage, seed)
+
+        self.__degrees_of_freedom = degrees_of_freedom
+        self.__log_normalizer = (
+            special.gammaln((degrees_of_freedom + 1.0) / 2.0)
+            - special.gammaln(degrees_of_freedom / 2.0)
+            - 0.5 * np.log(degrees_of_freedom * np.pi)
+        )
+
+    def _sample_prior(
+        self, learning_sample: np.ndarray, particles_count: int, generator: np.random.Generator
+    ) -> np.ndarray:
+        """
+        Samples locations around the median and log scales around the logarithm of the scaled median absolute
+        deviation of the learning sample.
+        :param learning_sample: a sample for parameter learning.
+        :param particles_count: number of particles.
+        :param generator: random generator.
+        :return: matrix of particles (location, log scale).
+        """
+        median = np.median(learning_sample)
+        scale = max(1.4826 * np.median(np.abs(learning_sample - median)), np.finfo(np.float64).tiny)
+        sample_size = learning_sample.shape[0]
+
+        locations = generator.normal(median, scale / np.sqrt(sample_size), particles_count)
+        log_scales = generator.normal(np.log(scale), 1.0 / np.sqrt(2.0 * sample_size), particles_count)
+        return np.column_stack([locations, log_scales])
+
+    def _log_density(self, observation: float | np.float64, particles: np.ndarray) -> np.ndarray:
+        """
+        Evaluates logarithms of Student's t density of an observation.
+        :param observation: an observation from a sample.
+        :param particles: array of parameters (location, log scale) along the last axis.
+        :return: array of log densities.
+        """
+        log_scales = particles[..., 1]
+        standardized = (observation - particles[..., 0]) * np.exp(-log_scales)
+        return (
+            self.__log_normalizer
+            - log_scales
+            - (self.__degrees_of_freedom + 1.0)
+            / 2.0
+            * np.log1p(standardized * standardized / self.__degrees_of_freedom)
+        )
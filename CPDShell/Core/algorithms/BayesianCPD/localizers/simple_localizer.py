@@ -7,6 +7,8 @@ __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
 
+from collections.abc import Hashable
+
 import numpy as np
 
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilocalizer import ILocalizer
@@ -27,3 +29,10 @@ class SimpleLocalizer(ILocalizer):
             return 0
 
         return int(growth_probs[0 : len(growth_probs) - 1].argmax())
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        The localizer has no parameters.
+        :return: the localizer's parameters.
+        """
+        return ()
@@ -0,0 +1,25 @@
+"""
+Module for helpers evaluating Bayesian CPD algorithm statistics in log space.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import numpy as np
+
+
+def logsumexp(values: np.ndarray, axis: int | None = None) -> np.ndarray:
+    """
+    Evaluates a logarithm of a sum of exponents of given values in a numerically stable way. Unlike
+    scipy.special.logsumexp, it does no argument validation, which dominates for short arrays on the hot path.
+    :param values: logarithms of summands.
+    :param axis: axis to sum over, None means summing all values.
+    :return: logarithm of the sum of exponents (a scalar array if axis is None).
+    """
+    max_values = np.max(values, axis=axis, keepdims=True)
+    max_values[~np.isfinite(max_values)] = 0.0
+    with np.errstate(divide="ignore"):
+        result = np.log(np.sum(np.exp(values - max_values), axis=axis, keepdims=True)) + max_values
+
+    return np.squeeze(result, axis=axis)
@@ -0,0 +1,228 @@
+"""
+Module for implementation of a recorder of Bayesian CPD algorithm run lengths distributions over time.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import os
+import weakref
+from types import TracebackType
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+
+
+class RunLengthPosteriorRecorder:
+    """
+    A recorder of run lengths distributions (growth probabilities) evaluated by Bayesian algorithm. A dense matrix of
+    distributions over time takes quadratic memory, so only a band of each distribution from the first to the last run
+    length hypothesis with non-negligible probability is stored. Bands are stored as a ragged array: values of all
+    bands are concatenated, and the i-th band takes values[offsets[i]:offsets[i + 1]] and starts at run length
+    starts[i]. Run lengths of hypotheses are consecutive, except the longest one, which may be a merged hypothesis of
+    truncated distributions, so the run length of the last hypothesis of the i-th band is last_run_lengths[i].
+
+    MAP run length, change probability (probability of zero run length) and expected run length are evaluated for
+    every distribution exactly, before it is cut to a band.
+
+    A recorder writing to a file keeps it open until close is called, the recorder is used as a context manager or
+    it is garbage collected.
+    """
+
+    def __init__(self, threshold: float = 1e-6, path: str | os.PathLike | None = None):
+        """
+        Initializes an empty recorder.
+        :param threshold: probabilities below this threshold are negligible.
+        :param path: path of a file to write bands' values to, they are accessed as a memory-mapped array then. None
+            means keeping values in memory.
+        """
+        assert 0.0 <= threshold < 1.0
+
+        self.__threshold = threshold
+        self.__path = path
+        self.__file = open(path, "wb") if path is not None else None  # noqa: SIM115
+        self.__finalizer = weakref.finalize(self, self.__file.close) if self.__file is not None else None
+        # A memory-mapped array of values, it is mapped again only after new values are written.
+        self.__mapped_values: np.ndarray | None = None
+
+        self.__size = 0
+        self.__values_size = 0
+        self.__values = np.empty(INITIAL_CAPACITY)
+        self.__times = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.__starts = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.__last_run_lengths = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.__offsets = np.zeros(INITIAL_CAPACITY + 1, dtype=np.int64)
+        self.__map_run_lengths = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.__change_probs = np.empty(INITIAL_CAPACITY)
+        self.__expected_run_lengths = np.empty(INITIAL_CAPACITY)
+
+    def __enter__(self) -> "RunLengthPosteriorRecorder":
+        """
+        Returns the recorder, its file is closed on exit.
+        """
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Closes the file of bands' values.
+        """
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of recorded distributions.
+        """
+        return self.__size
+
+    def record(self, time: int, growth_probs: np.ndarray, run_lengths: np.ndarray | None = None) -> None:
+        """
+        Records a run lengths distribution evaluated after processing an observation.
+        :param time: index of the processed observation.
+        :param growth_probs: growth probabilities for run lengths hypotheses at the time.
+        :param run_lengths: run lengths of hypotheses, they are consecutive except the last one. None means that
+            the run length of a hypothesis is its index.
+        """
+        if run_lengths is None:
+            run_lengths = np.arange(growth_probs.shape[0])
+        assert run_lengths.shape == growth_probs.shape
+
+        size = self.__size
+        self.__times = reserve(self.__times, size, size + 1)
+        self.__starts = reserve(self.__starts, size, size + 1)
+        self.__last_run_lengths = reserve(self.__last_run_lengths, size, size + 1)
+        self.__offsets = reserve(self.__offsets, size + 1, size + 2)
+        self.__map_run_lengths = reserve(self.__map_run_lengths, size, size + 1)
+        self.__change_probs = reserve(self.__change_probs, size, size + 1)
+        self.__expected_run_lengths = reserve(self.__expected_run_lengths, size, size + 1)
+
+        self.__times[size] = time
+        self.__map_run_lengths[size] = run_lengths[growth_probs.argmax()]
+        self.__change_probs[size] = growth_probs[0]
+        self.__expected_run_lengths[size] = np.dot(run_lengths, growth_probs)
+
+        significant = np.flatnonzero(growth_probs >= self.__threshold)
+        first, last = (significant[0], significant[-1] + 1) if significant.shape[0] > 0 else (0, 0)
+        band = growth_probs[first:last]
+        if last > first:
+            assert np.array_equal(run_lengths[first : last - 1] - run_lengths[first], np.arange(last - 1 - first))
+            self.__starts[size] = run_lengths[first]
+            self.__last_run_lengths[size] = run_lengths[last - 1]
+        else:
+            self.__starts[size] = 0
+            self.__last_run_lengths[size] = -1
+        self.__offsets[size + 1] = self.__offsets[size] + band.shape[0]
+
+        if self.__file is not None:
+            self.__file.write(np.ascontiguousarray(band, dtype=np.float64).tobytes())
+        else:
+            self.__values = reserve(self.__values, self.__values_size, self.__values_size + band.shape[0])
+            self.__values[self.__values_size : self.__values_size + band.shape[0]] = band
+        self.__values_size += band.shape[0]
+
+        self.__size = size + 1
+
+    @property
+    def times(self) -> np.ndarray:
+        """
+        Indices of observations after which distributions were recorded. Observations reprocessed after a change point
+        localization are recorded again.
+        """
+        return self.__times[: self.__size]
+
+    @property
+    def starts(self) -> np.ndarray:
+        """
+        The first run length of every band.
+        """
+        return self.__starts[: self.__size]
+
+    @property
+    def last_run_lengths(self) -> np.ndarray:
+        """
+        Run length of the last hypothesis of every band, -1 for empty bands.
+        """
+        return self.__last_run_lengths[: self.__size]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """
+        Offsets of bands in values, the i-th band takes values[offsets[i]:offsets[i + 1]].
+        """
+        return self.__offsets[: self.__size + 1]
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        Concatenated values of all bands (a read-only memory-mapped array if the recorder writes to a file).
+        """
+        if self.__file is None:
+            return self.__values[: self.__values_size]
+
+        if self.__values_size == 0:
+            return np.empty(0)
+        if self.__mapped_values is None or self.__mapped_values.shape[0] != self.__values_size:
+            assert self.__path is not None
+            if not self.__file.closed:
+                self.__file.flush()
+            self.__mapped_values = np.memmap(self.__path, dtype=np.float64, mode="r", shape=(self.__values_size,))
+        return self.__mapped_values
+
+    @property
+    def map_run_lengths(self) -> np.ndarray:
+        """
+        The most probable run length of every distribution.
+        """
+        return self.__map_run_lengths[: self.__size]
+
+    @property
+    def change_probs(self) -> np.ndarray:
+        """
+        Probability of a change point (zero run length) of every distribution.
+        """
+        return self.__change_probs[: self.__size]
+
+    @property
+    def expected_run_lengths(self) -> np.ndarray:
+        """
+        Expected run length of every distribution.
+        """
+        return self.__expected_run_lengths[: self.__size]
+
+    def band(self, index: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a stored band of a recorded distribution.
+        :param index: index of a recorded distribution.
+        :return: run lengths of hypotheses in the band and their probabilities.
+        """
+        values = self.values[self.__offsets[index] : self.__offsets[index + 1]]
+        run_lengths = self.__starts[index] + np.arange(values.shape[0])
+        if values.shape[0] > 0:
+            run_lengths[-1] = self.__last_run_lengths[index]
+        return run_lengths, values
+
+    def to_dense(self) -> np.ndarray:
+        """
+        Builds a dense matrix of recorded distributions, negligible probabilities are zeros. It takes quadratic memory,
+        so it is intended for short records only.
+        :return: matrix with a row per recorded distribution and a column per run length.
+        """
+        dense = np.zeros((self.__size, int(self.last_run_lengths.max(initial=-1)) + 1))
+        for index in range(self.__size):
+            run_lengths, values = self.band(index)
+            dense[index, run_lengths] = values
+
+        return dense
+
+    def close(self) -> None:
+        """
+        Closes a file of bands' values if the recorder writes to a file. Recorded data stays accessible.
+        """
+        if self.__finalizer is not None:
+            self.__finalizer()
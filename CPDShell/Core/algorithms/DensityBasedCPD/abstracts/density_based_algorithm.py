@@ -1,72 +1,333 @@
 from abc import abstractmethod
-from collections.abc import Callable, Iterable
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import numpy as np
-from scipy.optimize import minimize
+from scipy.cluster.vq import kmeans2
+from scipy.signal import fftconvolve
 
 from CPDShell.Core.algorithms.abstract_algorithm import Algorithm
 
 
+def _evaluate_bandwidth(
+    algorithm: "DensityBasedAlgorithm",
+    test_value: np.ndarray,
+    reference_value: np.ndarray,
+    bandwidth: float,
+    regularization_coefs: Sequence[float],
+    folds: int,
+) -> np.ndarray:
+    """Worker function evaluating cross-validation losses of all regularization parameters for one bandwidth. Kernel
+    matrices are computed once and shared across regularization parameters and folds.
+
+    Args:
+        algorithm (DensityBasedAlgorithm): the algorithm to evaluate.
+        test_value (np.ndarray): the test data points.
+        reference_value (np.ndarray): the reference data points.
+        bandwidth (float): the bandwidth parameter of the kernel.
+        regularization_coefs (Sequence[float]): regularization parameters to evaluate.
+        folds (int): number of cross-validation folds.
+
+    Returns:
+        np.ndarray: cross-validation losses for every regularization parameter.
+    """
+    centres = algorithm._select_centres(test_value, algorithm.basis_size, algorithm.centre_selection, algorithm.seed)
+    test_kernel = algorithm._gaussian_kernel_matrix(test_value, centres, bandwidth)
+    reference_kernel = algorithm._gaussian_kernel_matrix(reference_value, centres, bandwidth)
+    return algorithm._cross_validation_losses(test_kernel, reference_kernel, np.asarray(regularization_coefs), folds)
+
+
 class DensityBasedAlgorithm(Algorithm):
+    def __init__(
+        self,
+        bandwidth: float,
+        regularization_coef: float,
+        threshold: float = 1.1,
+        basis_size: int = 100,
+        centre_selection: str = "even",
+        seed: int | None = None,
+    ):
+        """Initialize parameters shared by density-based algorithms.
+
+        Args:
+            bandwidth (float): bandwidth parameter for density estimation.
+            regularization_coef (float): regularization parameter.
+            threshold (float, optional): threshold for detecting change points.
+            Defaults to 1.1.
+            basis_size (int, optional): maximal number of kernel basis centres.
+            Defaults to 100.
+            centre_selection (str, optional): how kernel basis centres are
+            selected from the test values: "even", "random" or "kmeans".
+            Defaults to "even".
+            seed (int | None, optional): seed of the random centres selection.
+            Defaults to None.
+        """
+        assert basis_size > 0
+        assert centre_selection in ("even", "random", "kmeans")
+
+        self.bandwidth = bandwidth
+        self.regularization_coef = regularization_coef
+        self.threshold = threshold
+        self.basis_size = basis_size
+        self.centre_selection = centre_selection
+        self.seed = seed
+
     @staticmethod
-    def _kernel_density_estimation(observation: np.ndarray, bandwidth: float) -> np.ndarray:
+    def _kernel_density_estimation(
+        observation: np.ndarray, bandwidth: float, grid_size: int = 1000, at_observations: bool = False
+    ) -> np.ndarray:
         """Perform kernel density estimation on the given observations without fitting a model.
 
+        Observations are linearly binned onto a regular grid, and the bin weights are convolved with the Gaussian
+        kernel via FFT, so the estimation takes O(n + grid_size * log(grid_size)) time instead of O(n * grid_size).
+
         Args:
             observation (np.ndarray): the data points for which to estimate the density.
             bandwidth (float): the bandwidth parameter for the kernel density estimation.
+            grid_size (int, optional): number of grid points. Defaults to 1000.
+            at_observations (bool, optional): whether to evaluate the density at the observations (interpolating
+            between grid points) instead of the grid. Defaults to False.
 
         Returns:
-            np.ndarray: estimated density values for the observations.
+            np.ndarray: estimated density values on the grid or at the observations.
         """
+        observation = np.asarray(observation, dtype=np.float64)
         n = len(observation)
-        x_grid = np.linspace(np.min(observation) - 3 * bandwidth, np.max(observation) + 3 * bandwidth, 1000)
-        kde_values = np.zeros_like(x_grid)
-        for x in observation:
-            kde_values += np.exp(-0.5 * ((x_grid - x) / bandwidth) ** 2)
+        low = np.min(observation) - 3 * bandwidth
+        high = np.max(observation) + 3 * bandwidth
+        x_grid = np.linspace(low, high, grid_size)
+        step = (high - low) / (grid_size - 1)
+
+        # Linear binning: an observation's unit weight is split between the two nearest grid points.
+        positions = (observation - low) / step
+        left = np.clip(np.floor(positions).astype(np.intp), 0, grid_size - 2)
+        right_share = positions - left
+        bin_weights = np.bincount(left, weights=1.0 - right_share, minlength=grid_size) + np.bincount(
+            left + 1, weights=right_share, minlength=grid_size
+        )
+
+        # The kernel covers all offsets between grid points, so the convolution is exact for binned observations.
+        offsets = np.arange(-(grid_size - 1), grid_size) * step
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+        kde_values = np.maximum(fftconvolve(bin_weights, kernel, mode="same"), 0.0)
 
         kde_values /= n * bandwidth * np.sqrt(2 * np.pi)
+        if at_observations:
+            return np.interp(observation, x_grid, kde_values)
         return kde_values
 
     @staticmethod
-    def _calculate_weights(
+    def _select_centres(
+        sample: np.ndarray, basis_size: int, centre_selection: str = "even", seed: int | None = None
+    ) -> np.ndarray:
+        """Select centres of Gaussian kernel basis functions, so kernel matrices have basis_size columns instead of
+        one column per observation.
+
+        Args:
+            sample (np.ndarray): the data points (scalars or rows of a matrix) to select centres from.
+            basis_size (int): the maximal number of centres.
+            centre_selection (str, optional): "even" takes evenly spaced points of the sample, "random" takes a random
+            subset of points, "kmeans" takes centroids of k-means clusters of points. Defaults to "even".
+            seed (int | None, optional): seed of the random generator for "random" and "kmeans". Defaults to None.
+
+        Returns:
+            np.ndarray: the selected centres.
+        """
+        assert centre_selection in ("even", "random", "kmeans")
+        count = min(basis_size, len(sample))
+        if centre_selection == "even":
+            indices = np.unique(np.linspace(0, len(sample) - 1, count).astype(np.intp))
+            return sample[indices]
+
+        generator = np.random.default_rng(seed)
+        if centre_selection == "random":
+            return sample[np.sort(generator.choice(len(sample), count, replace=False))]
+
+        points = np.asarray(sample, dtype=np.float64).reshape(len(sample), -1)
+        centroids, labels = kmeans2(points, count, minit="++", seed=generator)
+        # Centroids of empty clusters are meaningless, they are dropped.
+        centroids = centroids[np.unique(labels)]
+        return centroids.reshape(-1, *np.shape(sample)[1:])
+
+    @staticmethod
+    def _gaussian_kernel_matrix(points: np.ndarray, centres: np.ndarray, bandwidth: float) -> np.ndarray:
+        """Evaluate Gaussian kernel basis functions at the given points.
+
+        Args:
+            points (np.ndarray): the data points (scalars or rows of a matrix).
+            centres (np.ndarray): centres of the basis functions (scalars or rows of a matrix).
+            bandwidth (float): the bandwidth parameter of the kernel.
+
+        Returns:
+            np.ndarray: matrix of kernel values with a row per point and a column per centre.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(len(points), -1)
+        centres = np.asarray(centres, dtype=np.float64).reshape(len(centres), -1)
+        squared_distances = (
+            np.sum(points**2, axis=1)[:, np.newaxis]
+            + np.sum(centres**2, axis=1)[np.newaxis, :]
+            - 2 * points @ centres.T
+        )
+        return np.exp(-np.maximum(squared_distances, 0.0) / (2 * bandwidth**2))
+
+    def _window_divergence(
         self,
-        test_value: np.ndarray,
-        reference_value: np.ndarray,
-        bandwidth: float,
-        objective_function: Callable[[np.ndarray, np.ndarray], float],
+        test_kernel: np.ndarray,
+        test_gram: np.ndarray,
+        test_means: np.ndarray,
+        reference_gram: np.ndarray,
+        reference_means: np.ndarray,
+        initial_coefficients: np.ndarray | None,
+    ) -> tuple[float, np.ndarray]:
+        """Estimate a divergence between the test and the reference windows of the sliding mode.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            test_gram (np.ndarray): mean outer product of basis functions over the test values.
+            test_means (np.ndarray): means of basis functions over the test values.
+            reference_gram (np.ndarray): mean outer product of basis functions over the reference values.
+            reference_means (np.ndarray): means of basis functions over the reference values.
+            initial_coefficients (np.ndarray | None): coefficients of the density ratio at the previous position,
+            None at the first position.
+
+        Returns:
+            tuple[float, np.ndarray]: the divergence and coefficients of the density ratio.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support the sliding mode")
+
+    def _cross_validation_losses(
+        self, test_kernel: np.ndarray, reference_kernel: np.ndarray, regularization_coefs: np.ndarray, folds: int
     ) -> np.ndarray:
-        """Calculate the weights based on the density ratio between test and reference values.
+        """Evaluate cross-validation losses of regularization parameters for fixed kernel matrices.
 
         Args:
-            test_value (np.ndarray): the test data points.
-            reference_value (np.ndarray): the reference data points.
-            bandwidth (float): the bandwidth parameter for the kernel density estimation.
-            objective_function (Callable[[np.ndarray, np.ndarray], float]): the objective function to minimize.
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            reference_kernel (np.ndarray): kernel basis functions at the reference values.
+            regularization_coefs (np.ndarray): regularization parameters to evaluate.
+            folds (int): number of cross-validation folds.
+
+        Returns:
+            np.ndarray: cross-validation losses for every regularization parameter, lower is better.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support parameters selection")
+
+    def select_parameters(
+        self,
+        test_value: Iterable[float | np.float64],
+        reference_value: Iterable[float | np.float64],
+        bandwidths: Sequence[float],
+        regularization_coefs: Sequence[float],
+        folds: int = 5,
+        workers: int = 1,
+    ) -> tuple[float, float]:
+        """Select the bandwidth and the regularization parameter by cross-validation over a grid and set them.
+
+        Bandwidths are evaluated in parallel across a process pool, every worker computes kernel matrices once and
+        shares them across regularization parameters and folds. Observations are assigned to folds in turn.
+
+        Args:
+            test_value (Iterable[float]): the test data points.
+            reference_value (Iterable[float]): the reference data points.
+            bandwidths (Sequence[float]): bandwidths to evaluate.
+            regularization_coefs (Sequence[float]): regularization parameters to evaluate.
+            folds (int, optional): number of cross-validation folds. Defaults to 5.
+            workers (int, optional): number of worker processes, 1 means evaluating in the current process.
+            Defaults to 1.
 
         Returns:
-            np.ndarray: the calculated density ratios normalized to their mean.
+            tuple[float, float]: the selected bandwidth and regularization parameter.
+
+        Raises:
+            ValueError: cross-validation losses of all parameters are NaN.
         """
-        test_density = self._kernel_density_estimation(test_value, bandwidth)
-        reference_density = self._kernel_density_estimation(reference_value, bandwidth)
-
-        def objective_function_wrapper(alpha: np.ndarray) -> float:
-            """Wrapper for the objective function to calculate the density ratio.
-
-            Args:
-                alpha (np.ndarray): relative parameter that controls the weighting between the numerator distribution
-                and the denominator distribution in the density ratio estimation.
-
-            Returns:
-                float: the value of the objective function to minimize.
-            """
-            objective_density_ratio = np.exp(test_density - reference_density - alpha)
-            return objective_function(objective_density_ratio, alpha)
-
-        res = minimize(objective_function_wrapper, np.zeros(len(test_value)), method="L-BFGS-B")
-        optimized_alpha = res.x
-        density_ratio = np.exp(test_density - reference_density - optimized_alpha)
-        return density_ratio / np.mean(density_ratio)
+        test_sample = np.asarray(
+            test_value if isinstance(test_value, np.ndarray) else list(test_value), dtype=np.float64
+        )
+        reference_sample = np.asarray(
+            reference_value if isinstance(reference_value, np.ndarray) else list(reference_value), dtype=np.float64
+        )
+        assert len(bandwidths) > 0 and len(regularization_coefs) > 0
+        assert 1 < folds <= min(len(test_sample), len(reference_sample))
+        assert workers > 0, "Number of workers should be positive."
+
+        arguments = (
+            repeat(self),
+            repeat(test_sample),
+            repeat(reference_sample),
+            bandwidths,
+            repeat(regularization_coefs),
+            repeat(folds),
+        )
+        if workers == 1:
+            losses = np.array(list(map(_evaluate_bandwidth, *arguments)))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(bandwidths))) as executor:
+                # Executor's map keeps the order of bandwidths, so the selection is deterministic.
+                losses = np.array(list(executor.map(_evaluate_bandwidth, *arguments)))
+
+        if np.all(np.isnan(losses)):
+            raise ValueError("Cross-validation losses of all bandwidths and regularization parameters are NaN")
+
+        bandwidth_index, regularization_index = np.unravel_index(np.nanargmin(losses), losses.shape)
+        self.bandwidth = bandwidths[int(bandwidth_index)]
+        self.regularization_coef = regularization_coefs[int(regularization_index)]
+        return self.bandwidth, self.regularization_coef
+
+    def sliding_scores(self, series: Iterable[float | np.float64], window_size: int) -> np.ndarray:
+        """Calculate a divergence score curve comparing adjacent windows sliding over the series.
+
+        The score at time t compares the reference window series[t - window_size:t] with the test window
+        series[t:t + window_size]. Kernel basis centres are fixed for the whole series, so every point's basis
+        functions are evaluated once, and Gram matrices of both windows are updated by rank-one corrections as
+        points enter and leave them. Coefficients of the density ratio are warm-started from the previous position.
+
+        Args:
+            series (Iterable[float]): the data to score.
+            window_size (int): size of the reference and the test windows.
+
+        Returns:
+            np.ndarray: scores for every time, NaN where the windows do not fit into the series.
+        """
+        assert window_size > 0
+
+        sample = np.asarray(series if isinstance(series, np.ndarray) else list(series), dtype=np.float64)
+        scores = np.full(len(sample), np.nan)
+        if len(sample) < 2 * window_size:
+            return scores
+
+        centres = self._select_centres(sample, self.basis_size, self.centre_selection, self.seed)
+        kernel = self._gaussian_kernel_matrix(sample, centres, self.bandwidth)
+
+        coefficients = None
+        for time in range(window_size, len(sample) - window_size + 1):
+            reference_kernel = kernel[time - window_size : time]
+            test_kernel = kernel[time : time + window_size]
+            if (time - window_size) % window_size == 0:
+                # Sums are recomputed from scratch once per window size steps to stop accumulation of rounding errors.
+                reference_gram = reference_kernel.T @ reference_kernel
+                test_gram = test_kernel.T @ test_kernel
+                reference_sums = np.sum(reference_kernel, axis=0)
+                test_sums = np.sum(test_kernel, axis=0)
+            else:
+                left_reference = kernel[time - window_size - 1]
+                moved = kernel[time - 1]
+                entered_test = kernel[time + window_size - 1]
+                reference_gram += np.outer(moved, moved) - np.outer(left_reference, left_reference)
+                test_gram += np.outer(entered_test, entered_test) - np.outer(moved, moved)
+                reference_sums += moved - left_reference
+                test_sums += entered_test - moved
+
+            scores[time], coefficients = self._window_divergence(
+                test_kernel,
+                test_gram / window_size,
+                test_sums / window_size,
+                reference_gram / window_size,
+                reference_sums / window_size,
+                coefficients,
+            )
+
+        return scores
 
     @abstractmethod
     def detect(self, window: Iterable[float | np.float64]) -> int:
@@ -16,7 +16,7 @@ class IBuilder(ABC):
         :param compare: Callable that takes two elements and returns a boolean indicating
                         if an edge should exist between them.
         """
-        self.data = list(data)
+        self.data = data if isinstance(data, numpy.ndarray) else list(data)
         self.compare = compare
         self.num_of_edges: int = 0
 
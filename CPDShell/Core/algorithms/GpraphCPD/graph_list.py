@@ -1,10 +1,12 @@
+from collections.abc import Sequence
+
 import numpy
 
 from CPDShell.Core.algorithms.GpraphCPD.abstracts.igraph import IGraph
 
 
 class GraphList(IGraph):
-    def __init__(self, graph, data: list[float | numpy.float64], num_of_edges: int):
+    def __init__(self, graph, data: Sequence[float | numpy.float64] | numpy.ndarray, num_of_edges: int):
         """
         Initialize the GraphList with the adjacency list, data, and number of edges.
 
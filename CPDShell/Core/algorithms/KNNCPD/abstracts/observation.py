@@ -6,26 +6,15 @@ __author__ = "Artemii Patov"
 __copyright__ = "Copyright (c) 2024 Artemii Patov"
 __license__ = "SPDX-License-Identifier: MIT"
 
-from dataclasses import dataclass, field
-
-import numpy as np
-
-
-@dataclass(order=True)
-class Observation:
-    """
-    Abstraction over observation that consists of the time of the point in time series and the value of it.
-    """
-
-    time: int
-    value: float | np.float64 = field(compare=False)
+from dataclasses import dataclass
 
 
 @dataclass(order=True)
 class Neighbour:
     """
-    Abstraction over neighbour that consists of the distance to the main point and the observation-neighbour itself.
+    Abstraction over neighbour that consists of the distance to the main point and the time of the neighbour, which is
+    its index in the sample.
     """
 
     distance: float
-    observation: Observation
+    time: int
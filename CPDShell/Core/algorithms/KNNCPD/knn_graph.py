@@ -7,12 +7,10 @@ __copyright__ = "Copyright (c) 2024 Artemii Patov"
 __license__ = "SPDX-License-Identifier: MIT"
 
 import typing as tp
-from collections import deque
-from collections.abc import Iterable
+from collections.abc import Sequence
 
 import numpy as np
 
-from .abstracts.observation import Observation
 from .knn_heap import NNHeap
 
 
@@ -23,36 +21,33 @@ class KNNGraph:
 
     def __init__(
         self,
-        window: Iterable[float | np.float64],
+        window: Sequence[float | np.float64] | np.ndarray,
         metric: tp.Callable[[float, float], float] | tp.Callable[[np.float64, np.float64], float],
         k=3,
-        delta=1e-12,
     ) -> None:
         """
         Initializes a new instance of KNN graph.
 
-        :param window: an overall sample the graph is based on.
+        :param window: an overall sample the graph is based on, observations are indexed by their times.
         :param metric: function for calculating distance between points in time series.
         :param k: number of neighbours in graph relative to each point.
         """
-        self.__window: list[Observation] = [Observation(t, v) for t, v in enumerate(window)]
-        self.__metric: tp.Callable[[Observation, Observation], float] = lambda obs1, obs2: metric(
-            obs1.value, obs2.value
-        )
+        self.__window = np.asarray(window)
+        self.__metric = metric
         self.__k = k
-        self.__delta = delta
 
-        self.__window_size = len(window)
-        self.__graph: deque[NNHeap] = deque(maxlen=self.__window_size)
+        self.__window_size = len(self.__window)
+        self.__graph: list[NNHeap] = []
 
     def build(self) -> None:
         """
         Build KNN graph according to the given parameters.
         """
-        for i in range(self.__window_size):
-            heap = NNHeap(self.__k, self.__metric, self.__window[-i - 1], self.__delta)
-            heap.build(self.__window)
-            self.__graph.appendleft(heap)
+        self.__graph = []
+        for time in range(self.__window_size):
+            heap = NNHeap(self.__k, self.__distance, time)
+            heap.build(range(self.__window_size))
+            self.__graph.append(heap)
 
     def check_for_neighbourhood(self, first_index: int, second_index: int) -> bool:
         """
@@ -62,5 +57,26 @@ class KNNGraph:
         :param second_index: index of possible neighbour.
         :return: true if the second point is the neighbour of the first one, false otherwise.
         """
-        neighbour = self.__window[second_index]
-        return self.__graph[first_index].find_in_heap(neighbour)
+        return self.__graph[first_index].find_in_heap(second_index)
+
+    def get_neighbours_indices(self) -> np.ndarray:
+        """
+        Builds a compact representation of the graph.
+
+        :return: matrix, where the i-th row contains indices of the nearest neighbours of the i-th observation.
+        """
+        neighbours = np.empty((self.__window_size, min(self.__k, max(self.__window_size - 1, 0))), dtype=np.intp)
+        for i, heap in enumerate(self.__graph):
+            neighbours[i] = heap.get_neighbours()
+
+        return neighbours
+
+    def __distance(self, first_index: int, second_index: int) -> float:
+        """
+        Calculates distance between observations.
+
+        :param first_index: index of the first observation.
+        :param second_index: index of the second observation.
+        :return: distance between observations.
+        """
+        return self.__metric(self.__window[first_index], self.__window[second_index])
@@ -8,9 +8,9 @@ __license__ = "SPDX-License-Identifier: MIT"
 
 import heapq
 import typing as tp
-from math import isclose
+from collections.abc import Iterable
 
-from .abstracts.observation import Neighbour, Observation
+from .abstracts.observation import Neighbour
 
 
 class NNHeap:
@@ -18,62 +18,57 @@ class NNHeap:
     The class implementing nearest neighbours heap --- helper abstraction for KNN graph.
     """
 
-    def __init__(
-        self,
-        size: int,
-        metric: tp.Callable[[Observation, Observation], float],
-        main_observation: Observation,
-        delta: float,
-    ) -> None:
+    def __init__(self, size: int, metric: tp.Callable[[int, int], float], main_time: int) -> None:
         """
         Initializes a new instance of NNHeap.
 
         :param size: size of the heap.
-        :param metric: function for calculating distance between two observations.
-        :param main_observation: the central point relative to which the nearest neighbours are sought.
+        :param metric: function for calculating distance between two observations given by their times.
+        :param main_time: time of the central point relative to which the nearest neighbours are sought.
         """
         self.__size = size
         self.__metric = metric
-        self.__main_observation = main_observation
+        self.__main_time = main_time
 
         self.__heap: list[Neighbour] = []
-        self.__delta = delta
 
-    def build(self, neighbours: list[Observation]) -> None:
+    def build(self, times: Iterable[int]) -> None:
         """
         Builds a nearest neighbour heap relative to the main observation with the given neighbours.
 
-        :param neighbours: list of neighbours.
+        :param times: times of neighbours.
         """
-        for neighbour in neighbours:
-            self.__add(neighbour)
+        for time in times:
+            self.__add(time)
 
-    def find_in_heap(self, observation: Observation) -> bool:
+    def find_in_heap(self, time: int) -> bool:
         """
-        Checks if the given observation is among the nearest neighbours of the main observation.
+        Checks if the observation is among the nearest neighbours of the main observation.
 
-        :param observation: observation to test.
+        :param time: time of observation to test.
         """
+        return any(neighbour.time == time for neighbour in self.__heap)
 
-        def predicate(x: Neighbour) -> bool:
-            return isclose(x.observation.value, observation.value, rel_tol=self.__delta) and (
-                x.observation.time == observation.time
-            )
+    def get_neighbours(self) -> list[int]:
+        """
+        Returns the nearest neighbours of the main observation.
 
-        return any(predicate(i) for i in self.__heap)
+        :return: list of times of observations in the heap.
+        """
+        return [neighbour.time for neighbour in self.__heap]
 
-    def __add(self, observation: Observation) -> None:
+    def __add(self, time: int) -> None:
         """
         Adds observation to heap.
 
-        :param observation: observation to add.
+        :param time: time of observation to add.
         """
-        if observation is self.__main_observation:
+        if time == self.__main_time:
             return
 
         # Sign conversion is needed to convert smallest element heap to greatest element heap.
-        neg_distance = -self.__metric(self.__main_observation, observation)
-        neighbour = Neighbour(neg_distance, observation)
+        neg_distance = -self.__metric(self.__main_time, time)
+        neighbour = Neighbour(neg_distance, time)
 
         if len(self.__heap) == self.__size and neighbour.distance > self.__heap[0].distance:
             heapq.heapreplace(self.__heap, neighbour)
@@ -0,0 +1,175 @@
+"""
+Module for parallel evaluation of the nearest neighbours graph statistics over candidate change points.
+"""
+
+__author__ = "Artemii Patov"
+__copyright__ = "Copyright (c) 2024 Artemii Patov"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import weakref
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import sqrt
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+def calculate_statistics(neighbours: np.ndarray, times: Sequence[int], k: int) -> list[float]:
+    """
+    Calculates the statistics of the KNN graph in every specified point.
+
+    :param neighbours: matrix, the i-th row contains indices of the nearest neighbours of the i-th observation.
+    :param times: indices of points in the sample to calculate statistics relative to them.
+    :param k: number of neighbours in graph relative to each point.
+    :return: statistics for every given point (in the same order).
+    """
+    n = neighbours.shape[0]
+    if n <= k:
+        # Unable to analyze sample due to its size.
+        return [-k for _ in times]
+
+    observations = np.arange(n)
+
+    # Both sums do not depend on the point, so they are evaluated only once. The first one is the number of ordered
+    # pairs of mutual neighbours, the second one is the sum of squared numbers of observations having a neighbour.
+    sum_1 = (1 / n) * int(np.sum(neighbours[neighbours] == observations[:, np.newaxis, np.newaxis]))
+    sum_2 = (1 / n) * int(np.sum(np.bincount(neighbours.ravel(), minlength=n) ** 2))
+
+    # An edge connects observations before (including) and after a point if the point is between its ends, so numbers
+    # of such edges for all points are prefix sums of edges' starts and ends.
+    starts = np.minimum(observations[:, np.newaxis], neighbours).ravel()
+    ends = np.maximum(observations[:, np.newaxis], neighbours).ravel()
+    crossing_edges = np.cumsum(np.bincount(starts, minlength=n) - np.bincount(ends, minlength=n))
+
+    statistics = []
+    for time in times:
+        n_1 = int(time)
+        n_2 = n - n_1
+
+        h = 4 * (n_1 - 1) * (n_2 - 1) / ((n - 2) * (n - 3))
+        expectation = 4 * k * n_1 * n_2 / (n - 1)
+        variance = (expectation / k) * (h * (sum_1 + k - (2 * k**2 / (n - 1))) + (1 - h) * (sum_2 - k**2))
+        deviation = sqrt(variance)
+
+        # Edges are counted for both directions.
+        random_variable_value = 2 * int(crossing_edges[n_1])
+
+        if deviation == 0:
+            statistics.append(-(random_variable_value - expectation))
+        else:
+            statistics.append(-(random_variable_value - expectation) / deviation)
+
+    return statistics
+
+
+def _calculate_statistics_in_shared_memory(
+    memory_name: str, shape: tuple[int, int], times: Sequence[int], k: int
+) -> list[float]:
+    """
+    Worker function attaching to the neighbours' indices in shared memory and calculating statistics.
+
+    :param memory_name: name of the shared memory block with the neighbours' indices.
+    :param shape: shape of the matrix of the neighbours' indices.
+    :param times: indices of points in the sample to calculate statistics relative to them.
+    :param k: number of neighbours in graph relative to each point.
+    :return: statistics for every given point (in the same order).
+    """
+    memory = SharedMemory(name=memory_name)
+    try:
+        neighbours: np.ndarray = np.ndarray(shape, dtype=np.intp, buffer=memory.buf)
+        statistics = calculate_statistics(neighbours, times, k)
+        del neighbours
+    finally:
+        memory.close()
+
+    return statistics
+
+
+def _release(executor: ProcessPoolExecutor, memories: list[SharedMemory]) -> None:
+    """
+    Shuts down the process pool and frees the shared memory of a statistics pool.
+
+    :param executor: process pool.
+    :param memories: list of allocated shared memory blocks.
+    """
+    executor.shutdown()
+    for memory in memories:
+        memory.close()
+        memory.unlink()
+    memories.clear()
+
+
+class StatisticsPool:
+    """
+    Process pool calculating the statistics of KNN graphs, splitting candidate points across workers. The pool and the
+    shared memory block with the neighbours' indices are kept between graphs, the block is reallocated only for
+    a bigger graph. They are released by close or when the pool is garbage collected.
+    """
+
+    def __init__(self, workers: int) -> None:
+        """
+        Initializes a new pool of worker processes.
+
+        :param workers: number of worker processes.
+        """
+        assert workers > 0, "Number of workers should be positive."
+
+        self.__workers = workers
+        self.__executor = ProcessPoolExecutor(max_workers=workers)
+        self.__memories: list[SharedMemory] = []
+        self.__finalizer = weakref.finalize(self, _release, self.__executor, self.__memories)
+
+    def calculate(self, neighbours: np.ndarray, times: Sequence[int], k: int) -> list[float]:
+        """
+        Calculates the statistics of the KNN graph in every specified point. The neighbours' indices are placed in
+        shared memory once, so they are not copied into every worker.
+
+        :param neighbours: matrix, the i-th row contains indices of the nearest neighbours of the i-th observation.
+        :param times: indices of points in the sample to calculate statistics relative to them.
+        :param k: number of neighbours in graph relative to each point.
+        :return: statistics for every given point (in the same order).
+        """
+        assert self.__finalizer.alive, "Pool is closed."
+        if len(times) == 0 or neighbours.shape[0] <= k:
+            return calculate_statistics(neighbours, times, k)
+
+        neighbours = np.asarray(neighbours, dtype=np.intp)
+        memory = self.__reserve(neighbours.nbytes)
+        shared_neighbours: np.ndarray = np.ndarray(neighbours.shape, dtype=np.intp, buffer=memory.buf)
+        shared_neighbours[:] = neighbours
+        del shared_neighbours
+
+        chunks = [chunk.tolist() for chunk in np.array_split(np.asarray(times), min(self.__workers, len(times)))]
+        # Executor's map keeps the order of chunks, so results are merged deterministically.
+        results = self.__executor.map(
+            _calculate_statistics_in_shared_memory,
+            repeat(memory.name),
+            repeat(neighbours.shape),
+            chunks,
+            repeat(k),
+        )
+        return [statistics for chunk_statistics in results for statistics in chunk_statistics]
+
+    def close(self) -> None:
+        """
+        Shuts down worker processes and frees shared memory.
+        """
+        self.__finalizer()
+
+    def __reserve(self, size: int) -> SharedMemory:
+        """
+        Returns a shared memory block of at least the given size, reallocating the current one if it is smaller.
+
+        :param size: number of needed bytes.
+        :return: shared memory block.
+        """
+        if self.__memories and self.__memories[0].size >= size:
+            return self.__memories[0]
+
+        for memory in self.__memories:
+            memory.close()
+            memory.unlink()
+        self.__memories[:] = [SharedMemory(create=True, size=max(size, 1))]
+        return self.__memories[0]
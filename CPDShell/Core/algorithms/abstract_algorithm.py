@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from collections.abc import Iterable
+from collections.abc import Hashable, Iterable
 
 import numpy
 
@@ -7,6 +7,9 @@ import numpy
 class Algorithm(ABC):
     """Abstract class for change point detection algorithms"""
 
+    # Whether detect returns the number of change points localize finds, so a result of one serves another.
+    detects_localized_change_points: bool = False
+
     @abstractmethod
     def detect(self, window: Iterable[float | numpy.float64]) -> int:
         """Function for finding change points in window
@@ -24,3 +27,29 @@ class Algorithm(ABC):
         :return: list of window change points
         """
         raise NotImplementedError
+
+    def detect_batch(self, windows: numpy.ndarray) -> list[int]:
+        """Function for finding change points in several windows at once. Algorithms with vectorizable statistics
+        override it, others fall back to detecting change points in every window
+
+        :param windows: array with a row per window, usually a strided view of data
+        :return: the number of change points in every window
+        """
+        return [self.detect(window) for window in windows]
+
+    def localize_batch(self, windows: numpy.ndarray) -> list[list[int]]:
+        """Function for finding coordinates of change points in several windows at once. Algorithms with vectorizable
+        statistics override it, others fall back to localizing change points in every window
+
+        :param windows: array with a row per window, usually a strided view of data
+        :return: list of window change points for every window
+        """
+        return [self.localize(window) for window in windows]
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """Function returning the configuration the algorithm's results depend on, e.g. its constructor arguments.
+        Results of windows are cached only for algorithms defining it, and its values should be picklable
+
+        :return: tuple of the algorithm's parameters, None if results should not be cached
+        """
+        return None
@@ -0,0 +1,351 @@
+"""
+Module for implementation of Bayesian CPD algorithm for several series processed in lockstep.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from CPDShell.Core.algorithms.bayesian_algorithm import ChangePointEvent
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ibatched_detector import IBatchedDetector
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ibatched_likelihood import IBatchedLikelihood
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ihazard import IHazard
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilocalizer import ILocalizer
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY
+from CPDShell.Core.algorithms.BayesianCPD.log_space import logsumexp
+
+
+class BatchedBayesianAlgorithm:
+    """
+    The class implementing Bayesian change point detection algorithm for several independent series at once. Series
+    are processed in lockstep: an observation of every series arrives at each step, and run lengths distributions of
+    all series are stored as a matrix (a row per series) and evaluated in log space with a few vectorized operations
+    per step instead of a Python loop over series. Run lengths of hypotheses are stored as a matrix of the same shape,
+    since a column index is not a run length after hypotheses are merged.
+
+    Every series goes through the same stages as in BayesianAlgorithm stream processing, but after a change point only
+    the series where it was found is restarted, from the next observation. Unlike BayesianAlgorithm, observations
+    after the localized change point are not reprocessed, so series never go back in time and stay in lockstep.
+    """
+
+    def __init__(
+        self,
+        learning_steps: int,
+        likelihood: IBatchedLikelihood,
+        hazard: IHazard,
+        detector: IBatchedDetector,
+        localizer: ILocalizer,
+        max_run_lengths: int | None = None,
+    ):
+        """
+        Initializes a new instance of batched Bayesian algorithm module with given customization.
+        :param learning_steps: number of steps to learn likelihood's parameters.
+        :param likelihood: batched likelihood function for the given model.
+        :param hazard: hazard function for the given model (shared by all series).
+        :param detector: batched detector for change point detection from run lengths distributions at the moment.
+        :param localizer: localizer for change point localization from a run lengths distribution at the moment.
+        :param max_run_lengths: maximal number of run lengths hypotheses to keep per series, the longest ones are
+            merged into one if there are more. None means no limit.
+        """
+        assert learning_steps > 0
+        assert max_run_lengths is None or max_run_lengths > 0
+
+        self._learning_steps = learning_steps
+        self.__max_run_lengths = max_run_lengths
+
+        self.__likelihood = likelihood
+        self.__hazard = hazard
+
+        self.__detector = detector
+        self.__localizer = localizer
+
+        self.__series_count = 0
+        self.__time = 0
+        self.__columns = np.array([], dtype=np.intp)
+        self.__run_lengths = np.empty((0, 0), dtype=np.intp)
+        self.__log_growth_probs = np.empty((0, 0))
+        self.__growth_probs = np.empty((0, 0))
+        self.__run_lengths_counts = np.array([], dtype=np.intp)
+
+        self.__learning_samples = np.empty((0, learning_steps))
+        self.__learning_sizes = np.array([], dtype=np.intp)
+        self.__is_started = False
+
+    @property
+    def series_count(self) -> int:
+        """
+        Number of series processed at the moment.
+        """
+        return self.__series_count
+
+    @property
+    def map_run_lengths(self) -> np.ndarray:
+        """
+        The most probable run lengths of all series at the moment.
+        :return: the most probable run length per series, -1 for series learning the likelihood's parameters.
+        """
+        active_growth_probs = np.where(
+            self.__columns[np.newaxis, :] < self.__run_lengths_counts[:, np.newaxis],
+            self.__growth_probs,
+            -1.0,
+        )
+        map_columns = active_growth_probs.argmax(axis=1)
+        map_run_lengths = np.take_along_axis(self.__run_lengths, map_columns[:, np.newaxis], axis=1)[:, 0]
+        return np.where(self.__is_learning(), -1, map_run_lengths)
+
+    def reset(self, series_count: int) -> None:
+        """
+        Clears the state of all series, so the next pushed observations have index 0.
+        :param series_count: number of series to process.
+        """
+        assert series_count > 0
+
+        capacity = self.__max_run_lengths + 1 if self.__max_run_lengths is not None else INITIAL_CAPACITY
+        self.__series_count = series_count
+        self.__time = 0
+        self.__columns = np.arange(capacity)
+        # Run lengths of columns without hypotheses are equal to their indices.
+        self.__run_lengths = np.tile(self.__columns, (series_count, 1))
+        self.__log_growth_probs = np.full((series_count, capacity), -np.inf)
+        self.__log_growth_probs[:, 0] = 0.0
+        self.__growth_probs = np.zeros((series_count, capacity))
+        self.__growth_probs[:, 0] = 1.0
+        self.__run_lengths_counts = np.ones(series_count, dtype=np.intp)
+
+        self.__learning_samples = np.empty((series_count, self._learning_steps))
+        self.__learning_sizes = np.zeros(series_count, dtype=np.intp)
+
+        self.__likelihood.reset(series_count, capacity)
+        self.__detector.reset(series_count)
+        self.__is_started = True
+
+    def push(self, observations: Iterable[float | np.float64] | np.ndarray) -> list[tuple[int, ChangePointEvent]]:
+        """
+        Processes the next observation of every series. Processing continues until reset is called.
+        :param observations: the next observation per series.
+        :return: list of pairs (index of a series, change point) found after processing the observations.
+        """
+        new_observations = np.asarray(observations, dtype=np.float64)
+        if not self.__is_started:
+            self.reset(new_observations.shape[0])
+
+        assert new_observations.shape == (self.__series_count,)
+
+        index = self.__time
+        self.__time += 1
+
+        change_points: list[tuple[int, ChangePointEvent]] = []
+
+        learning = self.__is_learning()
+        if learning.any():
+            learned = self.__learning_stage(new_observations, learning)
+            if learned.any():
+                # Like in BayesianAlgorithm, the last learning observation is the first one in Bayesian stage.
+                detected = self.__detector.detect(self.__growth_probs, self.__run_lengths_counts, learned)
+                change_points.extend(self.__process_change_points(detected, index))
+
+        bayesian = ~self.__is_learning()
+        if bayesian.any():
+            pred_probs_are_zero = self.__bayesian_update(new_observations, bayesian)
+
+            # Assuming that an abrupt change in all predictive probabilities to zero corresponds to a change point at
+            # this moment.
+            for row in np.flatnonzero(pred_probs_are_zero):
+                change_points.append((int(row), ChangePointEvent(index + 1, index)))
+            self.__clear_series(np.flatnonzero(pred_probs_are_zero))
+
+            detected = self.__detector.detect(
+                self.__growth_probs, self.__run_lengths_counts, bayesian & ~pred_probs_are_zero
+            )
+            change_points.extend(self.__process_change_points(detected, index + 1))
+
+        return change_points
+
+    def push_many(
+        self, observations: Iterable[Iterable[float | np.float64]] | np.ndarray
+    ) -> Iterator[tuple[int, ChangePointEvent]]:
+        """
+        Processes the next observations of all series, yielding change points as soon as they are found.
+        :param observations: the next observations, a row per step and a column per series.
+        :return: iterator over pairs (index of a series, change point).
+        """
+        for step_observations in observations:
+            yield from self.push(step_observations)
+
+    def localize(self, data: Iterable[Iterable[float | np.float64]] | np.ndarray) -> list[list[int]]:
+        """
+        Finds coordinates of change points (localizes them) in several series from scratch.
+        :param data: observations of all series, a row per step and a column per series.
+        :return: list of change points per series.
+        """
+        matrix = np.asarray(data, dtype=np.float64)
+        self.reset(matrix.shape[1])
+        change_points: list[list[int]] = [[] for _ in range(matrix.shape[1])]
+        for row, change_point in self.push_many(matrix):
+            change_points[row].append(change_point.change_point)
+
+        return change_points
+
+    def __is_learning(self) -> np.ndarray:
+        """
+        A helper function finding series learning the likelihood's parameters.
+        :return: boolean mask of series in the learning stage.
+        """
+        return self.__learning_sizes < self._learning_steps
+
+    def __learning_stage(self, observations: np.ndarray, learning: np.ndarray) -> np.ndarray:
+        """
+        Collects observations of series in the learning stage and learns likelihood's parameters of series whose
+        learning samples are complete.
+        :param observations: an observation per series.
+        :param learning: boolean mask of series in the learning stage.
+        :return: boolean mask of series which have learned the likelihood's parameters.
+        """
+        rows = np.flatnonzero(learning)
+        self.__learning_samples[rows, self.__learning_sizes[rows]] = observations[rows]
+        self.__learning_sizes[rows] += 1
+
+        learned = np.zeros(self.__series_count, dtype=bool)
+        learned[rows[self.__learning_sizes[rows] == self._learning_steps]] = True
+        if learned.any():
+            learned_rows = np.flatnonzero(learned)
+            self.__likelihood.learn(learned_rows, self.__learning_samples[learned_rows])
+
+        return learned
+
+    def __bayesian_update(self, observations: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """
+        Performs a Bayesian update of statistics (run lengths distributions) of given series in log space.
+        :param observations: an observation per series.
+        :param rows: boolean mask of series to update.
+        :return: boolean mask of series where predictive probabilities are zero for every run length.
+        """
+        self.__reserve(int(self.__run_lengths_counts[rows].max()) + 1)
+        active = self.__columns[np.newaxis, :] < self.__run_lengths_counts[:, np.newaxis]
+
+        log_predictive_probs = np.where(
+            active, self.__likelihood.predict_log(observations, self.__run_lengths), -np.inf
+        )
+        pred_probs_are_zero = rows & np.all(np.isneginf(log_predictive_probs), axis=1)
+        updated = rows & ~pred_probs_are_zero
+
+        hazard_val = np.asarray(self.__hazard.hazard(self.__run_lengths.ravel())).reshape(self.__run_lengths.shape)
+        with np.errstate(divide="ignore"):
+            log_hazard_val = np.log(hazard_val)
+            log_complement_hazard_val = np.log1p(-hazard_val)
+
+        log_joint_probs = self.__log_growth_probs + log_predictive_probs
+
+        # The longest column is always inactive before the update, so shifting to the right loses nothing.
+        new_log_growth_probs = np.empty_like(log_joint_probs)
+        new_log_growth_probs[:, 1:] = (log_joint_probs + log_complement_hazard_val)[:, :-1]
+        new_log_growth_probs[:, 0] = logsumexp(log_joint_probs + log_hazard_val, axis=1)
+
+        log_evidence = logsumexp(new_log_growth_probs, axis=1)
+        assert np.all(np.isfinite(log_evidence[updated]))
+        new_log_growth_probs -= log_evidence[:, np.newaxis]
+
+        self.__log_growth_probs[updated] = new_log_growth_probs[updated]
+        self.__growth_probs[updated] = np.exp(new_log_growth_probs[updated])
+
+        # Columns without hypotheses keep run lengths equal to their indices after the shift.
+        self.__run_lengths[updated, 1:] = self.__run_lengths[updated, :-1] + 1
+        self.__run_lengths[updated, 0] = 0
+
+        self.__likelihood.update(observations, updated)
+        self.__run_lengths_counts[updated] += 1
+        self.__truncate_run_lengths()
+
+        return pred_probs_are_zero
+
+    def __truncate_run_lengths(self) -> None:
+        """
+        Bounds the number of run lengths hypotheses per series. The two longest hypotheses of series with too many of
+        them are merged into one with the longest run length and its parameters, like in BayesianAlgorithm.
+        """
+        if self.__max_run_lengths is None:
+            return
+
+        rows = np.flatnonzero(self.__run_lengths_counts > self.__max_run_lengths)
+        if rows.shape[0] == 0:
+            return
+
+        # Hypotheses are added one per step, so there is exactly one extra hypothesis.
+        first_merged = self.__max_run_lengths - 1
+        merged_log_probs = np.logaddexp(
+            self.__log_growth_probs[rows, first_merged], self.__log_growth_probs[rows, first_merged + 1]
+        )
+        self.__log_growth_probs[rows, first_merged] = merged_log_probs
+        self.__log_growth_probs[rows, first_merged + 1 :] = -np.inf
+        self.__growth_probs[rows, first_merged] = np.exp(merged_log_probs)
+        self.__growth_probs[rows, first_merged + 1 :] = 0.0
+        self.__run_lengths[rows, first_merged] = self.__run_lengths[rows, first_merged + 1]
+        self.__run_lengths[rows, first_merged + 1 :] = self.__columns[first_merged + 1 :]
+
+        self.__likelihood.drop_run_lengths(rows, first_merged, first_merged + 1)
+        self.__run_lengths_counts[rows] = self.__max_run_lengths
+
+    def __process_change_points(self, detected: np.ndarray, next_index: int) -> list[tuple[int, ChangePointEvent]]:
+        """
+        Localizes change points in series where they were detected and restarts these series.
+        :param detected: boolean mask of series where change points were detected.
+        :param next_index: index of the next observation to be processed in Bayesian stage.
+        :return: list of pairs (index of a series, change point).
+        """
+        rows = np.flatnonzero(detected)
+        change_points: list[tuple[int, ChangePointEvent]] = []
+        for row in rows:
+            column = self.__localizer.localize(self.__growth_probs[row, : self.__run_lengths_counts[row] - 1])
+            run_length = int(self.__run_lengths[row, column])
+            change_points.append((int(row), ChangePointEvent(next_index - run_length + 1, next_index - 1)))
+
+        self.__clear_series(rows)
+        return change_points
+
+    def __clear_series(self, rows: np.ndarray) -> None:
+        """
+        A helper function clearing states of given series after a change point occurs.
+        :param rows: indices of series.
+        """
+        if rows.shape[0] == 0:
+            return
+
+        self.__log_growth_probs[rows] = -np.inf
+        self.__log_growth_probs[rows, 0] = 0.0
+        self.__growth_probs[rows] = 0.0
+        self.__growth_probs[rows, 0] = 1.0
+        self.__run_lengths[rows] = self.__columns
+        self.__run_lengths_counts[rows] = 1
+        self.__learning_sizes[rows] = 0
+
+        self.__likelihood.clear(rows)
+        self.__detector.clear(rows)
+
+    def __reserve(self, required_capacity: int) -> None:
+        """
+        A helper function extending run lengths distributions (with zero probabilities) and likelihood's parameters
+        if they are stored for fewer run lengths than required.
+        :param required_capacity: a required number of run lengths.
+        """
+        capacity = self.__log_growth_probs.shape[1]
+        if capacity >= required_capacity:
+            return
+
+        new_capacity = max(required_capacity, 2 * capacity)
+        log_growth_probs = np.full((self.__series_count, new_capacity), -np.inf)
+        log_growth_probs[:, :capacity] = self.__log_growth_probs
+        growth_probs = np.zeros((self.__series_count, new_capacity))
+        growth_probs[:, :capacity] = self.__growth_probs
+
+        self.__columns = np.arange(new_capacity)
+        run_lengths = np.tile(self.__columns, (self.__series_count, 1))
+        run_lengths[:, :capacity] = self.__run_lengths
+
+        self.__log_growth_probs = log_growth_probs
+        self.__growth_probs = growth_probs
+        self.__run_lengths = run_lengths
+        self.__likelihood.reserve(new_capacity)
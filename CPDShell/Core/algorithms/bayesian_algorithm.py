@@ -6,7 +6,9 @@ __author__ = "Alexey Tatyanenko"
 __copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
 __license__ = "SPDX-License-Identifier: MIT"
 
-from collections.abc import Iterable
+from collections import deque
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
 
 import numpy as np
 
@@ -15,6 +17,23 @@ from CPDShell.Core.algorithms.BayesianCPD.abstracts.idetector import IDetector
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ihazard import IHazard
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
 from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilocalizer import ILocalizer
+from CPDShell.Core.algorithms.BayesianCPD.buffers import INITIAL_CAPACITY, reserve
+from CPDShell.Core.algorithms.BayesianCPD.log_space import logsumexp
+from CPDShell.Core.algorithms.BayesianCPD.posterior_recorder import RunLengthPosteriorRecorder
+from CPDShell.Core.algorithms.snapshots import File, State, extract_state, load_state, nest_state, save_state
+
+
+@dataclass(frozen=True)
+class ChangePointEvent:
+    """
+    A change point found by Bayesian algorithm working with a stream of observations.
+
+    :param change_point: index of the localized change point in the stream.
+    :param detection_time: index of the last observation processed before the change point was detected.
+    """
+
+    change_point: int
+    detection_time: int
 
 
 class BayesianAlgorithm(Algorithm):
@@ -25,10 +44,25 @@ class BayesianAlgorithm(Algorithm):
     1) Learning the likelihood's parameters;
     2) Evaluation Bayesian statistics;
     3) Processing a changepoint in case there's one.
+
+    Besides processing windows of data, the algorithm can work with a stream of observations (see push and push_many).
+    In this mode observations are processed one by one as they arrive, and only observations that may need to be
+    reprocessed after a change point localization are kept. Their number does not exceed the number of run lengths
+    hypotheses, so with max_run_lengths or pruning_threshold set memory stays bounded.
     """
 
     def __init__(
-        self, learning_steps: int, likelihood: ILikelihood, hazard: IHazard, detector: IDetector, localizer: ILocalizer
+        self,
+        learning_steps: int,
+        likelihood: ILikelihood,
+        hazard: IHazard,
+        detector: IDetector,
+        localizer: ILocalizer,
+        log_space: bool = False,
+        pruning_threshold: float = 0.0,
+        max_run_lengths: int | None = None,
+        rollback_aware: bool = False,
+        recorder: RunLengthPosteriorRecorder | None = None,
     ):
         """
         Initializes a new instance of Bayesian algorithm module with given customization.
@@ -37,8 +71,27 @@ class BayesianAlgorithm(Algorithm):
         :param hazard: hazard function for the given model.
         :param detector: detector for change point detection from a run lengths distribution at the moment.
         :param localizer: localizer for change point localization from a run lengths distribution at the moment.
+        :param log_space: whether to evaluate run lengths distribution in log space, using logarithms of predictive
+            probabilities. It prevents predictive probabilities from underflowing to zeros.
+        :param pruning_threshold: the longest run lengths are dropped if their total probability is below this
+            threshold. Zero turns the pruning off.
+        :param max_run_lengths: maximal number of run lengths hypotheses to keep, the longest ones are merged into
+            one if there are more. None means no limit.
+        :param rollback_aware: whether to learn likelihood's parameters from prefix sums of sufficient statistics of a
+            window. Every relearning after a localized change point takes constant time instead of a pass over the
+            learning sample. The likelihood should support learning from sufficient statistics.
+        :param recorder: recorder of run lengths distributions evaluated after every processed observation, for offline
+            analysis. None means no recording.
         """
+        assert 0.0 <= pruning_threshold < 1.0
+        assert max_run_lengths is None or max_run_lengths > 0
+
         self._learning_steps = learning_steps
+        self.__log_space = log_space
+        self.__pruning_threshold = pruning_threshold
+        self.__max_run_lengths = max_run_lengths
+        self.__rollback_aware = rollback_aware
+        self.__recorder = recorder
 
         self.__likelihood = likelihood
         self.__hazard = hazard
@@ -46,14 +99,33 @@ class BayesianAlgorithm(Algorithm):
         self.__detector = detector
         self.__localizer = localizer
 
+        # Growth probabilities are a view of a preallocated buffer, which is reused across segments and windows.
+        # Run lengths of hypotheses are kept alongside them, since truncation merges and drops hypotheses, so
+        # a hypothesis' index is not its run length.
+        self.__growth_probs_buffer = np.array([])
+        self.__run_lengths = np.array([], dtype=np.intp)
         self.__growth_probs = np.array([])
+        self.__log_growth_probs_buffer = np.array([])
+        self.__log_growth_probs = np.array([])
         self.__time = 0
         self.__gap_size = 0
+        self.__run_lengths_count = 0
         self.__pred_probs_are_zero = False
 
         self.__change_points: list[int] = []
         self.__change_points_count = 0
 
+        # Prefix sums of sufficient statistics of a window, the i-th row is a sum over the first i observations.
+        self.__prefix_statistics = np.empty((0, 0))
+
+        # State of a stream processing.
+        self.__stream_time = 0
+        self.__segment_start = 0
+        self.__learning_sample: list[float | np.float64] = []
+        self.__stream_history: deque[tuple[int, float | np.float64]] = deque()
+        self.__pending_observations: deque[tuple[int, float | np.float64]] = deque()
+        self.__is_stream_started = False
+
     def detect(self, window: Iterable[float | np.float64]) -> int:
         """Finds change points in window.
 
@@ -72,18 +144,249 @@ class BayesianAlgorithm(Algorithm):
         self.__process_data(True, window)
         return self.__change_points.copy()
 
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """
+        Returns the configuration the found change points depend on: parameters of the algorithm and types and
+        parameters of the likelihood, hazard, detector and localizer. Processed windows would not be recorded, so the
+        algorithm with a recorder is not cached.
+        :return: the algorithm's parameters, None if a component does not define its parameters or there is a recorder.
+        """
+        if self.__recorder is not None:
+            return None
+
+        components_parameters: list[Hashable] = []
+        for component in (self.__likelihood, self.__hazard, self.__detector, self.__localizer):
+            parameters = component.cache_parameters()
+            if parameters is None:
+                return None
+            components_parameters.append((type(component).__module__, type(component).__qualname__, parameters))
+
+        return (
+            self._learning_steps,
+            self.__log_space,
+            self.__pruning_threshold,
+            self.__max_run_lengths,
+            self.__rollback_aware,
+            *components_parameters,
+        )
+
+    def push(self, observation: float | np.float64) -> list[ChangePointEvent]:
+        """
+        Processes the next observation of a stream. A stream continues until reset is called or a window is processed
+        by detect or localize.
+        :param observation: the next observation of a stream.
+        :return: list of change points found after processing the observation.
+        """
+        if not self.__is_stream_started:
+            self.reset()
+
+        self.__pending_observations.append((self.__stream_time, observation))
+        self.__stream_time += 1
+
+        change_points: list[ChangePointEvent] = []
+        while self.__pending_observations:
+            index, pending_observation = self.__pending_observations.popleft()
+            change_point = self.__process_stream_observation(index, pending_observation)
+            if change_point is not None:
+                change_points.append(change_point)
+
+        return change_points
+
+    def push_many(self, observations: Iterable[float | np.float64]) -> Iterator[ChangePointEvent]:
+        """
+        Processes the next observations of a stream, yielding change points as soon as they are found.
+        :param observations: the next observations of a stream.
+        :return: iterator over found change points.
+        """
+        for observation in observations:
+            yield from self.push(observation)
+
+    @property
+    def map_run_length(self) -> int | None:
+        """
+        The most probable run length at the moment of a stream processing.
+        :return: the most probable run length or None if the likelihood's parameters are being learned.
+        """
+        if not self.__is_stream_started or len(self.__learning_sample) < self._learning_steps:
+            return None
+
+        return int(self.__run_lengths[self.__growth_probs[: self.__run_lengths_count].argmax()])
+
+    def reset(self) -> None:
+        """
+        Clears the state of a stream processing, so the next pushed observation has index 0.
+        """
+        self.__stream_time = 0
+        self.__pending_observations.clear()
+        self.__is_stream_started = True
+        self.__restart_stream(0)
+
+    def get_state(self) -> State:
+        """
+        Returns the state of a stream processing, including states of the likelihood, the hazard and the detector. The
+        state's size is proportional to the number of run lengths hypotheses and observations kept for reprocessing,
+        not to the stream's length.
+        :return: the state of a stream processing.
+        """
+        assert not self.__pending_observations
+
+        count = self.__run_lengths_count
+        history = list(self.__stream_history)
+        state: State = {
+            "learning_steps": np.array(self._learning_steps),
+            "log_space": np.array(self.__log_space),
+            "is_stream_started": np.array(self.__is_stream_started),
+            "stream_time": np.array(self.__stream_time),
+            "segment_start": np.array(self.__segment_start),
+            "gap_size": np.array(self.__gap_size),
+            "learning_sample": np.array(self.__learning_sample, dtype=np.float64),
+            "history_indices": np.array([index for index, _ in history], dtype=np.int64),
+            "history_observations": np.array([observation for _, observation in history], dtype=np.float64),
+            "growth_probs": self.__growth_probs[:count].copy(),
+            "run_lengths": self.__run_lengths[:count].astype(np.int64),
+        }
+        if self.__log_space:
+            state["log_growth_probs"] = self.__log_growth_probs[:count].copy()
+
+        state.update(nest_state("likelihood", self.__likelihood.get_state()))
+        state.update(nest_state("hazard", self.__hazard.get_state()))
+        state.update(nest_state("detector", self.__detector.get_state()))
+        return state
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the state of a stream processing returned by get_state. The algorithm should be customized the same
+        way as the one the state was taken from.
+        :param state: the state of a stream processing.
+        """
+        assert int(state["learning_steps"]) == self._learning_steps
+        assert bool(state["log_space"]) == self.__log_space
+
+        self.__is_stream_started = bool(state["is_stream_started"])
+        self.__stream_time = int(state["stream_time"])
+        self.__stream_history.clear()
+        self.__restart_stream(int(state["segment_start"]))
+        self.__pending_observations.clear()
+        self.__gap_size = int(state["gap_size"])
+        self.__learning_sample = list(state["learning_sample"])
+        self.__stream_history.extend(zip(state["history_indices"].tolist(), state["history_observations"]))
+
+        count = state["growth_probs"].shape[0]
+        if count > 0:
+            self.__ensure_growth_probs_size(count + 2)
+            self.__growth_probs[:count] = state["growth_probs"]
+            self.__run_lengths[:count] = state["run_lengths"]
+            if self.__log_space:
+                self.__log_growth_probs[:count] = state["log_growth_probs"]
+            self.__run_lengths_count = count
+
+        self.__likelihood.set_state(extract_state("likelihood", state))
+        self.__hazard.set_state(extract_state("hazard", state))
+        self.__detector.set_state(extract_state("detector", state))
+
+    def snapshot(self, file: File) -> None:
+        """
+        Saves the state of a stream processing into a binary .npz archive, so a restarted process can continue the
+        stream without reprocessing it.
+        :param file: a path or a binary file object to save the state to.
+        """
+        save_state(self.get_state(), file)
+
+    def restore(self, file: File) -> None:
+        """
+        Restores the state of a stream processing from a binary .npz archive made by snapshot.
+        :param file: a path or a binary file object to load the state from.
+        """
+        self.set_state(load_state(file))
+
+    def __restart_stream(self, segment_start: int) -> None:
+        """
+        Starts a new segment of a stream, scheduling seen observations after its start for reprocessing.
+        :param segment_start: index of the first observation of a new segment.
+        """
+        replayed = [(index, observation) for index, observation in self.__stream_history if index >= segment_start]
+        self.__pending_observations.extendleft(reversed(replayed))
+        self.__stream_history.clear()
+
+        self.__segment_start = segment_start
+        self.__learning_sample = []
+        self.__gap_size = 0
+        self.__clear_model()
+        self.__reset_growth_probs(
+            self.__max_run_lengths + 2 if self.__max_run_lengths is not None else INITIAL_CAPACITY
+        )
+
+    def __process_stream_observation(self, index: int, observation: float | np.float64) -> ChangePointEvent | None:
+        """
+        Processes an observation of a stream, mirroring learning and Bayesian stages of window processing.
+        :param index: index of the observation in a stream.
+        :param observation: an observation from a stream.
+        :return: a change point if it was found after processing the observation.
+        """
+        if index < self.__segment_start:
+            # The observation is skipped according to the localized change point.
+            return None
+
+        if len(self.__learning_sample) < self._learning_steps:
+            self.__learning_sample.append(observation)
+            if len(self.__learning_sample) < self._learning_steps:
+                return None
+
+            # Like in window processing, the last learning observation is the first one in Bayesian stage.
+            self.__likelihood.learn(self.__learning_sample)
+            change_point = self.__check_stream_change_point(index)
+            if change_point is not None:
+                return change_point
+
+        self.__stream_history.append((index, observation))
+        self.__gap_size += 1
+        if self.__log_space:
+            self.__log_bayesian_update(observation)
+        else:
+            self.__bayesian_update(observation)
+        self.__record_posterior(index)
+
+        # A change point is localized at most run lengths count observations back, earlier ones are never replayed.
+        while len(self.__stream_history) > self.__run_lengths_count:
+            self.__stream_history.popleft()
+
+        if self.__pred_probs_are_zero:
+            self.__restart_stream(index + 1)
+            return ChangePointEvent(index + 1, index)
+
+        return self.__check_stream_change_point(index + 1)
+
+    def __check_stream_change_point(self, next_index: int) -> ChangePointEvent | None:
+        """
+        Checks whether a change point is detected in a stream, localizes it and restarts the stream from it.
+        :param next_index: index of the next observation to be processed in Bayesian stage.
+        :return: a change point if it was detected.
+        """
+        if not self.__detector.detect(self.__growth_probs[: self.__run_lengths_count]):
+            return None
+
+        run_length = self.__localize_run_length()
+        change_point = next_index - run_length + 1
+        self.__restart_stream(change_point)
+        return ChangePointEvent(change_point, next_index - 1)
+
     def __process_data(self, with_localization: bool, window: Iterable[float | np.float64]) -> None:
         """
         Processes a window of data to detect/localize all change points depending on working mode.
         :param with_localization: boolean flag representing whether function needs to localize a change point.
         :param window: part of global data for change points analysis.
         """
-        sample = list(window)
+        # Arrays (e.g. windows handed out by the scrubber) are processed without copying.
+        sample = window if isinstance(window, np.ndarray) else list(window)
         sample_size = len(sample)
         if sample_size == 0:
             return
 
         self.__prepare(sample_size)
+        if self.__rollback_aware:
+            statistics = self.__likelihood.sufficient_statistics(np.asarray(sample, dtype=np.float64))
+            self.__prefix_statistics = np.zeros((sample_size + 1, *statistics.shape[1:]))
+            np.cumsum(statistics, axis=0, out=self.__prefix_statistics[1:])
 
         while self.__time + self._learning_steps < sample_size:
             self.__learning_stage(sample)
@@ -93,15 +396,21 @@ class BayesianAlgorithm(Algorithm):
             if self.__time < sample_size - 1:
                 self.__process_change_point(sample_size, with_localization)
 
-    def __learning_stage(self, sample: list[float | np.float64]) -> None:
+    def __learning_stage(self, sample: Sequence[float | np.float64] | np.ndarray) -> None:
         """
         Performs a likelihood's parameter learning stage.
         :param sample: an overall sample the model working with.
         """
-        self.__likelihood.learn(sample[self.__time : self.__time + self._learning_steps])
+        if self.__rollback_aware:
+            statistics = (
+                self.__prefix_statistics[self.__time + self._learning_steps] - self.__prefix_statistics[self.__time]
+            )
+            self.__likelihood.learn_from_statistics(statistics, self._learning_steps)
+        else:
+            self.__likelihood.learn(sample[self.__time : self.__time + self._learning_steps])
         self.__shift_time(self._learning_steps - 1)
 
-    def __bayesian_stage(self, sample: list[float | np.float64]) -> None:
+    def __bayesian_stage(self, sample: Sequence[float | np.float64] | np.ndarray) -> None:
         """
         Performs a Bayesian statistics (run lengths distribution) evaluating stage.
         :param sample: an overall sample the model working with.
@@ -116,7 +425,20 @@ class BayesianAlgorithm(Algorithm):
             self.__gap_size += 1
             assert self.__gap_size > 0
 
-            self.__bayesian_update(observation)
+            if self.__log_space:
+                self.__log_bayesian_update(observation)
+            else:
+                self.__bayesian_update(observation)
+            self.__record_posterior(self.__time - 1)
+
+    def __record_posterior(self, index: int) -> None:
+        """
+        Passes the current run lengths distribution to the recorder, if there is one.
+        :param index: index of the processed observation.
+        """
+        if self.__recorder is not None and not self.__pred_probs_are_zero:
+            count = self.__run_lengths_count
+            self.__recorder.record(index, self.__growth_probs[:count], self.__run_lengths[:count])
 
     def __process_change_point(self, sample_size: int, with_localization: bool) -> None:
         """
@@ -130,7 +452,7 @@ class BayesianAlgorithm(Algorithm):
             if self.__pred_probs_are_zero:
                 self.__change_points.append(self.__time)
             else:
-                run_length = self.__localizer.localize(self.__growth_probs[: self.__gap_size])
+                run_length = self.__localize_run_length()
                 assert 0 <= run_length <= sample_size
 
                 change_point = self.__time - run_length + 1
@@ -139,6 +461,13 @@ class BayesianAlgorithm(Algorithm):
 
         self.__clear(sample_size)
 
+    def __localize_run_length(self) -> int:
+        """
+        Localizes a change point by the localizer, mapping the selected hypothesis to its run length.
+        :return: run length of the hypothesis selected by the localizer.
+        """
+        return int(self.__run_lengths[self.__localizer.localize(self.__growth_probs[: self.__run_lengths_count - 1])])
+
     def __bayesian_condition(self, sample_size: int) -> bool:
         """
         A helper function checking conditions (time boundaries, zero predictive probabilities case,
@@ -149,7 +478,7 @@ class BayesianAlgorithm(Algorithm):
             self.__time < sample_size - 1
             and not self.__pred_probs_are_zero
             and not self.__pred_probs_are_zero
-            and not self.__detector.detect(self.__growth_probs[: self.__gap_size + 1])
+            and not self.__detector.detect(self.__growth_probs[: self.__run_lengths_count])
         )
 
     def __bayesian_update(self, observation: float | np.float64) -> None:
@@ -168,33 +497,141 @@ class BayesianAlgorithm(Algorithm):
             self.__pred_probs_are_zero = True
             return
 
+        # Number of run lengths hypotheses before the update (equal to the gap size without truncation).
+        count = self.__run_lengths_count
+        self.__ensure_growth_probs_size(count + 2)
+
         # 4. Evaluate the hazard function for the gap.
-        hazard_val = np.array(self.__hazard.hazard(np.array(range(self.__gap_size))))
+        hazard_val = np.array(self.__hazard.hazard(self.__run_lengths[:count]))
 
         # Evaluate the changepoint probability at *this* step (NB: generally it can be found later, with some delay).
-        changepoint_prob = np.sum(self.__growth_probs[0 : self.__gap_size] * predictive_probs * hazard_val)
+        changepoint_prob = np.sum(self.__growth_probs[0:count] * predictive_probs * hazard_val)
 
         # Evaluate growth probabilities, shifting them down and to the right,
         # scaled by (1 - hazard function value) and prediction probabilities.
-        self.__growth_probs[1 : self.__gap_size + 1] = (
-            self.__growth_probs[0 : self.__gap_size] * predictive_probs * (1.0 - hazard_val)
-        )
+        self.__growth_probs[1 : count + 1] = self.__growth_probs[0:count] * predictive_probs * (1.0 - hazard_val)
 
         # 5. Add CP probability.
         self.__growth_probs[0] = changepoint_prob
+        self.__grow_run_lengths(count)
 
         # 6. Evaluate evidence for growth probabilities renormalization.
-        evidence = np.sum(self.__growth_probs[0 : self.__gap_size + 2])
+        evidence = np.sum(self.__growth_probs[0 : count + 2])
 
         # 7. Renormalize growth probabilities.
         assert evidence > 0.0
-        self.__growth_probs[0 : self.__gap_size + 2] = self.__growth_probs[0 : self.__gap_size + 2] / evidence
+        self.__growth_probs[0 : count + 2] = self.__growth_probs[0 : count + 2] / evidence
 
-        assert np.all(np.logical_and(self.__growth_probs >= 0.0, self.__growth_probs <= 1.0))
+        assert np.all(
+            np.logical_and(self.__growth_probs[0 : count + 2] >= 0.0, self.__growth_probs[0 : count + 2] <= 1.0)
+        )
 
         # 8. Update parameters of likelihood function for every possible run length (typically appends new values).
         self.__likelihood.update(observation)
 
+        self.__run_lengths_count = count + 1
+        self.__truncate_run_lengths()
+
+    def __log_bayesian_update(self, observation: float | np.float64) -> None:
+        """
+        Performs a Bayesian update of statistics (run lengths distribution) in log space. Growth probabilities are
+        evaluated from their logarithms after the update.
+        :param observation: an observation from a sample.
+        """
+        assert not self.__pred_probs_are_zero
+
+        log_predictive_probs = self.__likelihood.predict_log(observation)
+
+        # Predictive probabilities can be exactly zero only if the observation is impossible for every run length.
+        if np.all(np.isneginf(log_predictive_probs)):
+            self.__pred_probs_are_zero = True
+            return
+
+        count = self.__run_lengths_count
+        self.__ensure_growth_probs_size(count + 2)
+        hazard_val = np.array(self.__hazard.hazard(self.__run_lengths[:count]))
+        with np.errstate(divide="ignore"):
+            log_hazard_val = np.log(hazard_val)
+            log_complement_hazard_val = np.log1p(-hazard_val)
+
+        log_joint_probs = self.__log_growth_probs[0:count] + log_predictive_probs
+        changepoint_log_prob = logsumexp(log_joint_probs + log_hazard_val)
+
+        self.__log_growth_probs[1 : count + 1] = log_joint_probs + log_complement_hazard_val
+        self.__log_growth_probs[0] = changepoint_log_prob
+        self.__grow_run_lengths(count)
+
+        log_evidence = logsumexp(self.__log_growth_probs[0 : count + 2])
+        assert np.isfinite(log_evidence)
+        self.__log_growth_probs[0 : count + 2] -= log_evidence
+
+        np.exp(self.__log_growth_probs[0 : count + 2], out=self.__growth_probs[0 : count + 2])
+
+        self.__likelihood.update(observation)
+
+        self.__run_lengths_count = count + 1
+        self.__truncate_run_lengths()
+
+    def __grow_run_lengths(self, count: int) -> None:
+        """
+        Shifts run lengths of hypotheses like their growth probabilities, every run length grows by one and a new
+        hypothesis with zero run length is added.
+        :param count: number of run lengths hypotheses before the update.
+        """
+        self.__run_lengths[1 : count + 1] = self.__run_lengths[0:count] + 1
+        self.__run_lengths[0] = 0
+
+    def __truncate_run_lengths(self) -> None:
+        """
+        Bounds the number of run lengths hypotheses. The longest run lengths are dropped if their total probability is
+        below the pruning threshold. If there are still too many hypotheses, the longest ones are merged into a single
+        hypothesis with the longest run length and its parameters, so the probability of the maximal run length (used
+        by detectors) is preserved, and the hazard is evaluated for the longest run length.
+        """
+        count = self.__run_lengths_count
+
+        if self.__pruning_threshold > 0.0:
+            # Total probabilities of the tails starting from each run length.
+            tail_probs = np.cumsum(self.__growth_probs[count - 1 :: -1])[::-1]
+            new_count = max(1, int(np.count_nonzero(tail_probs >= self.__pruning_threshold)))
+            if new_count < count:
+                self.__drop_run_lengths(new_count, count)
+                count = new_count
+
+                retained_prob = np.sum(self.__growth_probs[:count])
+                assert retained_prob > 0.0
+                self.__growth_probs[:count] /= retained_prob
+                if self.__log_space:
+                    self.__log_growth_probs[:count] -= logsumexp(self.__log_growth_probs[:count])
+
+        if self.__max_run_lengths is not None and count > self.__max_run_lengths:
+            first_merged = self.__max_run_lengths - 1
+            self.__growth_probs[count - 1] = np.sum(self.__growth_probs[first_merged:count])
+            if self.__log_space:
+                self.__log_growth_probs[count - 1] = logsumexp(self.__log_growth_probs[first_merged:count])
+
+            self.__drop_run_lengths(first_merged, count - 1)
+
+    def __drop_run_lengths(self, start: int, stop: int) -> None:
+        """
+        Drops run lengths hypotheses from start (inclusive) to stop (exclusive), shifting the longer ones down, both in
+        growth probabilities and in likelihood's parameters.
+        :param start: the first dropped run length.
+        :param stop: the run length after the last dropped one.
+        """
+        count = self.__run_lengths_count
+        new_count = count - (stop - start)
+
+        self.__growth_probs[start:new_count] = self.__growth_probs[stop:count]
+        self.__growth_probs[new_count:count] = 0.0
+        self.__run_lengths[start:new_count] = self.__run_lengths[stop:count]
+        if self.__log_space:
+            self.__log_growth_probs[start:new_count] = self.__log_growth_probs[stop:count]
+            self.__log_growth_probs[new_count:count] = -np.inf
+
+        self.__likelihood.drop_run_lengths(start, stop)
+        self.__run_lengths_count = new_count
+
     def __shift_time(self, shift: int) -> None:
         """
         A helper function performing a time shift (adding a shift to current time).
@@ -212,6 +649,7 @@ class BayesianAlgorithm(Algorithm):
 
         self.__change_points = []
         self.__change_points_count = 0
+        self.__is_stream_started = False
 
         self.__clear(sample_size)
 
@@ -220,12 +658,64 @@ class BayesianAlgorithm(Algorithm):
         A helper function clearing a state of the model after a change point occurs.
         :param sample_size: an overall size of the sample.
         """
+        self.__clear_model()
+        self.__reset_growth_probs(sample_size - self.__time)
+
+    def __clear_model(self) -> None:
+        """
+        A helper function clearing states of the likelihood and the detector.
+        """
         self.__pred_probs_are_zero = False
         self.__likelihood.clear()
         self.__detector.clear()
 
-        new_size = sample_size - self.__time
-        self.__growth_probs = np.zeros(new_size)
-
+    def __reset_growth_probs(self, new_size: int) -> None:
+        """
+        A helper function resetting growth probabilities to the initial distribution (zero run length is certain).
+        :param new_size: a number of run lengths growth probabilities are evaluated for.
+        """
+        # Only the first run lengths hypotheses may have non-zero probabilities, the rest of a buffer is kept zeroed, so
+        # a reset after a change point does not pass over the whole buffer.
+        used_size = self.__run_lengths_count
+        if new_size > self.__growth_probs_buffer.shape[0]:
+            self.__growth_probs_buffer = np.zeros(new_size)
+            self.__run_lengths = np.zeros(new_size, dtype=np.intp)
+        else:
+            self.__growth_probs_buffer[:used_size] = 0.0
+
+        self.__growth_probs = self.__growth_probs_buffer[: max(new_size, 0)]
         if new_size > 0:
             self.__growth_probs[0] = 1.0
+            self.__run_lengths[0] = 0
+        self.__run_lengths_count = min(new_size, 1)
+
+        if self.__log_space:
+            if new_size > self.__log_growth_probs_buffer.shape[0]:
+                self.__log_growth_probs_buffer = np.full(new_size, -np.inf)
+            else:
+                self.__log_growth_probs_buffer[:used_size] = -np.inf
+
+            self.__log_growth_probs = self.__log_growth_probs_buffer[: max(new_size, 0)]
+            if new_size > 0:
+                self.__log_growth_probs[0] = 0.0
+
+    def __ensure_growth_probs_size(self, required_size: int) -> None:
+        """
+        A helper function extending growth probabilities (with zero probabilities) if they are evaluated for fewer run
+        lengths than required. It is needed only for a stream processing, where the number of run lengths is not known
+        in advance.
+        :param required_size: a required number of run lengths.
+        """
+        size = self.__growth_probs.shape[0]
+        if size >= required_size:
+            return
+
+        self.__growth_probs_buffer = reserve(self.__growth_probs_buffer, size, required_size)
+        self.__growth_probs = self.__growth_probs_buffer
+        self.__growth_probs[size:] = 0.0
+        self.__run_lengths = reserve(self.__run_lengths, size, required_size)
+
+        if self.__log_space:
+            self.__log_growth_probs_buffer = reserve(self.__log_growth_probs_buffer, size, required_size)
+            self.__log_growth_probs = self.__log_growth_probs_buffer
+            self.__log_growth_probs[size:] = -np.inf
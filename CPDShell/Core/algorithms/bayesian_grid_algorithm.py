@@ -0,0 +1,206 @@
+"""
+Module for implementation of Bayesian CPD algorithm evaluating a grid of hazard functions and detectors in one pass.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import copy
+import heapq
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.idetector import IDetector
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ihazard import IHazard
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilikelihood import ILikelihood
+from CPDShell.Core.algorithms.BayesianCPD.abstracts.ilocalizer import ILocalizer
+
+
+class BayesianGridAlgorithm:
+    """
+    The class implementing Bayesian change point detection algorithm for a grid of hazard functions and detectors.
+    Every combination (hazard, detector) gets exactly the same change points as BayesianAlgorithm customized with
+    them, but the data is processed once for all combinations:
+    1) Combinations starting a segment at the same time share the likelihood, so predictive probabilities are
+       evaluated once per observation;
+    2) Growth probabilities are evaluated as a matrix with a row per hazard function;
+    3) Detectors of combinations with the same hazard function read the same row.
+
+    Segments are processed in order of their starts, and combinations split when they find different change points.
+    """
+
+    def __init__(
+        self,
+        learning_steps: int,
+        likelihood: ILikelihood,
+        hazards: Sequence[IHazard],
+        detectors: Sequence[IDetector],
+        localizer: ILocalizer,
+    ):
+        """
+        Initializes a new instance of Bayesian grid algorithm module with given customization.
+        :param learning_steps: number of steps to learn likelihood's parameters.
+        :param likelihood: likelihood function for the given model.
+        :param hazards: hazard functions to evaluate.
+        :param detectors: detectors to evaluate with every hazard function (they are copied for every combination).
+        :param localizer: localizer for change point localization from a run lengths distribution at the moment.
+        """
+        assert len(hazards) > 0
+        assert len(detectors) > 0
+
+        self._learning_steps = learning_steps
+        self.__likelihood = likelihood
+        self.__hazards = list(hazards)
+        self.__localizer = localizer
+
+        self.__combinations = [
+            (hazard_index, detector_index)
+            for hazard_index in range(len(self.__hazards))
+            for detector_index in range(len(detectors))
+        ]
+        self.__detectors = [copy.deepcopy(detectors[detector_index]) for _, detector_index in self.__combinations]
+
+    def detect(self, window: Iterable[float | np.float64]) -> dict[tuple[int, int], int]:
+        """Finds change points in window for every combination of a hazard function and a detector.
+
+        :param window: part of global data for finding change points.
+        :return: the number of change points in the window per pair (hazard's index, detector's index).
+        """
+        change_points = self.__process_data(False, window)
+        return {combination: len(combination_change_points) for combination, combination_change_points in change_points}
+
+    def localize(self, window: Iterable[float | np.float64]) -> dict[tuple[int, int], list[int]]:
+        """Finds coordinates of change points (localizes them) in window for every combination of a hazard function
+        and a detector.
+
+        :param window: part of global data for finding change points.
+        :return: list of window change points per pair (hazard's index, detector's index).
+        """
+        return dict(self.__process_data(True, window))
+
+    def __process_data(
+        self, with_localization: bool, window: Iterable[float | np.float64]
+    ) -> list[tuple[tuple[int, int], list[int]]]:
+        """
+        Processes a window of data to detect/localize change points of all combinations depending on working mode.
+        Without localization a segment after a detected change point starts at the moment of detection, as in
+        BayesianAlgorithm.detect.
+        :param with_localization: boolean flag representing whether function needs to localize change points.
+        :param window: part of global data for change points analysis.
+        :return: pairs of a combination and its change points (moments of detection without localization).
+        """
+        sample = window if isinstance(window, np.ndarray) else list(window)
+        change_points: list[list[int]] = [[] for _ in self.__combinations]
+
+        # Groups of combinations by a start of their current segment.
+        groups: dict[int, list[int]] = {0: list(range(len(self.__combinations)))}
+        starts = [0]
+        while starts:
+            start = heapq.heappop(starts)
+            segment_change_points = self.__process_segment(sample, start, groups.pop(start), with_localization)
+            for combination_index, change_point in segment_change_points:
+                change_points[combination_index].append(change_point)
+                if change_point not in groups:
+                    groups[change_point] = []
+                    heapq.heappush(starts, change_point)
+                groups[change_point].append(combination_index)
+
+        return list(zip(self.__combinations, change_points))
+
+    def __process_segment(
+        self,
+        sample: Sequence[float | np.float64] | np.ndarray,
+        start: int,
+        combination_indices: list[int],
+        with_localization: bool,
+    ) -> list[tuple[int, int]]:
+        """
+        Processes a segment starting at a given time for given combinations until every combination finds a change
+        point or the data ends, mirroring learning and Bayesian stages of BayesianAlgorithm.
+        :param sample: an overall sample the model working with.
+        :param start: a start of the segment.
+        :param combination_indices: indices of combinations starting the segment.
+        :param with_localization: boolean flag representing whether function needs to localize change points.
+        :return: list of pairs (combination's index, change point or the moment of detection).
+        """
+        sample_size = len(sample)
+        if start + self._learning_steps >= sample_size:
+            return []
+
+        self.__likelihood.clear()
+        self.__likelihood.learn(sample[start : start + self._learning_steps])
+        time = start + self._learning_steps - 1
+
+        hazard_indices = sorted({self.__combinations[index][0] for index in combination_indices})
+        rows = {hazard_index: row for row, hazard_index in enumerate(hazard_indices)}
+        growth_probs = np.zeros((len(hazard_indices), sample_size - start))
+        growth_probs[:, 0] = 1.0
+        run_lengths_count = 1
+
+        for index in combination_indices:
+            self.__detectors[index].clear()
+
+        found: list[tuple[int, int]] = []
+        active = list(combination_indices)
+        while time < sample_size - 1:
+            still_active = []
+            for index in active:
+                row = rows[self.__combinations[index][0]]
+                if not self.__detectors[index].detect(growth_probs[row, :run_lengths_count]):
+                    still_active.append(index)
+                    continue
+
+                if not with_localization:
+                    found.append((index, time))
+                    continue
+
+                run_length = self.__localizer.localize(growth_probs[row, : run_lengths_count - 1])
+                assert 0 <= run_length <= sample_size
+                found.append((index, time - run_length + 1))
+
+            active = still_active
+            if not active:
+                break
+
+            observation = sample[time]
+            time += 1
+            predictive_probs = np.asarray(self.__likelihood.predict(observation))
+
+            # Assuming that an abrupt change in all predictive probabilities to zero corresponds to a change point at
+            # this moment (for every hazard function).
+            if np.count_nonzero(predictive_probs) == 0:
+                if time < sample_size - 1:
+                    found.extend((index, time) for index in active)
+                break
+
+            self.__update_growth_probs(growth_probs, run_lengths_count, hazard_indices, predictive_probs)
+
+            self.__likelihood.update(observation)
+            run_lengths_count += 1
+
+        return found
+
+    def __update_growth_probs(
+        self, growth_probs: np.ndarray, count: int, hazard_indices: list[int], predictive_probs: np.ndarray
+    ) -> None:
+        """
+        Performs a Bayesian update of run lengths distributions for several hazard functions at once with shared
+        predictive probabilities. Every row is updated exactly as BayesianAlgorithm does.
+        :param growth_probs: matrix of growth probabilities to update in place, a row per hazard function.
+        :param count: number of run lengths hypotheses before the update.
+        :param hazard_indices: indices of hazard functions corresponding to rows.
+        :param predictive_probs: predictive probabilities for all run lengths.
+        """
+        run_lengths = np.arange(count)
+        hazard_val = np.stack([np.array(self.__hazards[index].hazard(run_lengths)) for index in hazard_indices])
+        joint_probs = growth_probs[:, 0:count] * predictive_probs
+
+        changepoint_probs = np.sum(joint_probs * hazard_val, axis=1)
+        growth_probs[:, 1 : count + 1] = joint_probs * (1.0 - hazard_val)
+        growth_probs[:, 0] = changepoint_probs
+
+        evidence = np.sum(growth_probs[:, 0 : count + 2], axis=1)
+        assert np.all(evidence > 0.0)
+        growth_probs[:, 0 : count + 2] = growth_probs[:, 0 : count + 2] / evidence[:, np.newaxis]
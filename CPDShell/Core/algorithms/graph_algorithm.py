@@ -1,4 +1,4 @@
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Hashable, Iterable
 from typing import Any
 
 import numpy
@@ -9,6 +9,8 @@ from .GpraphCPD.graph_cpd import GraphCPD
 
 
 class GraphAlgorithm(Algorithm):
+    detects_localized_change_points = True
+
     def __init__(self, compare_func: Callable[[Any, Any], bool], threshold: float):
         self.compare = compare_func
         self.threshold = threshold
@@ -26,3 +28,6 @@ class GraphAlgorithm(Algorithm):
         cpd = GraphCPD(graph)
         num_cpd: list[int] = cpd.find_changepoint(self.threshold)
         return len(num_cpd)
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        return self.compare, self.threshold
@@ -1,4 +1,4 @@
-from collections.abc import Iterable
+from collections.abc import Hashable, Iterable
 
 import numpy as np
 
@@ -11,9 +11,27 @@ class KliepAlgorithm(DensityBasedAlgorithm):
 
     KLIEP estimates the density ratio between two distributions and uses
     the importance weights for detecting changes in the data distribution.
+    The density ratio is modelled as a non-negative combination of Gaussian
+    kernel basis functions, whose coefficients maximize the log-likelihood
+    of the test values by projected gradient ascent with the analytic gradient.
+    Observations may be d-dimensional (windows are matrices with a row per
+    observation), kernel matrices have a column per basis centre only.
     """
 
-    def __init__(self, bandwidth: float, regularization_coef: float, threshold: float = 1.1):
+    detects_localized_change_points = True
+
+    def __init__(
+        self,
+        bandwidth: float,
+        regularization_coef: float,
+        threshold: float = 1.1,
+        basis_size: int = 100,
+        learning_rate: float = 1.0,
+        tolerance: float = 1e-6,
+        max_iterations: int = 1000,
+        centre_selection: str = "even",
+        seed: int | None = None,
+    ):
         """Initialize the KLIEP algorithm.
 
         Args:
@@ -21,22 +39,190 @@ class KliepAlgorithm(DensityBasedAlgorithm):
             regularization_coef (float): regularization parameter.
             threshold (float, optional): threshold for detecting change points.
             Defaults to 1.1.
+            basis_size (int, optional): maximal number of kernel basis centres.
+            Defaults to 100.
+            learning_rate (float, optional): initial step of gradient ascent,
+            it grows after an improvement of the objective and is halved otherwise.
+            Defaults to 1.0.
+            tolerance (float, optional): the ascent stops when the objective
+            improves by less than this fraction of its value. Defaults to 1e-6.
+            max_iterations (int, optional): maximal number of ascent steps.
+            Defaults to 1000.
+            centre_selection (str, optional): how kernel basis centres are
+            selected from the test values: "even", "random" or "kmeans".
+            Defaults to "even".
+            seed (int | None, optional): seed of the random centres selection.
+            Defaults to None.
+        """
+        assert learning_rate > 0.0
+        assert max_iterations > 0
+
+        super().__init__(bandwidth, regularization_coef, threshold, basis_size, centre_selection, seed)
+        self.learning_rate = learning_rate
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    @staticmethod
+    def _objective(test_kernel: np.ndarray, coefficients: np.ndarray, regularization_coef: float) -> float:
+        """Objective of KLIEP: the mean log density ratio at the test values minus the regularization term.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            coefficients (np.ndarray): coefficients of the basis functions.
+            regularization_coef (float): regularization parameter.
+
+        Returns:
+            float: the objective value.
         """
-        self.bandwidth = bandwidth
-        self.regularization_coef = regularization_coef
-        self.threshold = threshold
+        with np.errstate(divide="ignore"):
+            return np.mean(np.log(test_kernel @ coefficients)) - regularization_coef * np.sum(coefficients**2)
 
-    def _loss_function(self, density_ratio: np.ndarray, alpha: np.ndarray) -> float:
-        """Loss function for KLIEP.
+    @staticmethod
+    def _project(coefficients: np.ndarray, reference_means: np.ndarray) -> np.ndarray:
+        """Project coefficients onto the feasible set: the mean density ratio at the reference values equals one, and
+        coefficients are non-negative.
+
+        The projection is max(coefficients - nu * reference_means, 0), the multiplier nu is found by sorting
+        coefficients by their ratios to reference means, as in the projection onto a simplex.
 
         Args:
-            density_ratio (np.ndarray): estimated density ratio.
-            alpha (np.ndarray): coefficients for the density ratio.
+            coefficients (np.ndarray): coefficients of the basis functions.
+            reference_means (np.ndarray): means of the basis functions at the reference values.
 
         Returns:
-            float: the computed loss value.
+            np.ndarray: the closest feasible coefficients.
         """
-        return -np.mean(density_ratio) + self.regularization_coef * np.sum(alpha**2)
+        breakpoints = coefficients / reference_means
+        order = np.argsort(-breakpoints)
+        # Leading multipliers are infinite if reference means underflow, the last active one is always finite.
+        with np.errstate(divide="ignore"):
+            multipliers = (np.cumsum((reference_means * coefficients)[order]) - 1.0) / np.cumsum(
+                reference_means[order] ** 2
+            )
+        active_count = np.flatnonzero(breakpoints[order] > multipliers)[-1]
+        return np.maximum(coefficients - multipliers[active_count] * reference_means, 0.0)
+
+    def _fit_coefficients(
+        self,
+        test_kernel: np.ndarray,
+        reference_means: np.ndarray,
+        initial_coefficients: np.ndarray | None = None,
+        regularization_coef: float | None = None,
+    ) -> np.ndarray:
+        """Maximize the objective by projected gradient ascent with the analytic gradient. A step grows after an
+        improvement and is halved otherwise.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            reference_means (np.ndarray): means of the basis functions at the reference values.
+            initial_coefficients (np.ndarray | None, optional): coefficients to start from, equal coefficients are
+            used if None. Defaults to None.
+            regularization_coef (float | None, optional): regularization parameter, the algorithm's one is used if
+            None. Defaults to None.
+
+        Returns:
+            np.ndarray: coefficients of the basis functions.
+        """
+        if initial_coefficients is None:
+            initial_coefficients = np.ones(test_kernel.shape[1])
+        if regularization_coef is None:
+            regularization_coef = self.regularization_coef
+        coefficients = self._project(initial_coefficients, reference_means)
+        objective = self._objective(test_kernel, coefficients, regularization_coef)
+        learning_rate = self.learning_rate
+        for _ in range(self.max_iterations):
+            # Test values with zero density ratio make the objective infinite whatever the step, so they are skipped.
+            ratios = test_kernel @ coefficients
+            inverse_ratios = np.divide(1.0, ratios, out=np.zeros_like(ratios), where=ratios > 0.0)
+            gradient = test_kernel.T @ inverse_ratios / test_kernel.shape[0]
+            gradient -= 2 * regularization_coef * coefficients
+            new_coefficients = self._project(coefficients + learning_rate * gradient, reference_means)
+            new_objective = self._objective(test_kernel, new_coefficients, regularization_coef)
+            if not new_objective >= objective:
+                learning_rate /= 2
+                continue
+
+            coefficients, objective, previous_objective = new_coefficients, new_objective, objective
+            learning_rate *= 1.5
+            if not np.isfinite(objective) or objective - previous_objective <= self.tolerance * abs(objective):
+                break
+
+        return coefficients
+
+    def _calculate_density_ratio(self, test_value: np.ndarray, reference_value: np.ndarray) -> np.ndarray:
+        """Calculate the density ratio at the test values.
+
+        Args:
+            test_value (np.ndarray): the test data points.
+            reference_value (np.ndarray): the reference data points.
+
+        Returns:
+            np.ndarray: the density ratios at the test values normalized to their mean.
+        """
+        centres = self._select_centres(test_value, self.basis_size, self.centre_selection, self.seed)
+        test_kernel = self._gaussian_kernel_matrix(test_value, centres, self.bandwidth)
+        reference_kernel = self._gaussian_kernel_matrix(reference_value, centres, self.bandwidth)
+        reference_means = np.maximum(np.mean(reference_kernel, axis=0), np.finfo(np.float64).tiny)
+
+        density_ratio = test_kernel @ self._fit_coefficients(test_kernel, reference_means)
+        return density_ratio / np.mean(density_ratio)
+
+    def _window_divergence(
+        self,
+        test_kernel: np.ndarray,
+        test_gram: np.ndarray,
+        test_means: np.ndarray,
+        reference_gram: np.ndarray,
+        reference_means: np.ndarray,
+        initial_coefficients: np.ndarray | None,
+    ) -> tuple[float, np.ndarray]:
+        """Estimate the Kullback-Leibler divergence between the test and the reference windows as the mean log density
+        ratio at the test values, warm-starting the ascent from the previous position's coefficients.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            test_gram (np.ndarray): mean outer product of basis functions over the test values (unused).
+            test_means (np.ndarray): means of basis functions over the test values (unused).
+            reference_gram (np.ndarray): mean outer product of basis functions over the reference values (unused).
+            reference_means (np.ndarray): means of basis functions over the reference values.
+            initial_coefficients (np.ndarray | None): coefficients at the previous position.
+
+        Returns:
+            tuple[float, np.ndarray]: the divergence and coefficients of the density ratio.
+        """
+        reference_means = np.maximum(reference_means, np.finfo(np.float64).tiny)
+        coefficients = self._fit_coefficients(test_kernel, reference_means, initial_coefficients)
+        with np.errstate(divide="ignore"):
+            divergence = np.mean(np.log(test_kernel @ coefficients))
+        return float(divergence), coefficients
+
+    def _cross_validation_losses(
+        self, test_kernel: np.ndarray, reference_kernel: np.ndarray, regularization_coefs: np.ndarray, folds: int
+    ) -> np.ndarray:
+        """Evaluate likelihood cross-validation losses of regularization parameters: test values are split into folds,
+        and the ascent for every regularization parameter is warm-started from the previous one.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            reference_kernel (np.ndarray): kernel basis functions at the reference values.
+            regularization_coefs (np.ndarray): regularization parameters to evaluate.
+            folds (int): number of cross-validation folds.
+
+        Returns:
+            np.ndarray: negated held-out mean log density ratios for every regularization parameter.
+        """
+        reference_means = np.maximum(np.mean(reference_kernel, axis=0), np.finfo(np.float64).tiny)
+        test_folds = np.arange(len(test_kernel)) % folds
+        losses = np.zeros(len(regularization_coefs))
+        for fold in range(folds):
+            train_test, held_test = test_kernel[test_folds != fold], test_kernel[test_folds == fold]
+            coefficients = None
+            for index, regularization_coef in enumerate(regularization_coefs):
+                coefficients = self._fit_coefficients(train_test, reference_means, coefficients, regularization_coef)
+                with np.errstate(divide="ignore"):
+                    losses[index] -= np.mean(np.log(held_test @ coefficients))
+
+        return losses / folds
 
     def detect(self, window: Iterable[float | np.float64]) -> int:
         """Detect the number of change points in the given data window
@@ -49,16 +235,10 @@ class KliepAlgorithm(DensityBasedAlgorithm):
             int: the number of detected change points.
         """
 
-        window_sample = np.array(window)
-        weights = self._calculate_weights(
-            self=self,
-            test_value=window_sample,
-            reference_value=window_sample,
-            bandwidth=self.bandwidth,
-            objective_function=self._loss_function,
-        )
+        window_sample = np.asarray(window)
+        weights = self._calculate_density_ratio(window_sample, window_sample)
 
-        return np.count_nonzero(weights > self.threshold)
+        return int(np.count_nonzero(weights > self.threshold))
 
     def localize(self, window: Iterable[float | np.float64]) -> list[int]:
         """Localize the change points in the given data window using KLIEP.
@@ -70,13 +250,29 @@ class KliepAlgorithm(DensityBasedAlgorithm):
         Returns:
             List[int]: the indices of the detected change points.
         """
-        window_sample = np.array(window)
-        weights = self._calculate_weights(
-            self=self,
-            test_value=window_sample,
-            reference_value=window_sample,
-            bandwidth=self.bandwidth,
-            objective_function=self._loss_function,
-        )
+        window_sample = np.asarray(window)
+        weights = self._calculate_density_ratio(window_sample, window_sample)
 
         return np.where(weights > self.threshold)[0].tolist()
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """Parameters of KLIEP the detected change points depend on.
+
+        Returns:
+            tuple[Hashable, ...] | None: the algorithm's parameters, None if
+            basis centres are selected randomly without a seed, so results are
+            not reproducible.
+        """
+        if self.centre_selection != "even" and self.seed is None:
+            return None
+        return (
+            self.bandwidth,
+            self.regularization_coef,
+            self.threshold,
+            self.basis_size,
+            self.learning_rate,
+            self.tolerance,
+            self.max_iterations,
+            self.centre_selection,
+            self.seed,
+        )
@@ -7,14 +7,15 @@ __copyright__ = "Copyright (c) 2024 Artemii Patov"
 __license__ = "SPDX-License-Identifier: MIT"
 
 import typing as tp
-from collections import deque
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from math import sqrt
 
 import numpy as np
 
 import CPDShell.Core.algorithms.KNNCPD.knn_graph as knngraph
 from CPDShell.Core.algorithms.abstract_algorithm import Algorithm
+from CPDShell.Core.algorithms.KNNCPD.knn_statistics import StatisticsPool
+from CPDShell.Core.algorithms.snapshots import File, State, load_state, save_state
 
 
 class KNNAlgorithm(Algorithm):
@@ -28,6 +29,7 @@ class KNNAlgorithm(Algorithm):
         k=3,
         threshold: float = 0.5,
         delta: float = 1e-12,
+        workers: int = 1,
     ) -> None:
         """
         Initializes a new instance of KNN change point algorithm.
@@ -35,16 +37,51 @@ class KNNAlgorithm(Algorithm):
         :param metric: function for calculating distance between points in time series.
         :param k: number of neighbours in graph relative to each point.
         :param threshold: threshold that statistics should overcome to fix change point.
+        :param delta: kept for compatibility, observations are compared by their indices in a window, so it does not
+            change results.
+        :param workers: number of processes to calculate statistics in candidate points with. If it is greater than 1,
+            candidate points are split across a process pool sharing the indices of neighbours. The pool is started by
+            the first window and is kept until close is called.
         """
+        assert workers > 0, "Number of workers should be positive."
+
         self.__k = k
         self.__metric = metric
         self.__threshold = threshold
-        self.__delta = delta
+        self.__workers = workers
 
         self.__change_points: list[int] = []
         self.__change_points_count = 0
 
         self.__knn_graph: knngraph.KNNGraph | None = None
+        self.__statistics_pool: StatisticsPool | None = None
+
+    def __getstate__(self) -> dict[str, tp.Any]:
+        """
+        Returns the algorithm's attributes for pickling and copying. A copy starts its own process pool.
+
+        :return: the algorithm's attributes without the process pool.
+        """
+        attributes = self.__dict__.copy()
+        attributes["_KNNAlgorithm__statistics_pool"] = None
+        return attributes
+
+    def close(self) -> None:
+        """
+        Shuts down the process pool calculating statistics, a next window starts a new one.
+        """
+        if self.__statistics_pool is not None:
+            self.__statistics_pool.close()
+            self.__statistics_pool = None
+
+    def cache_parameters(self) -> tuple[tp.Hashable, ...] | None:
+        """
+        Returns the configuration the found change points depend on. Neither delta nor the number of workers change
+        them.
+
+        :return: the algorithm's parameters.
+        """
+        return self.__metric, self.__k, self.__threshold
 
     def detect(self, window: Iterable[float | np.float64]) -> int:
         """Finds change points in window.
@@ -52,7 +89,7 @@ class KNNAlgorithm(Algorithm):
         :param window: part of global data for finding change points.
         :return: the number of change points in the window.
         """
-        self.__process_data(False, window)
+        self.__process_data(window)
         return self.__change_points_count
 
     def localize(self, window: Iterable[float | np.float64]) -> list[int]:
@@ -64,33 +101,80 @@ class KNNAlgorithm(Algorithm):
         self.__process_data(window)
         return self.__change_points.copy()
 
+    def get_state(self) -> State:
+        """
+        Returns the algorithm's state: change points found in the last processed window. The graph is built for every
+        window from scratch, so it is not a part of the state.
+
+        :return: the algorithm's state.
+        """
+        return {
+            "k": np.array(self.__k),
+            "change_points": np.array(self.__change_points, dtype=np.int64),
+            "change_points_count": np.array(self.__change_points_count),
+        }
+
+    def set_state(self, state: State) -> None:
+        """
+        Restores the algorithm's state returned by get_state.
+
+        :param state: the algorithm's state.
+        """
+        assert int(state["k"]) == self.__k, "Number of neighbours should be the same."
+
+        self.__change_points = state["change_points"].tolist()
+        self.__change_points_count = int(state["change_points_count"])
+
+    def snapshot(self, file: File) -> None:
+        """
+        Saves the algorithm's state into a binary .npz archive.
+
+        :param file: a path or a binary file object to save the state to.
+        """
+        save_state(self.get_state(), file)
+
+    def restore(self, file: File) -> None:
+        """
+        Restores the algorithm's state from a binary .npz archive made by snapshot.
+
+        :param file: a path or a binary file object to load the state from.
+        """
+        self.set_state(load_state(file))
+
     def __process_data(self, window: Iterable[float | np.float64]) -> None:
         """
         Processes a window of data to detect/localize all change points depending on working mode.
 
         :param window: part of global data for change points analysis.
         """
-        sample = deque(window)
+        sample = window if isinstance(window, np.ndarray | Sequence) else list(window)
         sample_size = len(sample)
         if sample_size == 0:
             return
 
         # Preparing.
-        self.__change_points: list[int] = []
+        self.__change_points = []
         self.__change_points_count = 0
 
         # Building graph.
-        self.__knn_graph = knngraph.KNNGraph(window, self.__metric, self.__k, self.__delta)
+        self.__knn_graph = knngraph.KNNGraph(sample, self.__metric, self.__k)
         self.__knn_graph.build()
 
         # Examining each point.
         # Boundaries are always change points.
-        first_point = int(len(window) * 0.25)
-        last_point = int(len(window) * 0.75)
-
-        for time in range(first_point, last_point):
-            statistics = self.__calculate_statistics_in_point(time, len(window))
-
+        first_point = int(sample_size * 0.25)
+        last_point = int(sample_size * 0.75)
+
+        times = range(first_point, last_point)
+        if self.__workers > 1:
+            if self.__statistics_pool is None:
+                self.__statistics_pool = StatisticsPool(self.__workers)
+            neighbours = self.__knn_graph.get_neighbours_indices()
+            points_statistics = self.__statistics_pool.calculate(neighbours, times, self.__k)
+        else:
+            points_statistics = [self.__calculate_statistics_in_point(time, sample_size) for time in times]
+
+        for time, statistics in zip(times, points_statistics):
             if self.__check_change_point(statistics):
                 self.__change_points.append(time)
                 self.__change_points_count += 1
@@ -134,7 +218,7 @@ class KNNAlgorithm(Algorithm):
         variance = (expectation / k) * (h * (sum_1 + k - (2 * k**2 / (n - 1))) + (1 - h) * (sum_2 - k**2))
         deviation = sqrt(variance)
 
-        permutation: np.array = np.arange(window_size)
+        permutation: np.ndarray = np.arange(window_size)
         random_variable_value = self.__calculate_random_variable(permutation, time, window_size)
 
         if deviation == 0:
@@ -156,7 +240,7 @@ class KNNAlgorithm(Algorithm):
         """
         return statistics > self.__threshold
 
-    def __calculate_random_variable(self, permutation: np.array, t: int, window_size: int) -> int:
+    def __calculate_random_variable(self, permutation: np.ndarray, t: int, window_size: int) -> int:
         """
         Calculate a random variable from a permutation and a fixed point.
 
@@ -164,6 +248,8 @@ class KNNAlgorithm(Algorithm):
         :param t: fixed point that splits the permutation.
         :return: value of the random variable.
         """
+        assert self.__knn_graph is not None, "Graph should not be None."
+        knn_graph = self.__knn_graph
 
         def b(i: int, j: int) -> bool:
             pi = permutation[i]
@@ -171,7 +257,7 @@ class KNNAlgorithm(Algorithm):
             return (pi <= t < pj) or (pj <= t < pi)
 
         s = sum(
-            (self.__knn_graph.check_for_neighbourhood(i, j) + self.__knn_graph.check_for_neighbourhood(j, i)) * b(i, j)
+            (int(knn_graph.check_for_neighbourhood(i, j)) + int(knn_graph.check_for_neighbourhood(j, i))) * b(i, j)
             for i in range(window_size)
             for j in range(window_size)
         )
@@ -1,6 +1,7 @@
-from collections.abc import Iterable
+from collections.abc import Hashable, Iterable
 
 import numpy as np
+from scipy import linalg
 
 from CPDShell.Core.algorithms.DensityBasedCPD.abstracts.density_based_algorithm import DensityBasedAlgorithm
 
@@ -11,9 +12,25 @@ class RulsifAlgorithm(DensityBasedAlgorithm):
 
     RULSIF estimates the density ratio between two distributions and uses
     the importance weights for detecting changes in the data distribution.
+    The relative density ratio is modelled as a linear combination of
+    Gaussian kernel basis functions, and its coefficients are the solution
+    of a small regularized linear system, so no iterative optimization is needed.
+    Observations may be d-dimensional (windows are matrices with a row per
+    observation), kernel matrices have a column per basis centre only.
     """
 
-    def __init__(self, bandwidth: float, regularization_coef: float, threshold: float = 1.1):
+    detects_localized_change_points = True
+
+    def __init__(
+        self,
+        bandwidth: float,
+        regularization_coef: float,
+        threshold: float = 1.1,
+        relative_coef: float = 0.1,
+        basis_size: int = 100,
+        centre_selection: str = "even",
+        seed: int | None = None,
+    ):
         """Initialize the RULSIF algorithm.
 
         Args:
@@ -21,22 +38,149 @@ class RulsifAlgorithm(DensityBasedAlgorithm):
             regularization_coef (float): regularization parameter.
             threshold (float, optional): threshold for detecting change points.
             Defaults to 1.1.
+            relative_coef (float, optional): weight of the test distribution in
+            the denominator of the relative density ratio. Defaults to 0.1.
+            basis_size (int, optional): maximal number of kernel basis centres.
+            Defaults to 100.
+            centre_selection (str, optional): how kernel basis centres are
+            selected from the test values: "even", "random" or "kmeans".
+            Defaults to "even".
+            seed (int | None, optional): seed of the random centres selection.
+            Defaults to None.
         """
-        self.bandwidth = bandwidth
-        self.regularization_coef = regularization_coef
-        self.threshold = threshold
+        assert 0.0 <= relative_coef < 1.0
+
+        super().__init__(bandwidth, regularization_coef, threshold, basis_size, centre_selection, seed)
+        self.relative_coef = relative_coef
 
-    def _loss_function(self, density_ratio: np.ndarray, alpha: np.ndarray) -> float:
-        """Loss function for RULSIF.
+    def _calculate_density_ratio(self, test_value: np.ndarray, reference_value: np.ndarray) -> np.ndarray:
+        """Calculate the relative density ratio at the test values in closed form.
 
         Args:
-            density_ratio (np.ndarray): estimated density ratio.
-            alpha (np.ndarray): coefficients for the density ratio.
+            test_value (np.ndarray): the test data points.
+            reference_value (np.ndarray): the reference data points.
 
         Returns:
-            float: the computed loss value.
+            np.ndarray: the density ratios at the test values normalized to their mean.
         """
-        return np.mean((density_ratio - 1) ** 2) + self.regularization_coef * np.sum(alpha**2)
+        centres = self._select_centres(test_value, self.basis_size, self.centre_selection, self.seed)
+        test_kernel = self._gaussian_kernel_matrix(test_value, centres, self.bandwidth)
+        reference_kernel = self._gaussian_kernel_matrix(reference_value, centres, self.bandwidth)
+
+        second_moment = self.relative_coef * (test_kernel.T @ test_kernel) / len(test_value) + (
+            1.0 - self.relative_coef
+        ) * (reference_kernel.T @ reference_kernel) / len(reference_value)
+        second_moment[np.diag_indices_from(second_moment)] += self.regularization_coef
+        coefficients = linalg.solve(second_moment, np.mean(test_kernel, axis=0), assume_a="pos")
+
+        density_ratio = np.maximum(test_kernel @ coefficients, 0.0)
+        mean_ratio = np.mean(density_ratio)
+        return density_ratio / mean_ratio if mean_ratio > 0.0 else np.ones_like(density_ratio)
+
+    def _calculate_batch_density_ratios(self, windows: np.ndarray) -> np.ndarray:
+        """Calculate relative density ratios within several windows at once, as _calculate_density_ratio does for
+        a window being both the test and the reference values. Evenly selected centres take the same positions in
+        every window, so kernel matrices and linear systems of all windows are stacked and solved together.
+
+        Args:
+            windows (np.ndarray): array with a row per window.
+
+        Returns:
+            np.ndarray: the density ratios with a row per window normalized to their means.
+        """
+        windows_count, window_length = windows.shape[:2]
+        points = np.asarray(windows, dtype=np.float64).reshape(windows_count, window_length, -1)
+        centres = points[:, self._select_centres(np.arange(window_length), self.basis_size)]
+        squared_distances = (
+            np.sum(points**2, axis=2)[:, :, np.newaxis]
+            + np.sum(centres**2, axis=2)[:, np.newaxis, :]
+            - 2 * points @ centres.transpose(0, 2, 1)
+        )
+        kernel = np.exp(-np.maximum(squared_distances, 0.0) / (2 * self.bandwidth**2))
+
+        # A window is both the test and the reference sample, so the relative mixture of their second moments is the
+        # second moment of the window whatever the relative coefficient is.
+        second_moment = kernel.transpose(0, 2, 1) @ kernel / window_length
+        second_moment += self.regularization_coef * np.eye(centres.shape[1])
+        coefficients = np.linalg.solve(second_moment, np.mean(kernel, axis=1)[:, :, np.newaxis])
+
+        density_ratios = np.maximum((kernel @ coefficients)[:, :, 0], 0.0)
+        mean_ratios = np.mean(density_ratios, axis=1, keepdims=True)
+        return np.divide(density_ratios, mean_ratios, out=np.ones_like(density_ratios), where=mean_ratios > 0.0)
+
+    def _window_divergence(
+        self,
+        test_kernel: np.ndarray,
+        test_gram: np.ndarray,
+        test_means: np.ndarray,
+        reference_gram: np.ndarray,
+        reference_means: np.ndarray,
+        initial_coefficients: np.ndarray | None,
+    ) -> tuple[float, np.ndarray]:
+        """Estimate the Pearson divergence between the test and the reference windows from their Gram matrices.
+        The closed-form solution does not need a warm start.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            test_gram (np.ndarray): mean outer product of basis functions over the test values.
+            test_means (np.ndarray): means of basis functions over the test values.
+            reference_gram (np.ndarray): mean outer product of basis functions over the reference values.
+            reference_means (np.ndarray): means of basis functions over the reference values.
+            initial_coefficients (np.ndarray | None): coefficients at the previous position (unused).
+
+        Returns:
+            tuple[float, np.ndarray]: the divergence and coefficients of the relative density ratio.
+        """
+        second_moment = self.relative_coef * test_gram + (1.0 - self.relative_coef) * reference_gram
+        regularized = second_moment.copy()
+        regularized[np.diag_indices_from(regularized)] += self.regularization_coef
+        coefficients = linalg.solve(regularized, test_means, assume_a="pos")
+
+        divergence = test_means @ coefficients - 0.5 * coefficients @ second_moment @ coefficients - 0.5
+        return float(divergence), coefficients
+
+    def _cross_validation_losses(
+        self, test_kernel: np.ndarray, reference_kernel: np.ndarray, regularization_coefs: np.ndarray, folds: int
+    ) -> np.ndarray:
+        """Evaluate least-squares cross-validation losses of regularization parameters. An eigendecomposition of the
+        training second moment matrix of a fold is shared across all regularization parameters.
+
+        Args:
+            test_kernel (np.ndarray): kernel basis functions at the test values.
+            reference_kernel (np.ndarray): kernel basis functions at the reference values.
+            regularization_coefs (np.ndarray): regularization parameters to evaluate.
+            folds (int): number of cross-validation folds.
+
+        Returns:
+            np.ndarray: the held-out RULSIF losses for every regularization parameter.
+        """
+        test_folds = np.arange(len(test_kernel)) % folds
+        reference_folds = np.arange(len(reference_kernel)) % folds
+        losses = np.zeros(len(regularization_coefs))
+        for fold in range(folds):
+            train_test, held_test = test_kernel[test_folds != fold], test_kernel[test_folds == fold]
+            train_reference, held_reference = (
+                reference_kernel[reference_folds != fold],
+                reference_kernel[reference_folds == fold],
+            )
+            second_moment = self.relative_coef * (train_test.T @ train_test) / len(train_test) + (
+                1.0 - self.relative_coef
+            ) * (train_reference.T @ train_reference) / len(train_reference)
+            eigenvalues, eigenvectors = linalg.eigh(second_moment)
+            projected_means = eigenvectors.T @ np.mean(train_test, axis=0)
+            coefficients = eigenvectors @ (
+                projected_means[:, np.newaxis] / (eigenvalues[:, np.newaxis] + regularization_coefs[np.newaxis, :])
+            )
+
+            test_ratios = held_test @ coefficients
+            reference_ratios = held_reference @ coefficients
+            losses += (
+                self.relative_coef / 2 * np.mean(test_ratios**2, axis=0)
+                + (1.0 - self.relative_coef) / 2 * np.mean(reference_ratios**2, axis=0)
+                - np.mean(test_ratios, axis=0)
+            )
+
+        return losses / folds
 
     def detect(self, window: Iterable[float | np.float64]) -> int:
         """Detect the number of change points in the given data window
@@ -48,16 +192,10 @@ class RulsifAlgorithm(DensityBasedAlgorithm):
         Returns:
             int: the number of detected change points.
         """
-        window_sample = np.array(window)
-        weights = self._calculate_weights(
-            self=self,
-            test_value=window_sample,
-            reference_value=window_sample,
-            bandwidth=self.bandwidth,
-            objective_function=self._loss_function,
-        )
+        window_sample = np.asarray(window)
+        weights = self._calculate_density_ratio(window_sample, window_sample)
 
-        return np.count_nonzero(weights > self.threshold)
+        return int(np.count_nonzero(weights > self.threshold))
 
     def localize(self, window: Iterable[float | np.float64]) -> list[int]:
         """Localize the change points in the given data window using RULSIF.
@@ -68,13 +206,59 @@ class RulsifAlgorithm(DensityBasedAlgorithm):
         Returns:
             List[int]: the indices of the detected change points.
         """
-        window_sample = np.array(window)
-        weights = self._calculate_weights(
-            self=self,
-            test_value=window_sample,
-            reference_value=window_sample,
-            bandwidth=self.bandwidth,
-            objective_function=self._loss_function,
-        )
+        window_sample = np.asarray(window)
+        weights = self._calculate_density_ratio(window_sample, window_sample)
 
         return np.where(weights > self.threshold)[0].tolist()
+
+    def detect_batch(self, windows: np.ndarray) -> list[int]:
+        """Detect the number of change points in several data windows at once
+        using RULSIF. Only evenly selected centres are vectorized.
+
+        Args:
+            windows (np.ndarray): array with a row per window.
+
+        Returns:
+            list[int]: the number of detected change points in every window.
+        """
+        if self.centre_selection != "even":
+            return super().detect_batch(windows)
+
+        weights = self._calculate_batch_density_ratios(windows)
+        return np.count_nonzero(weights > self.threshold, axis=1).tolist()
+
+    def localize_batch(self, windows: np.ndarray) -> list[list[int]]:
+        """Localize the change points in several data windows at once using
+        RULSIF. Only evenly selected centres are vectorized.
+
+        Args:
+            windows (np.ndarray): array with a row per window.
+
+        Returns:
+            list[list[int]]: the indices of the detected change points in every window.
+        """
+        if self.centre_selection != "even":
+            return super().localize_batch(windows)
+
+        weights = self._calculate_batch_density_ratios(windows)
+        return [np.flatnonzero(window_weights > self.threshold).tolist() for window_weights in weights]
+
+    def cache_parameters(self) -> tuple[Hashable, ...] | None:
+        """Parameters of RULSIF the detected change points depend on.
+
+        Returns:
+            tuple[Hashable, ...] | None: the algorithm's parameters, None if
+            basis centres are selected randomly without a seed, so results are
+            not reproducible.
+        """
+        if self.centre_selection != "even" and self.seed is None:
+            return None
+        return (
+            self.bandwidth,
+            self.regularization_coef,
+            self.threshold,
+            self.relative_coef,
+            self.basis_size,
+            self.centre_selection,
+            self.seed,
+        )
@@ -0,0 +1,75 @@
+"""
+Module for helpers saving and loading algorithms' state snapshots as binary .npz archives.
+"""
+
+__author__ = "Alexey Tatyanenko"
+__copyright__ = "Copyright (c) 2024 Alexey Tatyanenko"
+__license__ = "SPDX-License-Identifier: MIT"
+
+import os
+import typing as tp
+
+import numpy as np
+
+# A state is a flat mapping from names to arrays, names of nested components' states are prefixed with "<component>.".
+State = dict[str, np.ndarray]
+File = str | os.PathLike | tp.BinaryIO
+
+
+def save_state(state: State, file: File) -> None:
+    """
+    Saves a state into a compressed .npz archive.
+    :param state: a state to save.
+    :param file: a path or a binary file object to save the state to.
+    """
+    # Arrays are passed by their names, the cast keeps numpy's stubs from matching them with the allow_pickle flag.
+    np.savez_compressed(file, **tp.cast(dict[str, tp.Any], state))
+
+
+def load_state(file: File) -> State:
+    """
+    Loads a state from an .npz archive. Archives are loaded without pickling, so only arrays are allowed.
+    :param file: a path or a binary file object to load the state from.
+    :return: the loaded state.
+    """
+    with np.load(file, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def nest_state(prefix: str, state: State) -> State:
+    """
+    Prefixes names of a component's state to put it into a state of an enclosing object.
+    :param prefix: name of the component.
+    :param state: the component's state.
+    :return: state with prefixed names.
+    """
+    return {f"{prefix}.{name}": value for name, value in state.items()}
+
+
+def extract_state(prefix: str, state: State) -> State:
+    """
+    Extracts a component's state from a state of an enclosing object.
+    :param prefix: name of the component.
+    :param state: the enclosing object's state.
+    :return: the component's state with names without the prefix.
+    """
+    full_prefix = f"{prefix}."
+    return {name[len(full_prefix) :]: value for name, value in state.items() if name.startswith(full_prefix)}
+
+
+def optional_to_array(value: float | None) -> np.ndarray:
+    """
+    Converts an optional scalar into an array, which is empty for None.
+    :param value: an optional scalar.
+    :return: array of zero or one element.
+    """
+    return np.array([] if value is None else [value], dtype=np.float64)
+
+
+def array_to_optional(array: np.ndarray) -> np.float64 | None:
+    """
+    Converts an array made by optional_to_array back into an optional scalar.
+    :param array: array of zero or one element.
+    :return: an optional scalar.
+    """
+    return None if array.shape[0] == 0 else array[0]
@@ -1,33 +1,280 @@
+import asyncio
+import copy
+import pickle
+import threading
+from collections.abc import AsyncIterable, AsyncIterator, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy
+
 from .algorithms.graph_algorithm import Algorithm
 from .scrubber.scrubber import Scrubber
+from .scrubber.streaming_scrubber import StreamingScrubber
+from .window_cache import WindowCache
+
+
+def _process_window(
+    algorithm: Algorithm,
+    window: Sequence[float | numpy.float64] | numpy.ndarray,
+    to_localize: bool,
+    window_length: int,
+    cache: WindowCache | None = None,
+) -> list[int]:
+    """Find change points in a window. It is a module-level function, so it can be executed in worker processes.
+
+    :param algorithm: change point detection algorithm
+    :param window: part of global data for finding change points
+    :param to_localize: whether change points should be localized or only detected
+    :param window_length: length of data window
+    :param cache: cache of change points found in windows, windows are always processed if None
+    :return: list of window change points
+    """
+    if to_localize:
+        return algorithm.localize(window) if cache is None else cache.localize(algorithm, window)
+    change_points_number = algorithm.detect(window) if cache is None else cache.detect(algorithm, window)
+    return [window_length] * change_points_number
+
+
+# The algorithm of the current worker, it is set once by the pool's initializer instead of being sent with every window.
+_worker = threading.local()
+
+
+def _initialize_worker(algorithm: Algorithm, to_copy: bool) -> None:
+    """Give the worker its own algorithm. Worker processes already get a copy, worker threads share memory, so they
+    copy the algorithm.
+
+    :param algorithm: change point detection algorithm
+    :param to_copy: whether the worker should copy the algorithm
+    """
+    _worker.algorithm = copy.deepcopy(algorithm) if to_copy else algorithm
+
+
+def _process_window_in_worker(
+    window: Sequence[float | numpy.float64] | numpy.ndarray, to_localize: bool, window_length: int
+) -> list[int]:
+    """Find change points in a window by the worker's algorithm.
+
+    :param window: part of global data for finding change points
+    :param to_localize: whether change points should be localized or only detected
+    :param window_length: length of data window
+    :return: list of window change points
+    """
+    return _process_window(_worker.algorithm, window, to_localize, window_length)
+
+
+def _is_picklable(value: object) -> bool:
+    """Check whether a value can be sent to worker processes.
+
+    :param value: checked value
+    :return: True if the value can be pickled
+    """
+    try:
+        pickle.dumps(value)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _process_windows(
+    algorithm: Algorithm, windows: numpy.ndarray, to_localize: bool, window_length: int
+) -> list[list[int]]:
+    """Find change points in several windows at once.
+
+    :param algorithm: change point detection algorithm
+    :param windows: array with a row per window
+    :param to_localize: whether change points should be localized or only detected
+    :param window_length: length of data window
+    :return: list of window change points for every window
+    """
+    if to_localize:
+        return algorithm.localize_batch(windows)
+    return [[window_length] * change_points_number for change_points_number in algorithm.detect_batch(windows)]
 
 
 class CPDCore:
     """Change Point Detection Core"""
 
-    def __init__(self, scrubber: Scrubber, algorithm: Algorithm) -> None:
+    def __init__(
+        self, scrubber: Scrubber | StreamingScrubber, algorithm: Algorithm, cache: WindowCache | None = None
+    ) -> None:
         """Change Point Detection Core
 
         :param scrubber: scrubber for dividing data into windows
             and subsequent processing of data windows
             by change point detection algorithms
         :param algorithm: change point detection algorithm
+        :param cache: cache of change points found in windows, it is used when windows are processed one after
+            another (not in parallel or in batches)
         """
         self.scrubber = scrubber
         self.algorithm = algorithm
+        self.cache = cache
 
-    def run(self) -> list[int]:
+    def run(self, workers: int = 1, use_threads: bool = False, batch_size: int = 1) -> list[int]:
         """Find change points
 
+        With several workers the next windows are processed speculatively in parallel, assuming that the windows
+        before them have no change points, so their positions are determined by the scrubber's movement. Results
+        after the first window with a change point are discarded, and processing resumes from the scrubber's new
+        position, so change points are the same as in the sequential run. The algorithm should not keep state
+        between windows.
+
+        With a batch size above 1 the next full windows, again assuming no change points before them, are passed to
+        the algorithm's batch methods at once as a strided view of data, with the same discarding of results.
+
+        :param workers: number of windows processed in parallel, 1 means processing windows one after another
+        :param use_threads: whether windows are processed by a pool of threads instead of processes. Every worker
+            gets its own copy of the algorithm once. An algorithm which can not be pickled (e.g. with a lambda) is
+            always processed by threads
+        :param batch_size: maximal number of windows processed by one call of the algorithm
         :return: list of change points
         """
+        assert workers > 0, "Number of workers should be positive."
+        assert batch_size > 0, "Batch size should be positive."
+        assert workers == 1 or batch_size == 1, "Windows are processed either in parallel or in batches."
+        assert (workers == 1 and batch_size == 1) or isinstance(
+            self.scrubber, Scrubber
+        ), "A stream can not be processed speculatively."
+
         self.scrubber.restart()
+        if batch_size > 1:
+            self.__run_batches(batch_size)
+            return self.scrubber.change_points
+
+        if workers == 1:
+            while self.scrubber.is_running:
+                window = self.scrubber.generate_window()
+                window_change_points = _process_window(
+                    self.algorithm, window, self.scrubber.scenario.to_localize, self.scrubber.window_length, self.cache
+                )
+                self.scrubber.add_change_points(window_change_points)
+            return self.scrubber.change_points
+
+        use_threads = use_threads or not _is_picklable(self.algorithm)
+        executor: Executor = (
+            ThreadPoolExecutor(workers, initializer=_initialize_worker, initargs=(self.algorithm, True))
+            if use_threads
+            else ProcessPoolExecutor(workers, initializer=_initialize_worker, initargs=(self.algorithm, False))
+        )
+        with executor:
+            while self.scrubber.is_running:
+                futures = [
+                    executor.submit(
+                        _process_window_in_worker,
+                        window,
+                        self.scrubber.scenario.to_localize,
+                        self.scrubber.window_length,
+                    )
+                    for window in self.__speculative_windows(workers)
+                ]
+                for future in futures:
+                    self.scrubber.generate_window()
+                    window_change_points = future.result()
+                    self.scrubber.add_change_points(window_change_points)
+                    if window_change_points or not self.scrubber.is_running:
+                        break
+
+                for future in futures:
+                    future.cancel()
+
+        return self.scrubber.change_points
+
+    def __run_batches(self, batch_size: int) -> None:
+        """Find change points processing the next full windows in batches
+
+        :param batch_size: maximal number of windows in a batch
+        """
+        assert isinstance(self.scrubber, Scrubber)
+        to_localize = self.scrubber.scenario.to_localize
         while self.scrubber.is_running:
-            window = self.scrubber.generate_window()
-            if self.scrubber.scenario.to_localize:
-                window_change_points = self.algorithm.localize(window)
+            windows = self.scrubber.generate_windows(batch_size)
+            if len(windows) > 0:
+                windows_change_points = _process_windows(
+                    self.algorithm, windows, to_localize, self.scrubber.window_length
+                )
             else:
-                change_points_number = self.algorithm.detect(window)
-                window_change_points = [self.scrubber.window_length] * change_points_number
+                window = self.scrubber.generate_window()
+                windows_change_points = [
+                    _process_window(self.algorithm, window, to_localize, self.scrubber.window_length)
+                ]
+
+            for window_change_points in windows_change_points:
+                self.scrubber.add_change_points(window_change_points)
+                if window_change_points or not self.scrubber.is_running:
+                    break
+
+    def stream(self) -> Iterator[int]:
+        """Find change points incrementally, every change point is yielded as soon as its window is processed
+
+        :return: iterator over change points
+        """
+        self.scrubber.restart()
+        while self.scrubber.is_running:
+            window = self.scrubber.generate_window()
+            window_change_points = _process_window(
+                self.algorithm, window, self.scrubber.scenario.to_localize, self.scrubber.window_length, self.cache
+            )
+            found_count = len(self.scrubber.change_points)
             self.scrubber.add_change_points(window_change_points)
-        return self.scrubber.change_points
+            yield from self.scrubber.change_points[found_count:]
+
+    async def astream(self, data: AsyncIterable, executor: Executor | None = None) -> AsyncIterator[int]:
+        """Find change points in an asynchronous stream without blocking the event loop, every change point is
+        yielded as soon as its window is processed. Windows are processed by the executor, and values are awaited only
+        when the next window needs them, so no more than a window of values (and a chunk) is buffered however slow
+        processing is. Awaited values are passed to the scrubber by its feed method.
+
+        :param data: asynchronous iterable of values (or of chunks of values if the scrubber is chunked) for change
+            point detection
+        :param executor: executor processing windows, the event loop's default one if None
+        :return: asynchronous iterator over change points
+        """
+        assert isinstance(self.scrubber, StreamingScrubber), "An asynchronous stream needs a streaming scrubber."
+
+        loop = asyncio.get_running_loop()
+        iterator = aiter(data)
+        self.scrubber.restart()
+        while True:
+            items = []
+            missing_count = self.scrubber.missing_count
+            while missing_count > 0:
+                try:
+                    item = await anext(iterator)
+                except StopAsyncIteration:
+                    break
+                items.append(item)
+                missing_count -= len(item) if self.scrubber.chunked else 1
+            self.scrubber.feed(items)
+            if not self.scrubber.is_running:
+                return
+
+            window = self.scrubber.generate_window()
+            window_change_points = await loop.run_in_executor(
+                executor,
+                _process_window,
+                self.algorithm,
+                window,
+                self.scrubber.scenario.to_localize,
+                self.scrubber.window_length,
+                # Only one window is processed at a time, but a copy of the cache in a worker process is useless.
+                None if isinstance(executor, ProcessPoolExecutor) else self.cache,
+            )
+            found_count = len(self.scrubber.change_points)
+            self.scrubber.add_change_points(window_change_points)
+            for change_point in self.scrubber.change_points[found_count:]:
+                yield change_point
+
+    def __speculative_windows(self, count: int) -> list[Sequence[float | numpy.float64] | numpy.ndarray]:
+        """Generate the next windows of the scrubber, assuming that they have no change points
+
+        :param count: maximal number of windows
+        :return: list of the next windows
+        """
+        scrubber = copy.copy(self.scrubber)
+        scrubber.change_points = list(self.scrubber.change_points)
+
+        windows: list[Sequence[float | numpy.float64] | numpy.ndarray] = []
+        while scrubber.is_running and len(windows) < count:
+            windows.append(scrubber.generate_window())
+            scrubber.add_change_points([])
+        return windows
@@ -23,7 +23,7 @@ class Scrubber:
         by change point detection algorithms
 
         :param scenario: :class:`Scenario` object with information about the scrubber task
-        :param data: list of values for change point detection
+        :param data: list of values for change point detection, windows of an array are its views
         :param window_length: length of data window
         :param movement_k: how far will the window move relative to the length
         """
@@ -31,16 +31,31 @@ class Scrubber:
         self.window_length = window_length
         self.movement_k = movement_k
         self.scenario = scenario
-        self.data: Sequence[float | numpy.float64] = data
+        self.data = data
         self.is_running = True
         self.change_points: list[int] = []
         self._next_window: tuple[int, int] | None = (0, self.window_length)
 
-    def generate_window(self) -> Sequence[float | numpy.float64]:
+    @property
+    def data(self) -> Sequence[float | numpy.float64] | numpy.ndarray:
+        """Data for change point detection"""
+        return self._data
+
+    @data.setter
+    def data(self, new_data: Sequence[float | numpy.float64] | numpy.ndarray) -> None:
+        """Setter method for changing data
+
+        :param new_data: list of values for change point detection
+        """
+        self._data = new_data
+        # Data as an array for batches of windows, it is converted once on the first batch.
+        self._array: numpy.ndarray | None = None
+
+    def generate_window(self) -> Sequence[float | numpy.float64] | numpy.ndarray:
         """Function for dividing data into parts to feed into the change point detection algorithm
 
         :raises ValueError: all data has already been given
-        :return: window (part of data) for change point detection algorithm
+        :return: window (part of data) for change point detection algorithm, a view if data is an array
         """
         if not self.is_running or self._next_window is None:
             raise ValueError("All windows were given")
@@ -48,6 +63,30 @@ class Scrubber:
         window = self.data[window_start:window_end]
         return window
 
+    def generate_windows(self, count: int) -> numpy.ndarray:
+        """Function for getting the next full windows at once, assuming that windows before them have no change points
+
+        :param count: maximal number of windows
+        :raises ValueError: all data has already been given
+        :return: strided view of data with a row per window, it has no rows if the next window is not full
+        """
+        if not self.is_running or self._next_window is None:
+            raise ValueError("All windows were given")
+        if self._array is None:
+            self._array = numpy.asarray(self.data)
+        data = self._array
+        window_start, window_end = self._next_window
+        if window_end > len(data):
+            return numpy.empty((0, self.window_length, *data.shape[1:]), dtype=data.dtype)
+
+        # Windows are moved while their ends are less than the length of data, as in add_change_points.
+        delta = int(self.movement_k * self.window_length)
+        windows_count = min(count, 1 + max(len(data) - 1 - window_end, 0) // delta) if delta > 0 else 1
+        windows = numpy.lib.stride_tricks.sliding_window_view(data, self.window_length, axis=0)
+        return numpy.moveaxis(windows, -1, 1)[
+            window_start : window_start + (windows_count - 1) * delta + 1 : max(delta, 1)
+        ]
+
     def add_change_points(self, window_change_points: list[int]) -> None:
         """Function for mapping window change points to global data
 
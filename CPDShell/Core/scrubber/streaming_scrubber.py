@@ -0,0 +1,196 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+import numpy
+
+from ..scenario import Scenario
+
+
+class StreamingScrubber:
+    """A scrubber for dividing an unbounded stream of data into windows
+    and subsequent processing of data windows
+    by change point detection algorithms
+
+    Values are consumed from an iterator only when the next window needs them and are stored in a ring buffer of the
+    window length and a value, so memory does not depend on the length of the stream. Every value is written twice, at
+    its position and at the position shifted by the buffer's length, so any window is a contiguous view of the buffer.
+
+    Windows are the same as the ones of :class:`Scrubber` for the same data: a moved window is given only if there is
+    a value after it, so a value after it is read in advance, and a window starting at a change point (or at the
+    start) is given even if the stream ends before it is full, unless it is empty.
+    """
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        data: Iterable,
+        window_length: int = 10,
+        movement_k: float = 1.0 / 3.0,
+        chunked: bool = False,
+    ) -> None:
+        """A scrubber for dividing an unbounded stream of data into windows
+        and subsequent processing of data windows
+        by change point detection algorithms
+
+        :param scenario: :class:`Scenario` object with information about the scrubber task
+        :param data: iterable of values (or of chunks of values) for change point detection
+        :param window_length: length of data window
+        :param movement_k: how far will the window move relative to the length
+        :param chunked: whether data yields arrays of consecutive values instead of single values
+        """
+        assert window_length > 0
+
+        self.window_length = window_length
+        self.movement_k = movement_k
+        self.scenario = scenario
+        self.data: Iterator = iter(data)
+        self.chunked = chunked
+        self.change_points: list[int] = []
+
+        self.__buffer: numpy.ndarray | None = None
+        self.__capacity = window_length + 1
+        self.__consumed = 0
+        self.__chunk = numpy.empty(0)
+        self.__chunk_offset = 0
+        # A start of the next window in the stream, None if there is no next window.
+        self.__next_start: int | None = 0
+        # Whether the next window was moved from the previous one, rather than started at a change point.
+        self.__is_moved = False
+
+    @property
+    def is_running(self) -> bool:
+        """Whether there is the next window, values are read from the stream until it is full (and, for a moved
+        window, until a value after it is read)
+
+        :return: True if there is the next window
+        """
+        if (
+            self.__next_start is not None
+            and not self.__fill(self.__required_end())
+            and (self.__is_moved or self.__next_start >= self.__consumed)
+        ):
+            self.__next_start = None
+        return self.__next_start is not None
+
+    @property
+    def missing_count(self) -> int:
+        """Number of values which should be read from the stream to fill the next window
+
+        :return: number of missing values, 0 if the next window is full or there is no next window
+        """
+        if self.__next_start is None:
+            return 0
+        read_count = self.__consumed + len(self.__chunk) - self.__chunk_offset
+        return max(self.__required_end() - read_count, 0)
+
+    def feed(self, items: Iterable) -> None:
+        """Adds values (or chunks of values) read from the stream by a caller, e.g. from an asynchronous stream. They
+        are consumed before values of data
+
+        :param items: values, or chunks of values if data is chunked
+        """
+        if self.chunked:
+            arrays = [numpy.asarray(chunk, dtype=numpy.float64) for chunk in items]
+        else:
+            arrays = [numpy.asarray(list(items), dtype=numpy.float64)]
+        if self.__chunk_offset < len(self.__chunk):
+            arrays.insert(0, self.__chunk[self.__chunk_offset :])
+        arrays = [array for array in arrays if len(array) > 0]
+        if arrays:
+            self.__chunk = numpy.concatenate(arrays)
+            self.__chunk_offset = 0
+
+    def generate_window(self) -> numpy.ndarray:
+        """Function for getting the next window of the stream to feed into the change point detection algorithm
+
+        :raises ValueError: all data has already been given
+        :return: window (part of data) for change point detection algorithm. It is a view of the ring buffer, so it
+            is valid until change points of the window are added
+        """
+        if not self.is_running:
+            raise ValueError("All windows were given")
+        assert self.__buffer is not None and self.__next_start is not None
+        position = self.__next_start % self.__capacity
+        return self.__buffer[position : position + min(self.window_length, self.__consumed - self.__next_start)]
+
+    def add_change_points(self, window_change_points: list[int]) -> None:
+        """Function for mapping window change points to the stream
+
+        :param window_change_points: change points in window
+        :raises ValueError: all data windows have been processed
+        """
+        if self.__next_start is None:
+            raise ValueError("There are no windows to consider")
+        for window_change_point in window_change_points:
+            self.change_points.append(self.__next_start + window_change_point)
+            if len(self.change_points) == self.scenario.change_point_number:
+                self.__next_start = None
+                return
+
+        self.__is_moved = not window_change_points
+        if window_change_points:
+            self.__next_start = self.change_points[-1]
+        else:
+            self.__next_start += int(self.movement_k * self.window_length)
+
+    def restart(self) -> None:
+        """Starts finding change points anew. The stream can not be rewound, so the first window starts at
+        the first value which was not read yet.
+        """
+        self.__next_start = self.__consumed
+        self.__is_moved = False
+        self.change_points = []
+
+    def __required_end(self) -> int:
+        """Index of the value after the last one the next window needs
+
+        :return: index of the value after the next window, or after the value following it for a moved window
+        """
+        assert self.__next_start is not None
+        return self.__next_start + self.window_length + int(self.__is_moved)
+
+    def __fill(self, end: int) -> bool:
+        """Reads values from the stream into the ring buffer until it contains values before the end
+
+        :param end: index of the value after the last needed one
+        :return: False if the stream ended before, True otherwise
+        """
+        while self.__consumed < end:
+            values = self.__read(end - self.__consumed)
+            if values is None:
+                return False
+            self.__write(values)
+        return True
+
+    def __read(self, count: int) -> numpy.ndarray | None:
+        """Reads at most count values from the stream
+
+        :param count: maximal number of values
+        :return: array of read values, None if the stream ended
+        """
+        # Values of the current chunk (or fed ones) are read first.
+        if self.__chunk_offset == len(self.__chunk) and not self.chunked:
+            read_values = list(islice(self.data, count))
+            return numpy.asarray(read_values, dtype=numpy.float64) if read_values else None
+
+        while self.__chunk_offset == len(self.__chunk):
+            chunk = next(self.data, None)
+            if chunk is None:
+                return None
+            self.__chunk = numpy.asarray(chunk, dtype=numpy.float64)
+            self.__chunk_offset = 0
+        values = self.__chunk[self.__chunk_offset : self.__chunk_offset + count]
+        self.__chunk_offset += len(values)
+        return values
+
+    def __write(self, values: numpy.ndarray) -> None:
+        """Writes values after the last consumed one into the ring buffer
+
+        :param values: array of at most buffer's length values
+        """
+        if self.__buffer is None:
+            self.__buffer = numpy.empty((2 * self.__capacity, *values.shape[1:]))
+        positions = (self.__consumed + numpy.arange(len(values))) % self.__capacity
+        self.__buffer[positions] = values
+        self.__buffer[positions + self.__capacity] = values
+        self.__consumed += len(values)
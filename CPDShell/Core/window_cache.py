@@ -0,0 +1,165 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from pathlib import Path
+
+import numpy
+
+from .algorithms.abstract_algorithm import Algorithm
+
+
+class WindowCache:
+    """Cache of change points found in windows, so identical windows processed by an algorithm with identical
+    parameters (e.g. in parameter sweeps and reruns) are not processed again
+
+    An entry is addressed by a hash of the algorithm's type, its cache parameters (see Algorithm.cache_parameters) and
+    the window's bytes, so changing any parameter of the algorithm makes a new entry. Recent entries are kept in memory
+    and the least recently used ones are evicted, all entries may also be stored in a directory shared by runs and
+    processes. Algorithms without cache parameters or with parameters which can not be pickled are not cached.
+    """
+
+    def __init__(self, max_size: int = 1024, directory: Path | str | None = None) -> None:
+        """Cache of change points found in windows
+
+        :param max_size: maximal number of entries kept in memory
+        :param directory: directory storing entries on disk, entries are kept in memory only if None
+        """
+        assert max_size > 0
+
+        self.max_size = max_size
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.__entries: OrderedDict[str, list[int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of entries kept in memory
+
+        :return: number of entries
+        """
+        return len(self.__entries)
+
+    def localize(self, algorithm: Algorithm, window: Sequence[float | numpy.float64] | numpy.ndarray) -> list[int]:
+        """Returns localized change points of the window, processing it only if it is not cached
+
+        :param algorithm: change point detection algorithm
+        :param window: part of global data for finding change points
+        :return: list of window change points
+        """
+        return self.__get(algorithm, window, "localize", lambda: algorithm.localize(window))
+
+    def detect(self, algorithm: Algorithm, window: Sequence[float | numpy.float64] | numpy.ndarray) -> int:
+        """Returns the number of change points in the window, processing it only if it is not cached. If the algorithm
+        detects exactly the change points it localizes, detection and localization share an entry
+
+        :param algorithm: change point detection algorithm
+        :param window: part of global data for finding change points
+        :return: the number of change points in the window
+        """
+        if algorithm.detects_localized_change_points:
+            return len(self.localize(algorithm, window))
+        return self.__get(algorithm, window, "detect", lambda: [algorithm.detect(window)])[0]
+
+    def clear(self) -> None:
+        """Removes entries kept in memory and resets counters. Entries on disk are kept"""
+        self.__entries.clear()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __get(
+        self,
+        algorithm: Algorithm,
+        window: Sequence[float | numpy.float64] | numpy.ndarray,
+        mode: str,
+        compute: Callable[[], list[int]],
+    ) -> list[int]:
+        """Returns a cached result, computing and storing it on a miss
+
+        :param algorithm: change point detection algorithm
+        :param window: part of global data for finding change points
+        :param mode: name of the algorithm's method
+        :param compute: function processing the window
+        :return: result of processing
+        """
+        key = self.__key(algorithm, window, mode)
+        if key is None:
+            return compute()
+
+        result = self.__entries.get(key)
+        if result is not None:
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return list(result)
+
+        result = self.__load(key)
+        if result is not None:
+            self.hits += 1
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            result = list(compute())
+            self.__store(key, result)
+
+        self.__entries[key] = result
+        if len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+        return list(result)
+
+    @staticmethod
+    def __key(algorithm: Algorithm, window: Sequence[float | numpy.float64] | numpy.ndarray, mode: str) -> str | None:
+        """Hashes the algorithm's parameters and the window's contents
+
+        :param algorithm: change point detection algorithm
+        :param window: part of global data for finding change points
+        :param mode: name of the algorithm's method
+        :return: hexadecimal key, None if the algorithm's results should not be cached
+        """
+        parameters = algorithm.cache_parameters()
+        if parameters is None:
+            return None
+        try:
+            algorithm_state = pickle.dumps((type(algorithm).__module__, type(algorithm).__qualname__, parameters))
+        except (pickle.PicklingError, AttributeError, TypeError):
+            return None
+
+        values = numpy.ascontiguousarray(window)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(algorithm_state)
+        digest.update(f"{mode}:{values.dtype.str}:{values.shape}".encode())
+        digest.update(values.data)
+        return digest.hexdigest()
+
+    def __load(self, key: str) -> list[int] | None:
+        """Loads an entry from disk
+
+        :param key: key of the entry
+        :return: result of processing, None if there is no entry
+        """
+        if self.directory is None:
+            return None
+        try:
+            return numpy.load(self.directory / f"{key}.npy").tolist()
+        except FileNotFoundError:
+            return None
+
+    def __store(self, key: str, result: list[int]) -> None:
+        """Stores an entry on disk. The file is renamed after it is written, so concurrent readers never see a part
+        of it
+
+        :param key: key of the entry
+        :param result: result of processing
+        """
+        if self.directory is None:
+            return
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(file_descriptor, "wb") as file:
+            numpy.save(file, numpy.asarray(result, dtype=numpy.int64))
+        os.replace(temporary_path, self.directory / f"{key}.npy")
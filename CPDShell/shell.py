@@ -1,5 +1,6 @@
 import time
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator, Sequence
+from concurrent.futures import Executor
 from pathlib import Path
 from typing import Optional
 
@@ -10,6 +11,8 @@ from CPDShell.Core.algorithms.graph_algorithm import Algorithm, GraphAlgorithm
 from CPDShell.Core.cpd_core import CPDCore
 from CPDShell.Core.scenario import Scenario
 from CPDShell.Core.scrubber.scrubber import Scrubber
+from CPDShell.Core.scrubber.streaming_scrubber import StreamingScrubber
+from CPDShell.Core.window_cache import WindowCache
 from CPDShell.labeled_data import LabeledCPData
 
 
@@ -91,6 +94,27 @@ class CPContainer:
             plt.show()
 
 
+def to_contiguous_array(data: Iterable[float | numpy.float64]) -> numpy.ndarray:
+    """Converts data to a C-contiguous array once, so the scrubber hands out views of it and algorithms process them
+    without further copies
+
+    :param data: data for detection of CP: an array, an object supporting the buffer protocol (e.g. array.array or
+        memoryview, wrapped without copying), a sequence or any iterable of values
+    :return: C-contiguous array with the data
+    """
+    if isinstance(data, numpy.ndarray):
+        return numpy.ascontiguousarray(data)
+    try:
+        buffer = memoryview(data)  # type: ignore[arg-type]
+    except TypeError:
+        pass
+    else:
+        return numpy.ascontiguousarray(numpy.asarray(buffer))
+    if isinstance(data, Sequence):
+        return numpy.ascontiguousarray(data)
+    return numpy.fromiter(data, dtype=numpy.float64)
+
+
 class CPDShell:
     """Class, that grants a convenient interface to
     work with CPD algorithms"""
@@ -100,12 +124,14 @@ class CPDShell:
         data: Iterable[float | numpy.float64] | LabeledCPData,
         cpd_algorithm: Optional["Algorithm"] = None,
         scrubber_class: type[Scrubber] = Scrubber,
+        cache: WindowCache | None = None,
     ) -> None:
         """CPDShell object constructor
 
         :param: data: data for detection of CP
         :param: CPDalgorithm: CPD algorithm, that will search for change points
         :param: scrubber_class: class of preferable scrubber for splitting data into parts
+        :param: cache: cache of change points found in windows, windows are always processed if None
         """
         self._data: Iterable[float | numpy.float64] | LabeledCPData = data
         scrubber_class = scrubber_class if scrubber_class is not None else Scrubber
@@ -114,8 +140,11 @@ class CPDShell:
             cpd_algorithm if cpd_algorithm is not None else GraphAlgorithm(lambda a, b: abs(a - b) <= arg, 2)
         )
         self.cpd_core: CPDCore = CPDCore(
-            scrubber_class(Scenario(10, True), data.raw_data if isinstance(data, LabeledCPData) else data),
+            scrubber_class(
+                Scenario(10, True), to_contiguous_array(data.raw_data if isinstance(data, LabeledCPData) else data)
+            ),
             cpd_algorithm,
+            cache,
         )  # if no algo or scrubber was given, then some standard
 
     @property
@@ -131,13 +160,15 @@ class CPDShell:
         """
         self._data = new_data
         if isinstance(new_data, LabeledCPData):
-            self.cpd_core.scrubber.data = new_data.raw_data
+            self.scrubber.data = to_contiguous_array(new_data.raw_data)
         else:
-            self.cpd_core.scrubber.data = new_data
+            self.scrubber.data = to_contiguous_array(new_data)
 
     @property
     def scrubber(self) -> Scrubber:
         """Getter method for scrubber"""
+        # Streams are processed by their own cores (see stream_cpd), the shell's core always splits the whole data.
+        assert isinstance(self.cpd_core.scrubber, Scrubber)
         return self.cpd_core.scrubber
 
     @scrubber.setter
@@ -146,7 +177,7 @@ class CPDShell:
 
         :param: new_scrubber_class: new scrubber, to replace the current one
         """
-        self.cpd_core.scrubber = new_scrubber_class(self.cpd_core.scrubber.scenario, self._data)
+        self.cpd_core.scrubber = new_scrubber_class(self.cpd_core.scrubber.scenario, self.cpd_core.scrubber.data)
 
     @property
     def CPDalgorithm(self) -> Algorithm:
@@ -182,14 +213,50 @@ class CPDShell:
         """
         self.cpd_core.scrubber.scenario = Scenario(change_point_number, to_localize)
 
-    def run_cpd(self) -> CPContainer:
+    def run_cpd(self, workers: int = 1, use_threads: bool = False, batch_size: int = 1) -> CPContainer:
         """Execute CPD algorithm, returns ifrom dataclasses import dataclassts result and prints it
 
+        :param workers: number of windows processed in parallel, 1 means processing windows one after another
+        :param use_threads: whether windows are processed by a pool of threads instead of processes
+        :param batch_size: maximal number of windows processed by one call of the algorithm
         :return: CPContainer object, containing algo result CP and expected CP if needed
         """
         time_start = time.perf_counter()
-        algo_results = self.cpd_core.run()
+        algo_results = self.cpd_core.run(workers, use_threads, batch_size)
         time_end = time.perf_counter()
         expected_change_points = self._data.change_points if isinstance(self._data, LabeledCPData) else None
         data = self._data.raw_data if isinstance(self._data, LabeledCPData) else self._data
         return CPContainer(data, algo_results, expected_change_points, time_end - time_start)
+
+    def stream_cpd(self, data: Iterable, chunked: bool = False) -> Iterator[int]:
+        """Execute CPD algorithm on a stream of data, which may be unbounded or larger than memory. The stream is read
+        only as far as windows need it, with the scenario and the window parameters of the shell's scrubber
+
+        :param data: iterable of values (or of chunks of values) for change point detection
+        :param chunked: whether data yields arrays of consecutive values instead of single values
+        :return: iterator over change points, yielded as soon as they are found
+        """
+        scrubber = self.cpd_core.scrubber
+        streaming_scrubber = StreamingScrubber(
+            scrubber.scenario, data, scrubber.window_length, scrubber.movement_k, chunked
+        )
+        yield from CPDCore(streaming_scrubber, self.cpd_core.algorithm, self.cpd_core.cache).stream()
+
+    async def astream_cpd(
+        self, data: AsyncIterable, executor: Executor | None = None, chunked: bool = False
+    ) -> AsyncIterator[int]:
+        """Execute CPD algorithm on an asynchronous stream of data without blocking the event loop, with the scenario
+        and the window parameters of the shell's scrubber
+
+        :param data: asynchronous iterable of values (or of chunks of values) for change point detection
+        :param executor: executor processing windows, the event loop's default one if None
+        :param chunked: whether data yields arrays of consecutive values instead of single values
+        :return: asynchronous iterator over change points, yielded as soon as they are found
+        """
+        scrubber = self.cpd_core.scrubber
+        streaming_scrubber = StreamingScrubber(
+            scrubber.scenario, (), scrubber.window_length, scrubber.movement_k, chunked
+        )
+        core = CPDCore(streaming_scrubber, self.cpd_core.algorithm, self.cpd_core.cache)
+        async for change_point in core.astream(data, executor):
+            yield change_point
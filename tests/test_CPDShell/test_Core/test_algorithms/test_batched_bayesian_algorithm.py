@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from CPDShell.Core.algorithms.batched_bayesian_algorithm import BatchedBayesianAlgorithm
+from CPDShell.Core.algorithms.bayesian_algorithm import BayesianAlgorithm
+from CPDShell.Core.algorithms.BayesianCPD.detectors.batched_drop_detector import BatchedDropDetector
+from CPDShell.Core.algorithms.BayesianCPD.detectors.batched_simple_detector import BatchedSimpleDetector
+from CPDShell.Core.algorithms.BayesianCPD.detectors.drop_detector import DropDetector
+from CPDShell.Core.algorithms.BayesianCPD.detectors.simple_detector import SimpleDetector
+from CPDShell.Core.algorithms.BayesianCPD.hazards.constant_hazard import ConstantHazard
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.batched_gaussian_unknown_mean_and_variance import (
+    BatchedGaussianUnknownMeanAndVariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.gaussian_unknown_mean_and_variance import (
+    GaussianUnknownMeanAndVariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.localizers.simple_localizer import SimpleLocalizer
+
+
+class DecreasingHazard(ConstantHazard):
+    def hazard(self, run_lengths):
+        return 1.0 / (self._rate + np.asarray(run_lengths))
+
+
+def generate_data(seed: int, series_count: int) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return np.stack(
+        [
+            np.concatenate([generator.normal(0, 1, 200 + 20 * series), generator.normal(10, 1, 300 - 20 * series)])
+            for series in range(series_count)
+        ],
+        axis=1,
+    )
+
+
+class TestBatchedBayesianAlgorithm:
+    @pytest.mark.parametrize(
+        "detector,batched_detector,max_run_lengths",
+        (
+            (SimpleDetector(0.1), BatchedSimpleDetector(0.1), None),
+            (DropDetector(0.5), BatchedDropDetector(0.5), None),
+            (SimpleDetector(0.1), BatchedSimpleDetector(0.1), 30),
+        ),
+    )
+    def test_first_change_points(self, detector, batched_detector, max_run_lengths):
+        data = generate_data(0, 5)
+        batched_algorithm = BatchedBayesianAlgorithm(
+            50,
+            BatchedGaussianUnknownMeanAndVariance(),
+            ConstantHazard(200),
+            batched_detector,
+            SimpleLocalizer(),
+            max_run_lengths=max_run_lengths,
+        )
+        events = list(batched_algorithm.push_many(data))
+
+        for series in range(data.shape[1]):
+            algorithm = BayesianAlgorithm(
+                50,
+                GaussianUnknownMeanAndVariance(),
+                ConstantHazard(200),
+                detector,
+                SimpleLocalizer(),
+                max_run_lengths=max_run_lengths,
+            )
+            expected_event = next(algorithm.push_many(data[:, series]), None)
+            assert expected_event is not None
+            assert next(event for row, event in events if row == series) == expected_event
+
+    @pytest.mark.parametrize("max_run_lengths", (5, 20))
+    def test_merged_run_lengths(self, max_run_lengths):
+        data = generate_data(3, 4)
+        batched_algorithm = BatchedBayesianAlgorithm(
+            50,
+            BatchedGaussianUnknownMeanAndVariance(),
+            DecreasingHazard(100),
+            BatchedSimpleDetector(0.1),
+            SimpleLocalizer(),
+            max_run_lengths=max_run_lengths,
+        )
+        algorithms = [
+            BayesianAlgorithm(
+                50,
+                GaussianUnknownMeanAndVariance(),
+                DecreasingHazard(100),
+                SimpleDetector(0.1),
+                SimpleLocalizer(),
+                log_space=True,
+                max_run_lengths=max_run_lengths,
+            )
+            for _ in range(data.shape[1])
+        ]
+
+        # Series are compared until their first change points, after them the batched algorithm does not reprocess
+        # observations.
+        is_compared = [True] * data.shape[1]
+        for observations in data:
+            batched_events = dict(batched_algorithm.push(observations))
+            map_run_lengths = batched_algorithm.map_run_lengths
+            for series, algorithm in enumerate(algorithms):
+                if not is_compared[series]:
+                    continue
+                events = algorithm.push(observations[series])
+                assert batched_events.get(series) == (events[0] if events else None)
+                if events:
+                    is_compared[series] = False
+                else:
+                    map_run_length = algorithm.map_run_length
+                    assert map_run_lengths[series] == (map_run_length if map_run_length is not None else -1)
+        assert not all(is_compared)
+
+    @pytest.mark.parametrize("series_count", (1, 4))
+    def test_independent_series(self, series_count):
+        data = generate_data(1, series_count)
+
+        def construct_algorithm() -> BatchedBayesianAlgorithm:
+            return BatchedBayesianAlgorithm(
+                50,
+                BatchedGaussianUnknownMeanAndVariance(),
+                ConstantHazard(200),
+                BatchedSimpleDetector(0.1),
+                SimpleLocalizer(),
+            )
+
+        change_points = construct_algorithm().localize(data)
+        assert len(change_points) == series_count
+        for series in range(series_count):
+            assert change_points[series] == construct_algorithm().localize(data[:, series : series + 1])[0]
+
+    def test_map_run_lengths(self):
+        data = generate_data(2, 3)
+        algorithm = BatchedBayesianAlgorithm(
+            50,
+            BatchedGaussianUnknownMeanAndVariance(),
+            ConstantHazard(200),
+            BatchedSimpleDetector(0.1),
+            SimpleLocalizer(),
+        )
+        algorithm.push(data[0])
+        assert algorithm.map_run_lengths.tolist() == [-1, -1, -1]
+
+        for observations in data[1:100]:
+            algorithm.push(observations)
+        assert np.all(algorithm.map_run_lengths >= 0)
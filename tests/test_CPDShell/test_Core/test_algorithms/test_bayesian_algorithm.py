@@ -0,0 +1,522 @@
+import io
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from CPDShell.Core.algorithms.bayesian_algorithm import BayesianAlgorithm
+from CPDShell.Core.algorithms.BayesianCPD.detectors.drop_detector import DropDetector
+from CPDShell.Core.algorithms.BayesianCPD.detectors.simple_detector import SimpleDetector
+from CPDShell.Core.algorithms.BayesianCPD.hazards.constant_hazard import ConstantHazard
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.bernoulli_unknown_probability import BernoulliUnknownProbability
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.exponential_unknown_rate import ExponentialUnknownRate
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.gaussian_unknown_mean_and_variance import (
+    GaussianUnknownMeanAndVariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.multivariate_gaussian_unknown_mean_and_covariance import (
+    MultivariateGaussianUnknownMeanAndCovariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.poisson_unknown_rate import PoissonUnknownRate
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.student_t_unknown_location_and_scale import (
+    StudentTUnknownLocationAndScale,
+)
+from CPDShell.Core.algorithms.BayesianCPD.localizers.simple_localizer import SimpleLocalizer
+from CPDShell.Core.algorithms.BayesianCPD.posterior_recorder import RunLengthPosteriorRecorder
+
+
+class RecordingLikelihood(GaussianUnknownMeanAndVariance):
+    def __init__(self):
+        super().__init__()
+        self.max_run_lengths = 0
+
+    def predict_log(self, observation):
+        log_probs = super().predict_log(observation)
+        self.max_run_lengths = max(self.max_run_lengths, len(log_probs))
+        return log_probs
+
+
+class RecordingHazard(ConstantHazard):
+    def __init__(self, rate):
+        super().__init__(rate)
+        self.run_lengths = np.array([])
+
+    def hazard(self, run_lengths):
+        self.run_lengths = np.array(run_lengths)
+        return super().hazard(run_lengths)
+
+
+def construct_bayesian_algorithm(
+    log_space: bool = False,
+    pruning_threshold: float = 0.0,
+    max_run_lengths: int | None = None,
+    likelihood: GaussianUnknownMeanAndVariance | None = None,
+    hazard: ConstantHazard | None = None,
+) -> BayesianAlgorithm:
+    return BayesianAlgorithm(
+        learning_steps=50,
+        likelihood=likelihood if likelihood is not None else GaussianUnknownMeanAndVariance(),
+        hazard=hazard if hazard is not None else ConstantHazard(200),
+        detector=SimpleDetector(0.1),
+        localizer=SimpleLocalizer(),
+        log_space=log_space,
+        pruning_threshold=pruning_threshold,
+        max_run_lengths=max_run_lengths,
+    )
+
+
+def generate_data(seed: int) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return np.concatenate([generator.normal(0, 1, 300), generator.normal(10, 1, 300)])
+
+
+class TestBayesianAlgorithm:
+    @pytest.mark.parametrize("seed,expected_change_point,margin", ((0, 300, 20), (1, 300, 20), (2, 300, 20)))
+    def test_localize(self, seed, expected_change_point, margin):
+        algorithm = construct_bayesian_algorithm()
+        change_points = algorithm.localize(generate_data(seed))
+        assert any(abs(change_point - expected_change_point) <= margin for change_point in change_points)
+
+    @pytest.mark.parametrize("seed", (0, 1, 2))
+    def test_log_space_localize(self, seed):
+        data = generate_data(seed)
+        assert construct_bayesian_algorithm(True).localize(data) == construct_bayesian_algorithm().localize(data)
+
+    @pytest.mark.parametrize("seed", (0, 1))
+    def test_array_view_localize(self, seed):
+        data = np.repeat(generate_data(seed)[:, np.newaxis], 2, axis=1)[:, 0]
+        assert construct_bayesian_algorithm().localize(data) == construct_bayesian_algorithm().localize(list(data))
+
+    @pytest.mark.parametrize("max_run_lengths", (10, 50))
+    def test_max_run_lengths(self, max_run_lengths):
+        likelihood = RecordingLikelihood()
+        algorithm = construct_bayesian_algorithm(max_run_lengths=max_run_lengths, likelihood=likelihood)
+        algorithm.localize(generate_data(0))
+        assert likelihood.max_run_lengths == max_run_lengths
+
+    @pytest.mark.parametrize("log_space", (False, True))
+    def test_merged_run_length(self, log_space):
+        hazard = RecordingHazard(200)
+        algorithm = construct_bayesian_algorithm(log_space=log_space, max_run_lengths=10, hazard=hazard)
+        observations = np.random.default_rng(0).normal(0, 1, 150)
+        assert list(algorithm.push_many(observations)) == []
+        # The last learning observation is the first one updating statistics, so the longest run length is 100.
+        assert hazard.run_lengths.tolist() == [*range(9), len(observations) - 50]
+
+    @pytest.mark.parametrize("log_space", (False, True))
+    def test_truncated_map_run_length(self, log_space):
+        algorithm = construct_bayesian_algorithm(log_space=log_space, pruning_threshold=1e-12, max_run_lengths=10)
+        observations = np.random.default_rng(0).normal(0, 1, 150)
+        assert list(algorithm.push_many(observations)) == []
+        # The most probable hypothesis is the merged one, its run length includes the last learning observation.
+        assert algorithm.map_run_length == len(observations) - 49
+
+    @pytest.mark.parametrize("log_space", (False, True))
+    def test_pruning(self, log_space):
+        data = generate_data(1)
+        pruned = construct_bayesian_algorithm(log_space=log_space, pruning_threshold=1e-12, max_run_lengths=100)
+        assert pruned.localize(data) == construct_bayesian_algorithm(max_run_lengths=100).localize(data)
+
+    @pytest.mark.parametrize("seed", (0, 1, 2))
+    @pytest.mark.parametrize("likelihood_type", (GaussianUnknownMeanAndVariance, PoissonUnknownRate))
+    def test_rollback_aware_localize(self, seed, likelihood_type):
+        generator = np.random.default_rng(seed)
+        data = np.concatenate([generator.poisson(rate, 100) for rate in generator.integers(1, 10, 20)])
+
+        def construct_algorithm(rollback_aware: bool) -> BayesianAlgorithm:
+            return BayesianAlgorithm(
+                learning_steps=50,
+                likelihood=likelihood_type(),
+                hazard=ConstantHazard(200),
+                detector=SimpleDetector(0.1),
+                localizer=SimpleLocalizer(),
+                rollback_aware=rollback_aware,
+            )
+
+        assert construct_algorithm(True).localize(data) == construct_algorithm(False).localize(data)
+
+    @pytest.mark.parametrize("max_run_lengths", (None, 100))
+    def test_push_many(self, max_run_lengths):
+        data = generate_data(0)
+        algorithm = construct_bayesian_algorithm(max_run_lengths=max_run_lengths)
+        expected_change_points = algorithm.localize(data)
+        events = list(algorithm.push_many(data))
+        assert [event.change_point for event in events] == expected_change_points
+        assert all(event.detection_time >= event.change_point - 1 for event in events)
+
+    @pytest.mark.parametrize("pruning_threshold,max_run_lengths", ((1e-12, None), (0.0, 40), (0.0, None)))
+    def test_stream_history(self, pruning_threshold, max_run_lengths):
+        data = generate_data(0)
+        expected_change_points = construct_bayesian_algorithm(
+            pruning_threshold=pruning_threshold, max_run_lengths=max_run_lengths
+        ).localize(data)
+
+        algorithm = construct_bayesian_algorithm(pruning_threshold=pruning_threshold, max_run_lengths=max_run_lengths)
+        change_points = []
+        for observation in data:
+            change_points.extend(event.change_point for event in algorithm.push(observation))
+            state = algorithm.get_state()
+            assert len(state["history_indices"]) <= len(state["growth_probs"])
+        assert change_points == expected_change_points
+
+    def test_push(self):
+        data = generate_data(1)
+        algorithm = construct_bayesian_algorithm()
+        assert algorithm.map_run_length is None
+
+        change_points = []
+        for observation in data:
+            change_points.extend(event.change_point for event in algorithm.push(observation))
+        assert change_points == construct_bayesian_algorithm().localize(data)
+        assert algorithm.map_run_length is not None
+
+        algorithm.reset()
+        assert algorithm.map_run_length is None
+
+    @pytest.mark.parametrize("split", (20, 50, 320))
+    @pytest.mark.parametrize("log_space,max_run_lengths", ((False, None), (True, 40)))
+    def test_snapshot(self, split, log_space, max_run_lengths):
+        data = generate_data(0)
+
+        def construct_algorithm() -> BayesianAlgorithm:
+            return BayesianAlgorithm(
+                learning_steps=50,
+                likelihood=GaussianUnknownMeanAndVariance(),
+                hazard=ConstantHazard(200),
+                detector=DropDetector(0.5),
+                localizer=SimpleLocalizer(),
+                log_space=log_space,
+                max_run_lengths=max_run_lengths,
+            )
+
+        expected_events = list(construct_algorithm().push_many(data))
+
+        algorithm = construct_algorithm()
+        events = list(algorithm.push_many(data[:split]))
+        snapshot = io.BytesIO()
+        algorithm.snapshot(snapshot)
+        snapshot.seek(0)
+
+        restored_algorithm = construct_algorithm()
+        restored_algorithm.restore(snapshot)
+        events.extend(restored_algorithm.push_many(data[split:]))
+        assert events == expected_events
+
+    def test_repeated_runs(self):
+        algorithm = construct_bayesian_algorithm()
+        data = generate_data(0)
+        first_change_points = algorithm.localize(data)
+        algorithm.localize(data[:400])
+        assert algorithm.localize(data) == first_change_points
+
+
+class TestRunLengthPosteriorRecorder:
+    @staticmethod
+    def record(data: np.ndarray, recorder: RunLengthPosteriorRecorder, log_space: bool = False) -> list[int]:
+        algorithm = BayesianAlgorithm(
+            learning_steps=50,
+            likelihood=GaussianUnknownMeanAndVariance(),
+            hazard=ConstantHazard(200),
+            detector=SimpleDetector(0.1),
+            localizer=SimpleLocalizer(),
+            log_space=log_space,
+            recorder=recorder,
+        )
+        return algorithm.localize(data)
+
+    @pytest.mark.parametrize("log_space", (False, True))
+    def test_dense_record(self, log_space):
+        data = generate_data(0)
+        recorder = RunLengthPosteriorRecorder(threshold=0.0)
+        assert self.record(data, recorder, log_space) == construct_bayesian_algorithm().localize(data)
+
+        dense = recorder.to_dense()
+        assert dense.shape[0] == len(recorder)
+        assert np.allclose(dense.sum(axis=1), 1.0)
+        assert np.array_equal(recorder.map_run_lengths, dense.argmax(axis=1))
+        assert np.array_equal(recorder.change_probs, dense[:, 0])
+        assert np.allclose(recorder.expected_run_lengths, dense @ np.arange(dense.shape[1]))
+
+    @pytest.mark.parametrize("pruning_threshold,max_run_lengths", ((1e-12, 20), (0.0, 20), (1e-6, None)))
+    def test_truncated_record(self, pruning_threshold, max_run_lengths):
+        recorder = RunLengthPosteriorRecorder(threshold=0.0)
+        algorithm = BayesianAlgorithm(
+            learning_steps=50,
+            likelihood=GaussianUnknownMeanAndVariance(),
+            hazard=ConstantHazard(200),
+            detector=SimpleDetector(0.1),
+            localizer=SimpleLocalizer(),
+            pruning_threshold=pruning_threshold,
+            max_run_lengths=max_run_lengths,
+            recorder=recorder,
+        )
+        map_run_lengths = []
+        for observation in np.random.default_rng(3).normal(0, 1, 300):
+            assert algorithm.push(observation) == []
+            map_run_lengths.append(algorithm.map_run_length)
+
+        dense = recorder.to_dense()
+        # Statistics are updated by 251 observations, so the longest run length is 251.
+        assert dense.shape == (len(recorder), 252)
+        assert np.allclose(dense.sum(axis=1), 1.0)
+        assert recorder.map_run_lengths.tolist() == map_run_lengths[49:]
+        assert np.array_equal(recorder.map_run_lengths, dense.argmax(axis=1))
+        assert np.array_equal(recorder.change_probs, dense[:, 0])
+        assert np.allclose(recorder.expected_run_lengths, dense @ np.arange(dense.shape[1]))
+
+    @pytest.mark.parametrize("threshold", (1e-3,))
+    def test_banded_record(self, threshold):
+        data = generate_data(1)
+        dense_recorder = RunLengthPosteriorRecorder(threshold=0.0)
+        banded_recorder = RunLengthPosteriorRecorder(threshold=threshold)
+        self.record(data, dense_recorder)
+        self.record(data, banded_recorder)
+
+        assert banded_recorder.values.shape[0] < dense_recorder.values.shape[0]
+        assert np.array_equal(banded_recorder.times, dense_recorder.times)
+        assert np.array_equal(banded_recorder.map_run_lengths, dense_recorder.map_run_lengths)
+        assert np.array_equal(banded_recorder.expected_run_lengths, dense_recorder.expected_run_lengths)
+        for index in range(len(dense_recorder)):
+            run_lengths, band = banded_recorder.band(index)
+            _, dense_row = dense_recorder.band(index)
+            assert np.all(band[[0, -1]] >= threshold)
+            assert np.array_equal(band, dense_row[run_lengths])
+
+    def test_memmap_record(self, tmp_path):
+        data = generate_data(2)
+        recorder = RunLengthPosteriorRecorder()
+        self.record(data, recorder)
+        with RunLengthPosteriorRecorder(path=tmp_path / "bands.bin") as file_recorder:
+            self.record(data[:300], file_recorder)
+            partial_values = file_recorder.values
+            assert file_recorder.values is partial_values
+            self.record(data, file_recorder)
+
+        assert isinstance(file_recorder.values, np.memmap)
+        assert file_recorder.values is file_recorder.values
+        assert np.array_equal(file_recorder.values[partial_values.shape[0] :], recorder.values)
+        assert np.array_equal(np.diff(file_recorder.offsets)[-len(recorder) :], np.diff(recorder.offsets))
+
+
+class TestGaussianUnknownMeanAndVariance:
+    def test_buffers_growth(self):
+        likelihood = GaussianUnknownMeanAndVariance()
+        sample = generate_data(0)
+        for _ in range(2):
+            likelihood.clear()
+            likelihood.learn(list(sample[:10]))
+            for run_length, observation in enumerate(sample[10:300], start=1):
+                assert len(likelihood.predict(observation)) == run_length
+                likelihood.update(observation)
+
+    def test_predict_log(self):
+        likelihood = GaussianUnknownMeanAndVariance()
+        sample = generate_data(0)
+        likelihood.learn(list(sample[:10]))
+        for observation in sample[10:100]:
+            likelihood.update(observation)
+
+        log_probs = likelihood.predict_log(1e3)
+        assert np.all(np.isfinite(log_probs))
+        assert np.allclose(np.exp(likelihood.predict_log(sample[100])), likelihood.predict(sample[100]))
+
+    @pytest.mark.parametrize("observation", (-1.0, 0.0, 2.5))
+    def test_predict_learning_step(self, observation):
+        likelihood = GaussianUnknownMeanAndVariance()
+        sample = generate_data(0)[:10]
+        likelihood.learn(list(sample))
+
+        mean = sample.mean()
+        beta = ((sample - mean) ** 2).sum() / 2.0
+        alpha = len(sample) / 2.0
+        scale = beta * (len(sample) + 1.0) / (alpha * len(sample))
+        expected = stats.t.logpdf(observation, df=2.0 * alpha, loc=mean, scale=scale)
+        assert np.allclose(likelihood.predict_log(observation), [expected])
+
+    def test_predict_log_after_merge(self):
+        sample = generate_data(0)
+
+        def expected_log_probs(likelihood, observation):
+            state = likelihood.get_state()
+            alpha, k = state["alpha_params"], state["k_params"]
+            scale = state["beta_params"] * (k + 1.0) / (alpha * k)
+            return stats.t.logpdf(observation, df=2.0 * alpha, loc=state["mu_params"], scale=scale)
+
+        likelihood = GaussianUnknownMeanAndVariance()
+        likelihood.learn(list(sample[:10]))
+        for observation in sample[10:40]:
+            likelihood.update(observation)
+            likelihood.predict_log(observation)
+        # The longest run length is merged into the 10th position, like BayesianAlgorithm does.
+        likelihood.drop_run_lengths(9, 30)
+        for observation in sample[40:45]:
+            assert np.allclose(likelihood.predict_log(observation), expected_log_probs(likelihood, observation))
+            likelihood.update(observation)
+
+        restored = GaussianUnknownMeanAndVariance()
+        restored.set_state(likelihood.get_state())
+        assert np.allclose(restored.predict_log(sample[45]), expected_log_probs(likelihood, sample[45]))
+
+
+class TestMultivariateGaussianUnknownMeanAndCovariance:
+    def test_predict_log(self):
+        generator = np.random.default_rng(0)
+        covariance = np.array([[2.0, 0.5, 0.0], [0.5, 1.0, 0.3], [0.0, 0.3, 1.0]])
+        data = generator.multivariate_normal(np.zeros(3), covariance, 61)
+        learning_sample, observations = data[:20], data[20:60]
+
+        likelihood = MultivariateGaussianUnknownMeanAndCovariance()
+        likelihood.learn(list(learning_sample))
+        for observation in observations:
+            likelihood.update(observation)
+        log_probs = likelihood.predict_log(data[60])
+
+        mu_0 = learning_sample.mean(axis=0)
+        scale_0 = (learning_sample - mu_0).T @ (learning_sample - mu_0)
+        sample_size, dimension = learning_sample.shape
+        for run_length, log_prob in enumerate(log_probs):
+            # Posterior parameters evaluated directly from the last run_length observations.
+            run = observations[len(observations) - run_length :]
+            kappa = sample_size + run_length
+            nu = sample_size + run_length
+            mu, scale = mu_0, scale_0
+            if run_length > 0:
+                run_mean = run.mean(axis=0)
+                mu = (sample_size * mu_0 + run_length * run_mean) / kappa
+                scale = (
+                    scale_0
+                    + (run - run_mean).T @ (run - run_mean)
+                    + sample_size * run_length / kappa * np.outer(run_mean - mu_0, run_mean - mu_0)
+                )
+
+            degrees_of_freedom = nu - dimension + 1
+            shape = scale * (kappa + 1) / (kappa * degrees_of_freedom)
+            expected = stats.multivariate_t(loc=mu, shape=shape, df=degrees_of_freedom).logpdf(data[60])
+            assert np.isclose(log_prob, expected)
+
+    @pytest.mark.parametrize("seed,expected_change_point,margin", ((0, 300, 20), (1, 300, 20)))
+    def test_localize(self, seed, expected_change_point, margin):
+        generator = np.random.default_rng(seed)
+        data = np.concatenate(
+            [generator.normal(0, 1, (300, 3)), generator.normal(0, 1, (300, 3)) + np.array([0.0, 5.0, -5.0])]
+        )
+        algorithm = BayesianAlgorithm(
+            learning_steps=50,
+            likelihood=MultivariateGaussianUnknownMeanAndCovariance(),
+            hazard=ConstantHazard(200),
+            detector=SimpleDetector(0.1),
+            localizer=SimpleLocalizer(),
+        )
+        change_points = algorithm.localize(data)
+        assert any(abs(change_point - expected_change_point) <= margin for change_point in change_points)
+
+
+def poisson_predictive(sample: np.ndarray):
+    alpha, beta = 1.0 + sample.sum(), len(sample)
+    return stats.nbinom(n=alpha, p=beta / (beta + 1.0)).logpmf
+
+
+def exponential_predictive(sample: np.ndarray):
+    alpha, beta = 1.0 + len(sample), sample.sum()
+    return stats.lomax(c=alpha, scale=beta).logpdf
+
+
+def bernoulli_predictive(sample: np.ndarray):
+    alpha, beta = 1.0 + sample.sum(), 1.0 + len(sample) - sample.sum()
+    return stats.bernoulli(alpha / (alpha + beta)).logpmf
+
+
+class TestConjugateLikelihoods:
+    @pytest.mark.parametrize(
+        "likelihood,generate,predictive",
+        (
+            (PoissonUnknownRate(), lambda generator, size: generator.poisson(3.0, size), poisson_predictive),
+            (
+                ExponentialUnknownRate(),
+                lambda generator, size: generator.exponential(2.0, size),
+                exponential_predictive,
+            ),
+            (
+                BernoulliUnknownProbability(),
+                lambda generator, size: generator.binomial(1, 0.2, size),
+                bernoulli_predictive,
+            ),
+        ),
+    )
+    def test_predict_log(self, likelihood, generate, predictive):
+        generator = np.random.default_rng(0)
+        learning_sample = generate(generator, 20).astype(np.float64)
+        observations = generate(generator, 30).astype(np.float64)
+        new_observation = generate(generator, 1)[0]
+
+        likelihood.learn(list(learning_sample))
+        for observation in observations:
+            likelihood.update(observation)
+        log_probs = likelihood.predict_log(new_observation)
+
+        assert len(log_probs) == len(observations) + 1
+        for run_length in (0, 1, len(observations)):
+            sample = np.concatenate([learning_sample, observations[len(observations) - run_length :]])
+            assert np.isclose(log_probs[run_length], predictive(sample)(new_observation))
+
+    @pytest.mark.parametrize("expected_change_point,margin", ((300, 30),))
+    def test_localize_counts(self, expected_change_point, margin):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.poisson(2.0, 300), generator.poisson(8.0, 300)])
+        algorithm = BayesianAlgorithm(
+            learning_steps=50,
+            likelihood=PoissonUnknownRate(),
+            hazard=ConstantHazard(200),
+            detector=SimpleDetector(0.1),
+            localizer=SimpleLocalizer(),
+            log_space=True,
+        )
+        change_points = algorithm.localize(data)
+        assert any(abs(change_point - expected_change_point) <= margin for change_point in change_points)
+
+
+class TestStudentTUnknownLocationAndScale:
+    def test_predict_log(self):
+        generator = np.random.default_rng(0)
+        likelihood = StudentTUnknownLocationAndScale(particles_count=64, seed=0)
+        likelihood.learn(list(generator.standard_t(3, 50)))
+        particles = likelihood.get_state()["prior"]
+
+        observations = generator.standard_t(3, 10)
+        for observation in observations:
+            likelihood.predict_log(observation)
+            likelihood.update(observation)
+
+        new_observation = 0.5
+        log_probs = likelihood.predict_log(new_observation)
+        assert len(log_probs) == len(observations) + 1
+        expected = np.mean(stats.t.pdf(new_observation, 3, loc=particles[:, 0], scale=np.exp(particles[:, 1])))
+        assert np.isclose(log_probs[0], np.log(expected))
+
+    def test_snapshot(self):
+        generator = np.random.default_rng(1)
+        likelihood = StudentTUnknownLocationAndScale(seed=0)
+        likelihood.learn(list(generator.standard_t(3, 50)))
+        for observation in generator.standard_t(3, 100):
+            likelihood.predict_log(observation)
+            likelihood.update(observation)
+
+        restored = StudentTUnknownLocationAndScale()
+        restored.set_state(likelihood.get_state())
+        assert np.array_equal(restored.predict_log(0.5), likelihood.predict_log(0.5))
+
+    @pytest.mark.parametrize("seed,expected_change_point,margin", ((0, 300, 20), (1, 300, 20), (2, 300, 20)))
+    def test_localize_heavy_tailed(self, seed, expected_change_point, margin):
+        generator = np.random.default_rng(seed)
+        data = np.concatenate([generator.standard_t(2, 300), 5.0 + generator.standard_t(2, 300)])
+        algorithm = BayesianAlgorithm(
+            learning_steps=50,
+            likelihood=StudentTUnknownLocationAndScale(seed=0),
+            hazard=ConstantHazard(200),
+            detector=SimpleDetector(0.1),
+            localizer=SimpleLocalizer(),
+            log_space=True,
+            max_run_lengths=200,
+        )
+        change_points = algorithm.localize(data)
+        assert len(change_points) == 1
+        assert abs(change_points[0] - expected_change_point) <= margin
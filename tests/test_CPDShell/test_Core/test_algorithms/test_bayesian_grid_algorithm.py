@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from CPDShell.Core.algorithms.bayesian_algorithm import BayesianAlgorithm
+from CPDShell.Core.algorithms.bayesian_grid_algorithm import BayesianGridAlgorithm
+from CPDShell.Core.algorithms.BayesianCPD.detectors.drop_detector import DropDetector
+from CPDShell.Core.algorithms.BayesianCPD.detectors.simple_detector import SimpleDetector
+from CPDShell.Core.algorithms.BayesianCPD.hazards.constant_hazard import ConstantHazard
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.gaussian_unknown_mean_and_variance import (
+    GaussianUnknownMeanAndVariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.localizers.simple_localizer import SimpleLocalizer
+
+RATES = (50, 200, 1000)
+
+
+def generate_data(seed: int) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return np.concatenate([generator.normal(0, 1, 300), generator.normal(6, 1, 300), generator.normal(0, 3, 300)])
+
+
+class TestBayesianGridAlgorithm:
+    @pytest.mark.parametrize("seed", (0, 1))
+    @pytest.mark.parametrize(
+        "detectors",
+        (
+            [SimpleDetector(threshold) for threshold in (0.05, 0.1, 0.5)],
+            [DropDetector(threshold) for threshold in (0.1, 0.5, 0.9)],
+        ),
+    )
+    def test_every_combination(self, seed, detectors):
+        data = generate_data(seed)
+        grid_algorithm = BayesianGridAlgorithm(
+            50, GaussianUnknownMeanAndVariance(), [ConstantHazard(rate) for rate in RATES], detectors, SimpleLocalizer()
+        )
+        change_points = grid_algorithm.localize(data)
+        change_points_count = grid_algorithm.detect(data)
+
+        assert len(change_points) == len(change_points_count) == len(RATES) * len(detectors)
+        for hazard_index, rate in enumerate(RATES):
+            for detector_index, detector in enumerate(detectors):
+                algorithm = BayesianAlgorithm(
+                    50, GaussianUnknownMeanAndVariance(), ConstantHazard(rate), detector, SimpleLocalizer()
+                )
+                assert change_points[(hazard_index, detector_index)] == algorithm.localize(data)
+                assert change_points_count[(hazard_index, detector_index)] == algorithm.detect(data)
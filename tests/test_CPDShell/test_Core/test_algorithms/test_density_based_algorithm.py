@@ -0,0 +1,297 @@
+import numpy as np
+import pytest
+from scipy import stats
+from scipy.optimize import minimize
+
+from CPDShell.Core.algorithms.DensityBasedCPD.abstracts.density_based_algorithm import DensityBasedAlgorithm
+from CPDShell.Core.algorithms.kliep_algorithm import KliepAlgorithm
+from CPDShell.Core.algorithms.rulsif_algorithm import RulsifAlgorithm
+
+
+def direct_kernel_density_estimation(observation: np.ndarray, bandwidth: float, points: np.ndarray) -> np.ndarray:
+    kernel_values = np.exp(-0.5 * ((points[:, np.newaxis] - observation[np.newaxis, :]) / bandwidth) ** 2)
+    return kernel_values.sum(axis=1) / (len(observation) * bandwidth * np.sqrt(2 * np.pi))
+
+
+class TestKernelDensityEstimation:
+    @pytest.mark.parametrize("size,bandwidth,tolerance", ((500, 0.3, 1e-4), (2000, 0.1, 1e-3)))
+    def test_grid(self, size, bandwidth, tolerance):
+        observation = np.random.default_rng(0).standard_normal(size)
+        kde_values = DensityBasedAlgorithm._kernel_density_estimation(observation, bandwidth)
+
+        x_grid = np.linspace(observation.min() - 3 * bandwidth, observation.max() + 3 * bandwidth, len(kde_values))
+        expected = direct_kernel_density_estimation(observation, bandwidth, x_grid)
+        assert np.max(np.abs(kde_values - expected)) <= tolerance * np.max(expected)
+
+    def test_at_observations(self):
+        observation = np.random.default_rng(1).exponential(1.0, 300)
+        kde_values = DensityBasedAlgorithm._kernel_density_estimation(observation, 0.5, at_observations=True)
+
+        expected = direct_kernel_density_estimation(observation, 0.5, observation)
+        assert kde_values.shape == observation.shape
+        assert np.max(np.abs(kde_values - expected)) <= 1e-3 * np.max(expected)
+
+
+class TestDensityBasedAlgorithm:
+    @pytest.mark.parametrize("algorithm_type", (KliepAlgorithm, RulsifAlgorithm))
+    @pytest.mark.parametrize("size", (200, 1000))
+    def test_window_sizes(self, algorithm_type, size):
+        margin = 5
+        generator = np.random.default_rng(2)
+        window = np.concatenate([generator.normal(0.0, 1.0, size // 2), generator.normal(3.0, 1.0, size - size // 2)])
+        algorithm = algorithm_type(bandwidth=0.5, regularization_coef=0.1)
+
+        change_points = algorithm.localize(window)
+        assert all(0 <= change_point < size for change_point in change_points)
+        assert abs(np.nanargmax(algorithm.sliding_scores(window, size // 4)) - size // 2) <= margin
+
+
+class TestRulsifAlgorithm:
+    @pytest.mark.parametrize("basis_size", (50, 200))
+    def test_density_ratio(self, basis_size):
+        relative_coef = 0.5
+        min_correlation = 0.9
+        generator = np.random.default_rng(3)
+        test_value = generator.normal(1.0, 1.0, 500)
+        reference_value = generator.normal(0.0, 1.0, 500)
+        algorithm = RulsifAlgorithm(
+            bandwidth=0.5, regularization_coef=0.01, relative_coef=relative_coef, basis_size=basis_size
+        )
+
+        density_ratio = algorithm._calculate_density_ratio(test_value, reference_value)
+        test_density = stats.norm.pdf(test_value, 1.0, 1.0)
+        reference_density = stats.norm.pdf(test_value, 0.0, 1.0)
+        expected_ratio = test_density / (relative_coef * test_density + (1.0 - relative_coef) * reference_density)
+        assert np.isclose(np.mean(density_ratio), 1.0)
+        assert np.corrcoef(density_ratio, expected_ratio)[0, 1] >= min_correlation
+
+    @pytest.mark.parametrize("dimension", (1, 2))
+    @pytest.mark.parametrize("basis_size", (10, 100))
+    def test_batch_density_ratios(self, dimension, basis_size):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 1.0, (100, dimension)) for mean in (0.0, 3.0)])
+        if dimension == 1:
+            data = data[:, 0]
+        windows = np.moveaxis(np.lib.stride_tricks.sliding_window_view(data, 50, axis=0), -1, 1)[::7]
+        algorithm = RulsifAlgorithm(bandwidth=1.0, regularization_coef=0.01, threshold=1.02, basis_size=basis_size)
+
+        density_ratios = algorithm._calculate_batch_density_ratios(windows)
+        for window, density_ratio in zip(windows, density_ratios):
+            assert np.allclose(density_ratio, algorithm._calculate_density_ratio(window, window))
+        assert algorithm.detect_batch(windows) == [algorithm.detect(window) for window in windows]
+        assert algorithm.localize_batch(windows) == [algorithm.localize(window) for window in windows]
+
+
+class TestKliepAlgorithm:
+    @pytest.mark.parametrize("seed", (0, 1, 2))
+    def test_project(self, seed):
+        generator = np.random.default_rng(seed)
+        coefficients = generator.normal(0.0, 1.0, 30)
+        reference_means = generator.uniform(0.1, 1.0, 30)
+
+        projected = KliepAlgorithm._project(coefficients, reference_means)
+        assert np.all(projected >= 0.0)
+        assert np.isclose(reference_means @ projected, 1.0)
+        assert np.allclose(KliepAlgorithm._project(projected, reference_means), projected)
+
+        # Any other feasible point is farther from the projected one.
+        other = KliepAlgorithm._project(projected + generator.normal(0.0, 0.1, 30), reference_means)
+        assert np.sum((coefficients - projected) ** 2) <= np.sum((coefficients - other) ** 2)
+
+    def test_fit_coefficients(self):
+        basis_size = 20
+        objective_tolerance = 1e-3
+        generator = np.random.default_rng(3)
+        test_value = generator.normal(1.0, 1.0, 300)
+        reference_value = generator.normal(0.0, 1.0, 300)
+        algorithm = KliepAlgorithm(bandwidth=0.5, regularization_coef=0.0, basis_size=basis_size, tolerance=1e-9)
+
+        centres = algorithm._select_centres(test_value, basis_size)
+        test_kernel = algorithm._gaussian_kernel_matrix(test_value, centres, algorithm.bandwidth)
+        reference_means = np.mean(algorithm._gaussian_kernel_matrix(reference_value, centres, algorithm.bandwidth), 0)
+        coefficients = algorithm._fit_coefficients(test_kernel, reference_means)
+
+        result = minimize(
+            lambda theta: -np.mean(np.log(test_kernel @ theta)),
+            np.ones(basis_size) / np.sum(reference_means),
+            jac=lambda theta: -test_kernel.T @ (1.0 / (test_kernel @ theta)) / len(test_value),
+            bounds=[(0.0, None)] * basis_size,
+            constraints=[{"type": "eq", "fun": lambda theta: reference_means @ theta - 1.0}],
+            method="SLSQP",
+            options={"maxiter": 1000, "ftol": 1e-12},
+        )
+        assert np.isclose(reference_means @ coefficients, 1.0)
+        assert algorithm._objective(test_kernel, coefficients, 0.0) >= -result.fun - objective_tolerance
+
+    def test_density_ratio(self):
+        min_correlation = 0.9
+        generator = np.random.default_rng(4)
+        test_value = generator.normal(1.0, 1.0, 500)
+        reference_value = generator.normal(0.0, 1.0, 500)
+
+        density_ratio = KliepAlgorithm(bandwidth=0.5, regularization_coef=0.0)._calculate_density_ratio(
+            test_value, reference_value
+        )
+        assert np.isclose(np.mean(density_ratio), 1.0)
+        assert stats.spearmanr(density_ratio, test_value)[0] >= min_correlation
+
+
+def generate_shifted_series(seed: int) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return np.concatenate([generator.normal(0.0, 1.0, 300), generator.normal(3.0, 1.0, 300)])
+
+
+class TestSlidingScores:
+    @pytest.mark.parametrize(
+        "algorithm",
+        (
+            RulsifAlgorithm(bandwidth=0.5, regularization_coef=0.1, basis_size=50),
+            KliepAlgorithm(bandwidth=0.5, regularization_coef=0.01, basis_size=50),
+        ),
+    )
+    @pytest.mark.parametrize("seed,expected_change_point,margin", ((0, 300, 10), (1, 300, 10)))
+    def test_peak(self, algorithm, seed, expected_change_point, margin):
+        window_size = 50
+        scores = algorithm.sliding_scores(generate_shifted_series(seed), window_size)
+        assert np.all(np.isnan(scores[:window_size]))
+        assert np.all(np.isfinite(scores[window_size : len(scores) - window_size + 1]))
+        assert abs(np.nanargmax(scores) - expected_change_point) <= margin
+
+    @pytest.mark.parametrize("window_size", (20, 50))
+    def test_incremental_gram(self, window_size):
+        series = generate_shifted_series(2)
+        algorithm = RulsifAlgorithm(bandwidth=0.5, regularization_coef=0.1, basis_size=30)
+        scores = algorithm.sliding_scores(series, window_size)
+
+        kernel = algorithm._gaussian_kernel_matrix(series, algorithm._select_centres(series, 30), algorithm.bandwidth)
+        for time in range(window_size, len(series) - window_size + 1, 7):
+            reference_kernel = kernel[time - window_size : time]
+            test_kernel = kernel[time : time + window_size]
+            expected, _ = algorithm._window_divergence(
+                test_kernel,
+                test_kernel.T @ test_kernel / window_size,
+                np.mean(test_kernel, axis=0),
+                reference_kernel.T @ reference_kernel / window_size,
+                np.mean(reference_kernel, axis=0),
+                None,
+            )
+            assert np.isclose(scores[time], expected)
+
+    def test_short_series(self):
+        scores = RulsifAlgorithm(bandwidth=0.5, regularization_coef=0.1).sliding_scores(np.zeros(10), 6)
+        assert np.all(np.isnan(scores))
+
+
+class NanLossesAlgorithm(RulsifAlgorithm):
+    def _cross_validation_losses(self, test_kernel, reference_kernel, regularization_coefs, folds):
+        return np.full(len(regularization_coefs), np.nan)
+
+
+class TestSelectParameters:
+    bandwidths = (0.01, 0.1, 0.5, 1.0)
+    regularization_coefs = (1e-3, 1e-1, 10.0)
+
+    @pytest.mark.parametrize(
+        "algorithm",
+        (
+            RulsifAlgorithm(bandwidth=1.0, regularization_coef=1.0, relative_coef=0.5, basis_size=30),
+            KliepAlgorithm(bandwidth=1.0, regularization_coef=1.0, basis_size=30),
+        ),
+    )
+    def test_parallel_selection(self, algorithm):
+        generator = np.random.default_rng(0)
+        test_value = generator.normal(1.0, 1.0, 200)
+        reference_value = generator.normal(0.0, 1.0, 200)
+
+        selected = algorithm.select_parameters(test_value, reference_value, self.bandwidths, self.regularization_coefs)
+        assert (algorithm.bandwidth, algorithm.regularization_coef) == selected
+        assert selected[0] != min(self.bandwidths)
+        assert selected[1] != max(self.regularization_coefs)
+        assert (
+            algorithm.select_parameters(
+                test_value, reference_value, self.bandwidths, self.regularization_coefs, workers=2
+            )
+            == selected
+        )
+
+    def test_nan_losses(self):
+        algorithm = NanLossesAlgorithm(bandwidth=1.0, regularization_coef=1.0, basis_size=10)
+        generator = np.random.default_rng(0)
+        test_value = generator.normal(1.0, 1.0, 20)
+        reference_value = generator.normal(0.0, 1.0, 20)
+
+        with pytest.raises(ValueError, match="Cross-validation losses"):
+            algorithm.select_parameters(test_value, reference_value, self.bandwidths, self.regularization_coefs)
+        assert (algorithm.bandwidth, algorithm.regularization_coef) == (1.0, 1.0)
+
+    @pytest.mark.parametrize("folds", (2, 5))
+    def test_rulsif_losses(self, folds):
+        generator = np.random.default_rng(1)
+        test_kernel = generator.uniform(0.0, 1.0, (60, 10))
+        reference_kernel = generator.uniform(0.0, 1.0, (50, 10))
+        algorithm = RulsifAlgorithm(bandwidth=1.0, regularization_coef=1.0, relative_coef=0.3)
+        regularization_coefs = np.array(self.regularization_coefs)
+
+        losses = algorithm._cross_validation_losses(test_kernel, reference_kernel, regularization_coefs, folds)
+        for index, regularization_coef in enumerate(regularization_coefs):
+            expected = 0.0
+            for fold in range(folds):
+                test_mask = np.arange(len(test_kernel)) % folds == fold
+                reference_mask = np.arange(len(reference_kernel)) % folds == fold
+                second_moment = 0.3 * np.cov(test_kernel[~test_mask].T, bias=True) + 0.7 * np.cov(
+                    reference_kernel[~reference_mask].T, bias=True
+                )
+                train_test_means = np.mean(test_kernel[~test_mask], axis=0)
+                train_reference_means = np.mean(reference_kernel[~reference_mask], axis=0)
+                second_moment += 0.3 * np.outer(train_test_means, train_test_means) + 0.7 * np.outer(
+                    train_reference_means, train_reference_means
+                )
+                coefficients = np.linalg.solve(second_moment + regularization_coef * np.eye(10), train_test_means)
+                test_ratios = test_kernel[test_mask] @ coefficients
+                reference_ratios = reference_kernel[reference_mask] @ coefficients
+                expected += (
+                    0.15 * np.mean(test_ratios**2) + 0.35 * np.mean(reference_ratios**2) - np.mean(test_ratios)
+                ) / folds
+            assert np.isclose(losses[index], expected)
+
+
+def generate_multivariate_series(seed: int) -> np.ndarray:
+    generator = np.random.default_rng(seed)
+    return np.concatenate([generator.normal(0.0, 1.0, (300, 3)), generator.normal([1.5, 0.0, -1.5], 1.0, (300, 3))])
+
+
+class TestMultivariate:
+    @pytest.mark.parametrize("centre_selection", ("even", "random", "kmeans"))
+    @pytest.mark.parametrize("dimension,basis_size", ((1, 20), (3, 20), (3, 1000)))
+    def test_select_centres(self, centre_selection, dimension, basis_size):
+        sample = np.random.default_rng(0).normal(0.0, 1.0, (200, dimension))
+        if dimension == 1:
+            sample = sample[:, 0]
+        centres = DensityBasedAlgorithm._select_centres(sample, basis_size, centre_selection, seed=0)
+        assert centres.shape[1:] == sample.shape[1:]
+        assert 0 < len(centres) <= min(basis_size, len(sample))
+
+        kernel = DensityBasedAlgorithm._gaussian_kernel_matrix(sample, centres, 1.0)
+        assert kernel.shape == (len(sample), len(centres))
+
+    @pytest.mark.parametrize(
+        "algorithm",
+        (
+            RulsifAlgorithm(bandwidth=1.0, regularization_coef=0.1, basis_size=50, centre_selection="kmeans", seed=0),
+            KliepAlgorithm(bandwidth=1.0, regularization_coef=0.01, basis_size=50, centre_selection="random", seed=0),
+        ),
+    )
+    @pytest.mark.parametrize("seed,expected_change_point,margin", ((0, 300, 10), (1, 300, 10)))
+    def test_sliding_scores(self, algorithm, seed, expected_change_point, margin):
+        scores = algorithm.sliding_scores(generate_multivariate_series(seed), 50)
+        assert abs(np.nanargmax(scores) - expected_change_point) <= margin
+
+    @pytest.mark.parametrize("algorithm_type", (KliepAlgorithm, RulsifAlgorithm))
+    def test_localize(self, algorithm_type):
+        margin = 15
+        window = generate_multivariate_series(2)
+        algorithm = algorithm_type(bandwidth=1.0, regularization_coef=0.1, basis_size=30)
+
+        change_points = algorithm.localize(window)
+        assert all(0 <= change_point < len(window) for change_point in change_points)
+        assert abs(np.nanargmax(algorithm.sliding_scores(window, 50)) - 300) <= margin
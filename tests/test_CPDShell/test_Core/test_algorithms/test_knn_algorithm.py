@@ -0,0 +1,63 @@
+import copy
+import io
+
+import pytest
+
+from CPDShell.Core.algorithms.knn_algorithm import KNNAlgorithm
+
+
+def metric(obs1: float, obs2: float) -> float:
+    return abs(obs1 - obs2)
+
+
+class TestKNNAlgorithm:
+    @pytest.mark.parametrize(
+        "alg_param,data",
+        (((metric, 3, 1.0), (1, 2, 1, 3, 2, 1, 2, 3, 1, 2, 50, 52, 51, 53, 50, 52, 51, 50, 53, 52)),),
+    )
+    def test_parallel_localize(self, alg_param, data):
+        sequential = KNNAlgorithm(*alg_param)
+        parallel = KNNAlgorithm(*alg_param, workers=2)
+        assert parallel.localize(data) == sequential.localize(data)
+
+    @pytest.mark.parametrize(
+        "alg_param,data",
+        (((metric, 3, 1.0), (1, 2, 1, 3, 2, 1, 2, 3, 1, 2, 50, 52, 51, 53, 50, 52, 51, 50, 53, 52)),),
+    )
+    def test_parallel_detect(self, alg_param, data):
+        sequential = KNNAlgorithm(*alg_param)
+        parallel = KNNAlgorithm(*alg_param, workers=2)
+        assert parallel.detect(data) == sequential.detect(data)
+
+    @pytest.mark.parametrize(
+        "alg_param,data",
+        (((metric, 3, 1.0), (1, 2, 1, 3, 2, 1, 2, 3, 1, 2, 50, 52, 51, 53, 50, 52, 51, 50, 53, 52)),),
+    )
+    def test_parallel_windows(self, alg_param, data):
+        sequential = KNNAlgorithm(*alg_param)
+        parallel = KNNAlgorithm(*alg_param, workers=2)
+        windows = [data[:4], data[:12], data, data[4:16], data + data]
+        expected = [sequential.localize(window) for window in windows]
+        assert [parallel.localize(window) for window in windows] == expected
+
+        parallel_copy = copy.deepcopy(parallel)
+        parallel.close()
+        assert [parallel_copy.localize(window) for window in windows] == expected
+        assert [parallel.localize(window) for window in windows] == expected
+        parallel_copy.close()
+        parallel.close()
+
+    @pytest.mark.parametrize(
+        "alg_param,data",
+        (((metric, 3, 1.0), (1, 2, 1, 3, 2, 1, 2, 3, 1, 2, 50, 52, 51, 53, 50, 52, 51, 50, 53, 52)),),
+    )
+    def test_snapshot(self, alg_param, data):
+        algorithm = KNNAlgorithm(*alg_param, workers=2)
+        change_points = algorithm.localize(data)
+        snapshot = io.BytesIO()
+        algorithm.snapshot(snapshot)
+        snapshot.seek(0)
+
+        restored_algorithm = KNNAlgorithm(*alg_param)
+        restored_algorithm.restore(snapshot)
+        assert restored_algorithm.get_state()["change_points"].tolist() == change_points
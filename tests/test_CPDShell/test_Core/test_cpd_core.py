@@ -1,8 +1,15 @@
+import asyncio
+import itertools
+import time
+
+import numpy as np
 import pytest
 
 from CPDShell.Core.algorithms.graph_algorithm import GraphAlgorithm
+from CPDShell.Core.algorithms.rulsif_algorithm import RulsifAlgorithm
 from CPDShell.Core.cpd_core import CPDCore, Scrubber
 from CPDShell.Core.scenario import Scenario
+from CPDShell.Core.scrubber.streaming_scrubber import StreamingScrubber
 
 
 def custom_comparison(node1, node2):
@@ -10,6 +17,18 @@ def custom_comparison(node1, node2):
     return abs(node1 - node2) <= arg
 
 
+class SlowGraphAlgorithm(GraphAlgorithm):
+    def localize(self, window):
+        time.sleep(0.001)
+        return super().localize(window)
+
+
+async def produce(data, produced):
+    for value in data:
+        produced.append(value)
+        yield value
+
+
 class TestCPDCore:
     @pytest.mark.parametrize(
         "scenario_param,data,alg_class,alg_param,expected",
@@ -37,3 +56,82 @@ class TestCPDCore:
 
         core = CPDCore(scrubber, algorithm)
         assert core.run() == expected
+
+    @pytest.mark.parametrize("to_localize", (True, False))
+    @pytest.mark.parametrize("workers,use_threads", ((2, True), (3, True), (8, True), (3, False)))
+    def test_speculative_run(self, to_localize, workers, use_threads):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5, 0, 5, 0)])
+
+        expected = CPDCore(Scrubber(Scenario(10, to_localize), data), GraphAlgorithm(custom_comparison, 2)).run()
+        core = CPDCore(Scrubber(Scenario(10, to_localize), data), GraphAlgorithm(custom_comparison, 2))
+        assert core.run(workers, use_threads) == expected
+        assert core.run(workers, use_threads) == expected
+
+    @pytest.mark.parametrize("to_localize", (True, False))
+    def test_astream(self, to_localize):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5, 0, 5, 0)])
+        expected = CPDCore(Scrubber(Scenario(10, to_localize), data), GraphAlgorithm(custom_comparison, 2)).run()
+
+        async def astream():
+            core = CPDCore(StreamingScrubber(Scenario(10, to_localize), ()), GraphAlgorithm(custom_comparison, 2))
+            return [change_point async for change_point in core.astream(produce(data, []))]
+
+        assert asyncio.run(astream()) == expected
+
+    @pytest.mark.parametrize("chunk_size", (1, 7, 25, 300))
+    def test_chunked_astream(self, chunk_size):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5, 0, 5, 0)])
+        expected = CPDCore(Scrubber(Scenario(10, True), data), GraphAlgorithm(custom_comparison, 2)).run()
+        chunks = [data[start : start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+        async def astream():
+            core = CPDCore(
+                StreamingScrubber(Scenario(10, True), (), chunked=True), GraphAlgorithm(custom_comparison, 2)
+            )
+            return [change_point async for change_point in core.astream(produce(chunks, []))]
+
+        assert asyncio.run(astream()) == expected
+
+    def test_astream_backpressure(self):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5)])
+        produced = []
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(len(produced))
+                await asyncio.sleep(0)
+
+        async def astream():
+            ticker = asyncio.create_task(tick())
+            core = CPDCore(StreamingScrubber(Scenario(1, True), (), 10), SlowGraphAlgorithm(custom_comparison, 2))
+            change_points = [
+                change_point async for change_point in core.astream(produce(itertools.cycle(data), produced))
+            ]
+            ticker.cancel()
+            return change_points
+
+        change_points = asyncio.run(astream())
+        assert len(change_points) == 1
+        assert len(produced) <= change_points[0] + 10
+        assert ticks
+
+    @pytest.mark.parametrize("to_localize", (True, False))
+    @pytest.mark.parametrize("batch_size", (2, 8, 64))
+    @pytest.mark.parametrize(
+        "algorithm",
+        (
+            GraphAlgorithm(custom_comparison, 2),
+            RulsifAlgorithm(bandwidth=1.0, regularization_coef=0.01, threshold=1.02),
+        ),
+    )
+    def test_batch_run(self, to_localize, batch_size, algorithm):
+        generator = np.random.default_rng(0)
+        data = np.concatenate([generator.normal(mean, 1.0, 100) for mean in (0, 3, 0)])
+
+        expected = CPDCore(Scrubber(Scenario(10, to_localize), data, 50), algorithm).run()
+        assert CPDCore(Scrubber(Scenario(10, to_localize), data, 50), algorithm).run(batch_size=batch_size) == expected
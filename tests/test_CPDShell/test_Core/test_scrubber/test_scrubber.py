@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from CPDShell.Core.scrubber.scrubber import Scenario, Scrubber
@@ -56,3 +57,31 @@ class TestScrubber:
             scrubber.generate_window()
             scrubber.add_change_points(change_points.pop(0))
         assert scrubber.change_points == expected_change_points
+
+    @pytest.mark.parametrize("size", (5, 13, 40))
+    @pytest.mark.parametrize("window_length,movement_k", ((5, 1.0 / 3.0), (7, 1.0 / 3.0), (4, 1.0)))
+    def test_generate_windows(self, size, window_length, movement_k):
+        data = np.arange(size, dtype=np.float64)
+        scrubber = Scrubber(Scenario(1, True), data, window_length, movement_k)
+        expected_windows = []
+        while scrubber.is_running:
+            expected_windows.append(list(scrubber.generate_window()))
+            scrubber.add_change_points([])
+
+        scrubber.restart()
+        windows = []
+        while scrubber.is_running:
+            batch = scrubber.generate_windows(3)
+            assert np.shares_memory(batch, data) or len(batch) == 0
+            for window in batch if len(batch) > 0 else [scrubber.generate_window()]:
+                windows.append(list(window))
+                scrubber.add_change_points([])
+        assert windows == expected_windows
+
+    def test_generate_windows_after_data_change(self):
+        scrubber = Scrubber(Scenario(1, True), list(range(20)), 5)
+        assert scrubber.generate_windows(2).tolist() == [list(range(5)), list(range(1, 6))]
+
+        scrubber.data = list(range(100, 120))
+        scrubber.restart()
+        assert scrubber.generate_windows(2).tolist() == [list(range(100, 105)), list(range(101, 106))]
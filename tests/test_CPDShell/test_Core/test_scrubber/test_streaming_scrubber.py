@@ -0,0 +1,95 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from CPDShell.Core.algorithms.graph_algorithm import GraphAlgorithm
+from CPDShell.Core.cpd_core import CPDCore
+from CPDShell.Core.scrubber.scrubber import Scenario, Scrubber
+from CPDShell.Core.scrubber.streaming_scrubber import StreamingScrubber
+from CPDShell.shell import CPDShell
+
+
+def custom_comparison(node1, node2):
+    arg = 1
+    return abs(node1 - node2) <= arg
+
+
+def generate_data() -> np.ndarray:
+    generator = np.random.default_rng(0)
+    return np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5, 0, 5, 0)])
+
+
+class TestStreamingScrubber:
+    @pytest.mark.parametrize(
+        "data,window_length,expected_windows",
+        (
+            (
+                (1, 2, 3, 4, 5, 6, 7),
+                5,
+                [(1, 2, 3, 4, 5), (2, 3, 4, 5, 6)],
+            ),
+            (
+                (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13),
+                7,
+                [(1, 2, 3, 4, 5, 6, 7), (3, 4, 5, 6, 7, 8, 9), (5, 6, 7, 8, 9, 10, 11)],
+            ),
+        ),
+    )
+    @pytest.mark.parametrize("chunked", (False, True))
+    def test_generate_window(self, data, window_length, expected_windows, chunked):
+        source = (data[i : i + 3] for i in range(0, len(data), 3)) if chunked else iter(data)
+        scrubber = StreamingScrubber(Scenario(1, True), source, window_length, chunked=chunked)
+        windows = []
+        while scrubber.is_running:
+            windows.append(tuple(scrubber.generate_window()))
+            scrubber.add_change_points([])
+        assert windows == expected_windows
+
+    @pytest.mark.parametrize("size", (0, 3, 10, 11, 23, 40))
+    @pytest.mark.parametrize("window_change_points", ([], [4], [9], [2, 8]))
+    def test_same_windows_as_scrubber(self, size, window_change_points):
+        data = np.arange(size, dtype=np.float64)
+        scrubber = Scrubber(Scenario(100, True), data, 10)
+        streaming_scrubber = StreamingScrubber(Scenario(100, True), iter(data), 10)
+        # Change points are added to every third window, the others have none.
+        period = 3
+        for index in itertools.count():
+            if not scrubber.is_running or len(scrubber.generate_window()) == 0:
+                break
+            assert streaming_scrubber.is_running
+            assert list(streaming_scrubber.generate_window()) == list(scrubber.generate_window())
+            added = window_change_points if index % period == period - 1 else []
+            scrubber.add_change_points(added)
+            streaming_scrubber.add_change_points(added)
+        assert not streaming_scrubber.is_running
+        assert streaming_scrubber.change_points == scrubber.change_points
+
+    def test_add_change_points(self):
+        scrubber = StreamingScrubber(Scenario(2, True), itertools.count(), 10)
+        scrubber.generate_window()
+        scrubber.add_change_points([4])
+        assert list(scrubber.generate_window()) == list(range(4, 14))
+        scrubber.add_change_points([7, 8])
+        assert scrubber.change_points == [4, 11]
+        assert not scrubber.is_running
+
+    @pytest.mark.parametrize("to_localize", (True, False))
+    @pytest.mark.parametrize("chunk_size", (None, 1, 7, 64))
+    def test_stream(self, to_localize, chunk_size):
+        data = generate_data()
+        expected = CPDCore(Scrubber(Scenario(10, to_localize), data), GraphAlgorithm(custom_comparison, 2)).run()
+
+        source = iter(data) if chunk_size is None else np.array_split(data, len(data) // chunk_size)
+        scrubber = StreamingScrubber(Scenario(10, to_localize), source, chunked=chunk_size is not None)
+        assert list(CPDCore(scrubber, GraphAlgorithm(custom_comparison, 2)).stream()) == expected
+
+    def test_unbounded_stream(self):
+        data = generate_data()
+        expected = CPDCore(Scrubber(Scenario(1, True), data), GraphAlgorithm(custom_comparison, 2)).run()
+
+        shell = CPDShell([0.0], cpd_algorithm=GraphAlgorithm(custom_comparison, 2))
+        shell.change_scenario(3, True)
+        change_points = list(shell.stream_cpd(itertools.cycle(data)))
+        assert len(change_points) == shell.scenario.change_point_number
+        assert change_points[0] == expected[0]
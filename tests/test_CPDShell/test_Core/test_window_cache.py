@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from CPDShell.Core.algorithms.bayesian_algorithm import BayesianAlgorithm
+from CPDShell.Core.algorithms.BayesianCPD.detectors.simple_detector import SimpleDetector
+from CPDShell.Core.algorithms.BayesianCPD.hazards.constant_hazard import ConstantHazard
+from CPDShell.Core.algorithms.BayesianCPD.likelihoods.gaussian_unknown_mean_and_variance import (
+    GaussianUnknownMeanAndVariance,
+)
+from CPDShell.Core.algorithms.BayesianCPD.localizers.simple_localizer import SimpleLocalizer
+from CPDShell.Core.algorithms.graph_algorithm import GraphAlgorithm
+from CPDShell.Core.algorithms.kliep_algorithm import KliepAlgorithm
+from CPDShell.Core.algorithms.knn_algorithm import KNNAlgorithm
+from CPDShell.Core.algorithms.rulsif_algorithm import RulsifAlgorithm
+from CPDShell.Core.cpd_core import CPDCore
+from CPDShell.Core.scenario import Scenario
+from CPDShell.Core.scrubber.scrubber import Scrubber
+from CPDShell.Core.window_cache import WindowCache
+
+
+def custom_comparison(node1, node2):
+    arg = 1
+    return abs(node1 - node2) <= arg
+
+
+def metric(obs1: float, obs2: float) -> float:
+    return abs(obs1 - obs2)
+
+
+def construct_bayesian_algorithm() -> BayesianAlgorithm:
+    return BayesianAlgorithm(
+        10, GaussianUnknownMeanAndVariance(), ConstantHazard(50), SimpleDetector(0.05), SimpleLocalizer()
+    )
+
+
+def generate_data() -> np.ndarray:
+    generator = np.random.default_rng(0)
+    return np.concatenate([generator.normal(mean, 0.1, 40) for mean in (0, 5, 0, 5, 0)])
+
+
+class TestWindowCache:
+    @pytest.mark.parametrize("to_localize", (True, False))
+    def test_rerun(self, to_localize):
+        data = generate_data()
+        cache = WindowCache()
+        core = CPDCore(Scrubber(Scenario(10, to_localize), data), GraphAlgorithm(custom_comparison, 2), cache)
+
+        expected = list(core.run())
+        misses = cache.misses
+        assert cache.hits == 0 and misses > 0
+        assert core.run() == expected
+        assert cache.hits == misses and cache.misses == misses
+
+    @pytest.mark.parametrize("to_localize", (True, False))
+    @pytest.mark.parametrize(
+        "construct_algorithm", (construct_bayesian_algorithm, lambda: KNNAlgorithm(metric, 3, 0.5))
+    )
+    def test_stateful_rerun(self, to_localize, construct_algorithm):
+        data = generate_data()
+        cache = WindowCache()
+        core = CPDCore(Scrubber(Scenario(10, to_localize), data, 30), construct_algorithm(), cache)
+
+        expected = list(core.run())
+        misses = cache.misses
+        assert cache.hits == 0 and misses > 0
+        assert core.run() == expected
+        assert cache.hits == misses and cache.misses == misses
+
+        core.algorithm = construct_algorithm()
+        assert core.run() == expected
+        assert cache.hits == 2 * misses and cache.misses == misses
+
+    def test_detect_after_localize(self):
+        data = generate_data()
+        cache = WindowCache()
+        algorithm = GraphAlgorithm(custom_comparison, 2)
+        localized = [cache.localize(algorithm, data[start : start + 10]) for start in range(0, 190, 10)]
+        detected = [cache.detect(algorithm, data[start : start + 10]) for start in range(0, 190, 10)]
+        assert detected == [len(change_points) for change_points in localized]
+        assert cache.hits == cache.misses
+
+    def test_parameters_change(self):
+        data = generate_data()[:50]
+        cache = WindowCache()
+        algorithm = RulsifAlgorithm(bandwidth=1.0, regularization_coef=0.01, threshold=1.02)
+        cache.detect(algorithm, data)
+        algorithm.threshold = 1.05
+        assert cache.detect(algorithm, data) == algorithm.detect(data)
+        assert cache.hits == 0
+        assert cache.detect(algorithm, data.copy()) == algorithm.detect(data)
+        assert cache.hits == 1
+
+    @pytest.mark.parametrize("algorithm_type", (KliepAlgorithm, RulsifAlgorithm))
+    @pytest.mark.parametrize(
+        "centre_selection,seed,is_cached", (("even", None, True), ("random", None, False), ("kmeans", 0, True))
+    )
+    def test_random_centres(self, algorithm_type, centre_selection, seed, is_cached):
+        data = generate_data()[:50]
+        cache = WindowCache()
+        algorithm = algorithm_type(
+            bandwidth=1.0, regularization_coef=0.01, basis_size=10, centre_selection=centre_selection, seed=seed
+        )
+        for _ in range(2):
+            cache.localize(algorithm, data)
+        assert (cache.hits, len(cache)) == ((1, 1) if is_cached else (0, 0))
+
+    def test_eviction(self):
+        data = generate_data()
+        cache = WindowCache(max_size=2)
+        algorithm = GraphAlgorithm(custom_comparison, 2)
+        for start in (0, 10, 20, 0):
+            cache.localize(algorithm, data[start : start + 10])
+        assert len(cache) == cache.max_size
+        assert (cache.hits, cache.misses) == (0, 4)
+
+        cache.localize(algorithm, data[20:30])
+        assert cache.hits == 1
+
+    def test_disk_tier(self, tmp_path):
+        data = generate_data()
+        algorithm = GraphAlgorithm(custom_comparison, 2)
+        expected = CPDCore(Scrubber(Scenario(10, True), data), algorithm, WindowCache(directory=tmp_path)).run()
+
+        cache = WindowCache(directory=tmp_path)
+        assert CPDCore(Scrubber(Scenario(10, True), data), algorithm, cache).run() == expected
+        assert cache.misses == 0 and cache.disk_hits == cache.hits > 0
+
+    def test_unpicklable_algorithm(self):
+        data = generate_data()
+        cache = WindowCache()
+        algorithm = GraphAlgorithm(lambda node1, node2: abs(node1 - node2) <= 1, 2)
+        assert cache.localize(algorithm, data[:10]) == algorithm.localize(data[:10])
+        assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
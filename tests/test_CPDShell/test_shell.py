@@ -1,13 +1,15 @@
+import array
 import tempfile
 from os import walk
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from CPDShell.Core.algorithms.graph_algorithm import GraphAlgorithm
 from CPDShell.Core.scenario import Scenario
 from CPDShell.Core.scrubber.scrubber import Scrubber
-from CPDShell.shell import CPContainer, CPDShell, LabeledCPData
+from CPDShell.shell import CPContainer, CPDShell, LabeledCPData, to_contiguous_array
 
 
 def custom_comparison(node1, node2):  # TODO: Remove it everywhere
@@ -27,7 +29,7 @@ class TestCPDShell:
 
     def test_init(self) -> None:
         assert self.shell_normal._data == [1, 2, 3, 4]
-        assert self.shell_normal.cpd_core.scrubber.data == [1, 2, 3, 4]
+        assert list(self.shell_normal.cpd_core.scrubber.data) == [1, 2, 3, 4]
         assert isinstance(self.shell_normal.cpd_core.algorithm, GraphAlgorithm)
 
         assert isinstance(self.shell_default.cpd_core.algorithm, GraphAlgorithm)
@@ -41,12 +43,12 @@ class TestCPDShell:
 
     def test_data_getter_setter(self) -> None:
         assert self.shell_for_setter_getter.data == [4, 3, 2, 1]
-        assert self.shell_for_setter_getter.cpd_core.scrubber.data == [4, 3, 2, 1]
+        assert list(self.shell_for_setter_getter.cpd_core.scrubber.data) == [4, 3, 2, 1]
 
         self.shell_for_setter_getter.data = [1, 3, 4]
 
         assert self.shell_for_setter_getter.data == [1, 3, 4]
-        assert self.shell_for_setter_getter.cpd_core.scrubber.data == [1, 3, 4]
+        assert list(self.shell_for_setter_getter.cpd_core.scrubber.data) == [1, 3, 4]
 
     def test_scrubber_setter(self) -> None:
         class TestNewScrubber(Scrubber):
@@ -55,9 +57,38 @@ class TestCPDShell:
         previous_scrubber = self.shell_for_setter_getter.scrubber
         self.shell_for_setter_getter.scrubber = TestNewScrubber
         assert isinstance(self.shell_for_setter_getter.scrubber, TestNewScrubber)
-        assert self.shell_for_setter_getter.scrubber.data == previous_scrubber.data
+        assert self.shell_for_setter_getter.scrubber.data is previous_scrubber.data
         assert self.shell_for_setter_getter.scrubber.scenario == previous_scrubber.scenario
 
+    @pytest.mark.parametrize(
+        "data",
+        [
+            [1.0, 2.0, 3.0, 4.0],
+            (1.0, 2.0, 3.0, 4.0),
+            (x for x in [1.0, 2.0, 3.0, 4.0]),
+            array.array("d", [1.0, 2.0, 3.0, 4.0]),
+            memoryview(array.array("d", [1.0, 2.0, 3.0, 4.0])),
+            np.array([[1.0, 0.0], [2.0, 0.0], [3.0, 0.0], [4.0, 0.0]])[:, 0],
+        ],
+    )
+    def test_to_contiguous_array(self, data) -> None:
+        result = to_contiguous_array(data)
+        assert isinstance(result, np.ndarray)
+        assert result.flags.c_contiguous
+        assert list(result) == [1.0, 2.0, 3.0, 4.0]
+
+    def test_data_is_not_copied(self) -> None:
+        buffer = array.array("d", [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        data = np.arange(6.0)
+        assert np.shares_memory(to_contiguous_array(buffer), np.asarray(buffer))
+        assert to_contiguous_array(data) is data
+
+        scrubber = CPDShell(data, cpd_algorithm=GraphAlgorithm(custom_comparison, 4)).scrubber
+        assert scrubber.data is data
+        window = scrubber.generate_window()
+        assert isinstance(window, np.ndarray)
+        assert np.shares_memory(window, data)
+
     def test_CPDalgorithm_getter_setter(self) -> None:
         FIVE = 5
 
@@ -90,6 +121,11 @@ class TestCPDShell:
         assert res_marked.expected_result == [4, 5, 6, 7]
         assert res_marked.result_diff == [4, 5, 6, 7]
 
+    def test_run_CPD_with_unpicklable_algorithm(self) -> None:
+        data = np.concatenate([np.zeros(40), np.full(40, 5.0), np.zeros(40)])
+        shell = CPDShell(data)
+        assert shell.run_cpd(workers=2).result == shell.run_cpd().result
+
 
 class TestCPContainer:
     cont_default1 = CPContainer([1] * 15, [1, 2, 3], [2, 3, 4], 10)